@@ -1,21 +1,39 @@
 from django.contrib import admin
-from .models import PartnerAPIKey
+from .models import PartnerAPIKey, WebhookDelivery, WebhookSubscription
+
+
+class WebhookSubscriptionInline(admin.TabularInline):
+    model = WebhookSubscription
+    extra = 0
+    fields = ["url", "secret", "is_active", "last_success_at", "last_failure_at", "consecutive_failures"]
+    readonly_fields = ["last_success_at", "last_failure_at", "consecutive_failures"]
 
 
 @admin.register(PartnerAPIKey)
 class PartnerAPIKeyAdmin(admin.ModelAdmin):
-    list_display = ["name", "key", "is_active", "created_at", "last_used_at"]
+    list_display = ["name", "key", "is_active", "created_at", "last_used_at", "request_count"]
     list_filter = ["is_active"]
-    readonly_fields = ["created_at", "last_used_at"]
+    readonly_fields = ["created_at", "last_used_at", "request_count"]
     search_fields = ["name"]
+    inlines = [WebhookSubscriptionInline]
     fieldsets = [
         (None, {"fields": ["name", "key", "is_active"]}),
         ("Restrictions", {"fields": ["allowed_origins"], "classes": ["collapse"]}),
-        ("Timestamps", {"fields": ["created_at", "last_used_at"]}),
+        ("Usage", {"fields": ["created_at", "last_used_at", "request_count"]}),
     ]
 
     def get_readonly_fields(self, request, obj=None):
         # Allow setting a key only when creating a new record.
         if obj:
-            return ["key", "created_at", "last_used_at"]
-        return ["created_at", "last_used_at"]
+            return ["key", "created_at", "last_used_at", "request_count"]
+        return ["created_at", "last_used_at", "request_count"]
+
+
+@admin.register(WebhookDelivery)
+class WebhookDeliveryAdmin(admin.ModelAdmin):
+    list_display = ["attempted_at", "subscription", "event_count", "succeeded", "status_code", "latency_ms", "error"]
+    list_filter = ["succeeded"]
+    readonly_fields = [f.name for f in WebhookDelivery._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
@@ -1,3 +1,28 @@
+"""
+Partner API key authentication.
+
+Keys are looked up through the default cache, keyed by a SHA-256 of the
+presented key (plaintext keys never go into the cache), so the embed widget
+costs no query per request. Admin saves and deletes invalidate the entry
+(see ``api.signals``); unknown keys are cached briefly as misses.
+
+Usage (``last_used_at`` and ``request_count``) is aggregated per process and
+written back at most once per ``PARTNER_KEY_USAGE_FLUSH_INTERVAL`` seconds,
+one UPDATE per key seen in that window, and once more when the process exits.
+"""
+from __future__ import annotations
+
+import atexit
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
 from django.utils import timezone
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
@@ -5,6 +30,91 @@ from rest_framework.permissions import BasePermission
 
 from .models import PartnerAPIKey
 
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "partner_key"
+_MISS = "__invalid__"
+
+
+@dataclass(frozen=True)
+class PartnerKeyInfo:
+    """What a request needs from a PartnerAPIKey row, safe to cache."""
+
+    pk: int
+    name: str
+    allowed_origins: tuple[str, ...]
+
+    def is_origin_allowed(self, origin: str) -> bool:
+        return not self.allowed_origins or origin in self.allowed_origins
+
+
+def hash_key(key: str) -> str:
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _cache_key(key: str) -> str:
+    return f"{CACHE_PREFIX}:{hash_key(key)}"
+
+
+def invalidate_partner_key(*keys: str) -> None:
+    cache.delete_many([_cache_key(k) for k in keys if k])
+
+
+def get_partner_key(key: str) -> PartnerKeyInfo | None:
+    """Active key info for ``key`` (cached), or None."""
+    cache_key = _cache_key(key)
+    info = cache.get(cache_key)
+    if info is None:
+        row = (
+            PartnerAPIKey.objects.filter(key=key, is_active=True)
+            .only("pk", "name", "allowed_origins")
+            .first()
+        )
+        if row is None:
+            cache.set(cache_key, _MISS, getattr(settings, "PARTNER_KEY_NEGATIVE_CACHE_TIMEOUT", 60))
+            return None
+        info = PartnerKeyInfo(pk=row.pk, name=row.name, allowed_origins=tuple(row.get_allowed_origins()))
+        cache.set(cache_key, info, getattr(settings, "PARTNER_KEY_CACHE_TIMEOUT", 300))
+    return None if info == _MISS else info
+
+
+# ── usage buffering ──────────────────────────────────────────────────────────
+_usage_lock = threading.Lock()
+_usage: dict[int, tuple[datetime, int]] = {}  # pk -> (last_used_at, requests since flush)
+_last_flush = time.monotonic()
+
+
+def record_usage(pk: int) -> None:
+    now = timezone.now()
+    with _usage_lock:
+        _, count = _usage.get(pk, (now, 0))
+        _usage[pk] = (now, count + 1)
+    interval = float(getattr(settings, "PARTNER_KEY_USAGE_FLUSH_INTERVAL", 60))
+    if time.monotonic() - _last_flush >= interval:
+        flush_usage()
+
+
+def flush_usage() -> int:
+    """Write buffered usage to the database; returns the number of keys updated."""
+    global _last_flush
+    with _usage_lock:
+        pending = dict(_usage)
+        _usage.clear()
+        _last_flush = time.monotonic()
+    for pk, (last_used_at, count) in pending.items():
+        try:
+            PartnerAPIKey.objects.filter(pk=pk).update(
+                last_used_at=last_used_at,
+                request_count=F("request_count") + count,
+            )
+        except Exception:
+            logger.exception("Could not flush usage for partner key %s", pk)
+    return len(pending)
+
+
+# A recycled or idle worker would otherwise take its buffered counts with it.
+atexit.register(flush_usage)
+
 
 class PartnerAPIKeyAuthentication(BaseAuthentication):
     """Authenticate via X-API-Key header or ?api_key= query param."""
@@ -14,20 +124,15 @@ class PartnerAPIKeyAuthentication(BaseAuthentication):
         if not key:
             return None
 
-        try:
-            partner_key = PartnerAPIKey.objects.get(key=key, is_active=True)
-        except PartnerAPIKey.DoesNotExist:
+        partner_key = get_partner_key(key)
+        if partner_key is None:
             raise AuthenticationFailed("Invalid or inactive API key.")
 
         origin = request.META.get("HTTP_ORIGIN", "")
         if origin and not partner_key.is_origin_allowed(origin):
             raise AuthenticationFailed("Origin not allowed for this API key.")
 
-        # Throttle last_used_at updates to at most once per minute to avoid write storms
-        now = timezone.now()
-        if not partner_key.last_used_at or (now - partner_key.last_used_at).total_seconds() > 60:
-            PartnerAPIKey.objects.filter(pk=partner_key.pk).update(last_used_at=now)
-
+        record_usage(partner_key.pk)
         return (None, partner_key)
 
     def authenticate_header(self, request):
@@ -38,4 +143,4 @@ class HasPartnerAPIKey(BasePermission):
     """Allow requests authenticated with a valid PartnerAPIKey."""
 
     def has_permission(self, request, view):
-        return isinstance(request.auth, PartnerAPIKey)
+        return isinstance(request.auth, (PartnerKeyInfo, PartnerAPIKey))
@@ -0,0 +1,198 @@
+"""
+Streaming exports of the available plan catalog: JSONL, CSV and a
+Google-Merchant-style RSS product feed.
+
+Rows come from the pre-encoded API snapshots (``api.snapshots``) in id
+order, ``EXPORT_CHUNK_SIZE`` plans at a time, so memory stays flat however
+large the catalog is. Links are absolute on ``MAIN_SITE_URL`` so a feed is
+the same whoever requests it.
+
+The gzip stream of each format is also kept in default storage per catalog
+version (the latest ``PlanChange`` id). The first complete stream after a
+change writes it, and later requests are served from that copy until the
+catalog changes again. ``manage.py export_plans`` writes files or prebuilds
+the copies.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import logging
+import tempfile
+import zlib
+from typing import Iterable, Iterator
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db.models import Max
+
+from plans.models import PlanChange, Plans
+
+from . import snapshots
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_SIZE = 500
+STREAM_CHUNK_SIZE = 64 * 1024
+
+FORMATS = {
+    "jsonl": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "xml": "application/rss+xml; charset=utf-8",
+}
+
+CSV_COLUMNS = [
+    "plan_number", "slug", "url", "square_footage", "bedrooms", "bathrooms", "stories",
+    "garage_stalls", "house_width_display", "house_depth_display", "plan_price",
+    "is_featured", "house_styles", "main_image_url",
+]
+
+
+def catalog_version() -> int:
+    return PlanChange.objects.aggregate(v=Max("id"))["v"] or 0
+
+
+def _origin() -> str:
+    return getattr(settings, "MAIN_SITE_URL", "").rstrip("/")
+
+
+def iter_payloads(chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Encoded full plan objects, in id order."""
+    ids = Plans.objects.available().order_by("id").values_list("id", flat=True).iterator(chunk_size=chunk_size)
+    batch: list[int] = []
+    for pk in ids:
+        batch.append(pk)
+        if len(batch) >= chunk_size:
+            yield from snapshots.encode_plans(batch, _origin(), full=True)
+            batch = []
+    if batch:
+        yield from snapshots.encode_plans(batch, _origin(), full=True)
+
+
+def render_jsonl(payloads: Iterable[bytes]) -> Iterator[bytes]:
+    for payload in payloads:
+        yield payload + b"\n"
+
+
+def render_csv(payloads: Iterable[bytes]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for payload in payloads:
+        plan = snapshots.loads(payload)
+        plan["house_styles"] = "|".join(s["style_name"] for s in plan.get("house_styles") or ())
+        writer.writerow(["" if plan.get(c) is None else plan.get(c) for c in CSV_COLUMNS])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def _feed_item(plan: dict) -> str:
+    title = (
+        f"Plan {plan['plan_number']}: {plan.get('bedrooms')} bed, "
+        f"{plan.get('bathrooms')} bath, {plan.get('square_footage')} sq ft"
+    )
+    fields = [
+        ("g:id", plan["plan_number"]),
+        ("title", title),
+        ("description", plan.get("description") or title),
+        ("link", plan.get("url")),
+        ("g:image_link", plan.get("main_image_url")),
+        ("g:price", f"{plan['plan_price']} USD" if plan.get("plan_price") else None),
+        ("g:availability", "in_stock"),
+        ("g:condition", "new"),
+        ("g:brand", getattr(settings, "COMPANY_NAME", "Provost Home Design")),
+    ]
+    fields += [("g:product_type", s["style_name"]) for s in plan.get("house_styles") or ()]
+    body = "".join(f"<{tag}>{escape(str(value))}</{tag}>" for tag, value in fields if value)
+    return f"<item>{body}</item>\n"
+
+
+def render_xml(payloads: Iterable[bytes]) -> Iterator[bytes]:
+    company = escape(getattr(settings, "COMPANY_NAME", "Provost Home Design"))
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<rss version="2.0" xmlns:g="http://base.google.com/ns/1.0"><channel>\n'
+        f"<title>{company} house plans</title><link>{escape(_origin())}/plans/</link>"
+        f"<description>Available house plans from {company}</description>\n"
+    ).encode("utf-8")
+    for payload in payloads:
+        yield _feed_item(snapshots.loads(payload)).encode("utf-8")
+    yield b"</channel></rss>\n"
+
+
+RENDERERS = {"jsonl": render_jsonl, "csv": render_csv, "xml": render_xml}
+
+
+def export_chunks(fmt: str) -> Iterator[bytes]:
+    """Uncompressed export body, coalesced into ~STREAM_CHUNK_SIZE pieces."""
+    pending, size = [], 0
+    for piece in RENDERERS[fmt](iter_payloads()):
+        pending.append(piece)
+        size += len(piece)
+        if size >= STREAM_CHUNK_SIZE:
+            yield b"".join(pending)
+            pending, size = [], 0
+    if pending:
+        yield b"".join(pending)
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+# ── cached copies ───────────────────────────────────────────────────────────
+def cached_name(fmt: str, version: int) -> str:
+    return f"exports/plans-v{version}.{fmt}.gz"
+
+
+def _pointer_key(fmt: str) -> str:
+    return f"plan_export:{fmt}"
+
+
+def stream_gzip_export(fmt: str) -> Iterator[bytes]:
+    """Gzip export for the current catalog version, from the stored copy when there is one."""
+    version = catalog_version()
+    name = cached_name(fmt, version)
+    if default_storage.exists(name):
+        with default_storage.open(name, "rb") as fh:
+            while chunk := fh.read(STREAM_CHUNK_SIZE):
+                yield chunk
+        return
+
+    with tempfile.TemporaryFile() as spool:
+        for chunk in gzip_chunks(export_chunks(fmt)):
+            spool.write(chunk)
+            yield chunk
+        # Only a complete stream reaches this point (a disconnect closes the generator).
+        spool.seek(0)
+        _store(fmt, version, spool)
+
+
+def _store(fmt: str, version: int, fh) -> None:
+    name = cached_name(fmt, version)
+    try:
+        if not default_storage.exists(name):
+            default_storage.save(name, File(fh))
+        previous = cache.get(_pointer_key(fmt))
+        cache.set(_pointer_key(fmt), version, None)
+        if previous is not None and previous != version:
+            default_storage.delete(cached_name(fmt, previous))
+    except Exception:
+        logger.exception("Could not store %s catalog export v%s", fmt, version)
+
+
+def prebuild(fmt: str) -> str:
+    """Write the stored gzip copy for the current version (if missing); returns its name."""
+    for _ in stream_gzip_export(fmt):
+        pass
+    return cached_name(fmt, catalog_version())
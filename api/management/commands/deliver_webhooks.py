@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.webhooks import deliver_pending, prune
+
+# With --loop, how often old events and delivery logs are pruned.
+PRUNE_INTERVAL = 60 * 60
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver queued partner webhook events (one batch per subscription) and prune old ones; "
+        "--loop to keep running (the Procfile worker)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep polling for due events.")
+        parser.add_argument("--interval", type=float, default=10.0, help="Seconds between passes with --loop.")
+
+    def handle(self, *args, **options):
+        pruned_at = None
+        while True:
+            deliveries = deliver_pending()
+            if deliveries:
+                ok = sum(1 for d in deliveries if d.succeeded)
+                self.stdout.write(f"Delivered {ok}/{len(deliveries)} webhook batch(es).")
+            if pruned_at is None or time.monotonic() - pruned_at >= PRUNE_INTERVAL:
+                events, logs = prune()
+                pruned_at = time.monotonic()
+                if events or logs:
+                    self.stdout.write(f"Pruned {events} webhook event(s) and {logs} delivery log(s).")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,39 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from api import exports
+
+
+class Command(BaseCommand):
+    help = (
+        "Export the available plan catalog as JSONL, CSV or an RSS product feed. "
+        "With --prebuild, store the gzip copy served by /api/plans/export/<format>/ instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=sorted(exports.FORMATS), default="jsonl")
+        parser.add_argument("--output", default="-", help="File path, or - for stdout (default).")
+        parser.add_argument("--gzip", action="store_true", help="Gzip the output.")
+        parser.add_argument("--prebuild", action="store_true", help="Build the stored copy for every format.")
+
+    def handle(self, *args, **options):
+        if options["prebuild"]:
+            for fmt in sorted(exports.FORMATS):
+                name = exports.prebuild(fmt)
+                self.stdout.write(self.style.SUCCESS(f"Stored {name}"))
+            return
+
+        chunks = exports.export_chunks(options["format"])
+        if options["gzip"]:
+            chunks = exports.gzip_chunks(chunks)
+        if options["output"] == "-":
+            out = sys.stdout.buffer
+            for chunk in chunks:
+                out.write(chunk)
+            out.flush()
+            return
+        with open(options["output"], "wb") as fh:
+            for chunk in chunks:
+                fh.write(chunk)
+        self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}"))
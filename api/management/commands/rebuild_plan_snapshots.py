@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from api.snapshots import build_snapshots
+from plans.models import Plans
+
+
+class Command(BaseCommand):
+    help = "Rebuild the pre-encoded API snapshots of available plans (e.g. after a deploy changes the serializer)."
+
+    def handle(self, *args, **options):
+        plans = Plans.objects.available().prefetch_related("images", "house_styles")
+        built = len(build_snapshots(plans.iterator(chunk_size=200)))
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {built} plan snapshot(s)."))
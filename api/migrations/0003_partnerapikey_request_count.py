@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_alter_partnerapikey_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='partnerapikey',
+            name='request_count',
+            field=models.PositiveBigIntegerField(default=0, help_text='Authenticated requests, flushed periodically from the API workers.'),
+        ),
+    ]
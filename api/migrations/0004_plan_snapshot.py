@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:16
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_partnerapikey_request_count'),
+        ('plans', '0015_seed_plan_changes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlanSnapshot',
+            fields=[
+                ('plan', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='api_snapshot', serialize=False, to='plans.plans')),
+                ('card', models.TextField()),
+                ('full', models.TextField()),
+                ('built_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Plan API snapshot',
+                'verbose_name_plural': 'Plan API snapshots',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 07:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_webhooks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plansnapshot',
+            name='plan_modified',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
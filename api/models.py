@@ -21,6 +21,10 @@ class PartnerAPIKey(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     last_used_at = models.DateTimeField(null=True, blank=True)
+    request_count = models.PositiveBigIntegerField(
+        default=0,
+        help_text="Authenticated requests, flushed periodically from the API workers.",
+    )
 
     class Meta:
         verbose_name = "Partner API Key"
@@ -45,3 +49,105 @@ class PartnerAPIKey(models.Model):
         if not allowed:
             return True
         return origin in allowed
+
+
+class PlanSnapshot(models.Model):
+    """
+    Pre-encoded public API representation of a plan (see ``api.snapshots``).
+
+    ``card`` is the list shape (no gallery), ``full`` the detail shape.
+    Absolute URLs are stored with a placeholder origin that is swapped for
+    the request's scheme and host when served. Rows are dropped whenever the
+    plan changes and rebuilt on the next read; ``plan_modified`` is the
+    plan's ``modified_date`` they were built from, and a row whose plan has
+    moved on since is treated as missing.
+    """
+    plan = models.OneToOneField(
+        "plans.Plans", on_delete=models.CASCADE, primary_key=True, related_name="api_snapshot"
+    )
+    card = models.TextField()
+    full = models.TextField()
+    plan_modified = models.DateTimeField(null=True, blank=True)
+    built_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Plan API snapshot"
+        verbose_name_plural = "Plan API snapshots"
+
+    def __str__(self):
+        return f"Snapshot of plan {self.plan_id}"
+
+
+def _webhook_secret():
+    return "whsec_" + secrets.token_urlsafe(32)
+
+
+class WebhookSubscription(models.Model):
+    """A partner endpoint that receives batched plan change events (see ``api.webhooks``)."""
+
+    partner = models.ForeignKey(PartnerAPIKey, on_delete=models.CASCADE, related_name="webhooks")
+    url = models.URLField(max_length=500)
+    secret = models.CharField(
+        max_length=80,
+        default=_webhook_secret,
+        help_text="Shared secret for the X-PHD-Signature HMAC header.",
+    )
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_success_at = models.DateTimeField(null=True, blank=True)
+    last_failure_at = models.DateTimeField(null=True, blank=True)
+    consecutive_failures = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Webhook subscription"
+        verbose_name_plural = "Webhook subscriptions"
+        ordering = ["partner", "id"]
+
+    def __str__(self):
+        return f"{self.partner} → {self.url}"
+
+
+class WebhookEvent(models.Model):
+    """One queued plan change for one subscription."""
+
+    PENDING = "pending"
+    DELIVERED = "delivered"
+    FAILED = "failed"
+    STATUS_CHOICES = [(PENDING, "Pending"), (DELIVERED, "Delivered"), (FAILED, "Failed")]
+
+    subscription = models.ForeignKey(WebhookSubscription, on_delete=models.CASCADE, related_name="events")
+    change_id = models.BigIntegerField(help_text="plans.PlanChange id")
+    event_type = models.CharField(max_length=20)
+    plan_number = models.CharField(max_length=50)
+    plan_id = models.BigIntegerField(null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+
+    def __str__(self):
+        return f"{self.event_type} {self.plan_number} → {self.subscription_id}"
+
+
+class WebhookDelivery(models.Model):
+    """One POST attempt carrying a batch of events."""
+
+    subscription = models.ForeignKey(WebhookSubscription, on_delete=models.CASCADE, related_name="deliveries")
+    attempted_at = models.DateTimeField(default=timezone.now, db_index=True)
+    event_count = models.PositiveIntegerField(default=0)
+    succeeded = models.BooleanField(default=False)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    latency_ms = models.PositiveIntegerField(null=True, blank=True)
+    error = models.CharField(max_length=300, blank=True)
+
+    class Meta:
+        ordering = ["-attempted_at"]
+        verbose_name_plural = "Webhook deliveries"
+
+    def __str__(self):
+        return f"{self.subscription_id} @ {self.attempted_at:%Y-%m-%d %H:%M:%S} ({'ok' if self.succeeded else 'failed'})"
@@ -0,0 +1,10 @@
+from rest_framework.pagination import CursorPagination
+
+
+class PlanCursorPagination(CursorPagination):
+    """Stable cursor pages over the catalog, newest changes first."""
+
+    ordering = ("-modified_date", "id")
+    page_size = 24
+    page_size_query_param = "page_size"
+    max_page_size = 100
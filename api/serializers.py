@@ -34,7 +34,35 @@ class PlanGallerySerializer(serializers.ModelSerializer):
         return None
 
 
-class PlanSerializer(serializers.ModelSerializer):
+class SparseFieldsetMixin:
+    """
+    Honour ``?fields=a,b,c`` (keep only those fields) and ``?expand=x,y``
+    (include fields listed in ``Meta.expandable_fields``, which are otherwise
+    left out of list responses).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if request is None:
+            return
+        wanted = csv_query_param(request, "fields")
+        expand = csv_query_param(request, "expand")
+        omit = {
+            name for name in getattr(self.Meta, "expandable_fields", ())
+            if name not in expand and not self.context.get("expand_all")
+        }
+        for name in list(self.fields):
+            if name in omit or (wanted and name not in wanted):
+                self.fields.pop(name)
+
+
+def csv_query_param(request, name: str) -> set[str]:
+    raw = request.query_params.get(name, "")
+    return {part.strip() for part in raw.split(",") if part.strip()}
+
+
+class PlanSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     house_styles = HouseStyleSerializer(many=True, read_only=True)
     gallery = PlanGallerySerializer(many=True, read_only=True, source="images")
     main_image_url = serializers.SerializerMethodField()
@@ -64,6 +92,7 @@ class PlanSerializer(serializers.ModelSerializer):
             "is_featured",
             "url",
         ]
+        expandable_fields = ["gallery"]
 
     def get_main_image_url(self, obj):
         request = self.context.get("request")
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from plans.models import plans_changed
+
+from . import snapshots, webhooks
+from .authentication import invalidate_partner_key
+from .models import PartnerAPIKey
+
+
+@receiver(pre_save, sender=PartnerAPIKey)
+def partnerapikey_pre_save(sender, instance: PartnerAPIKey, **kwargs):
+    # Remember the stored key so a rotated key stops authenticating at once.
+    instance._previous_key = (  # type: ignore[attr-defined]
+        PartnerAPIKey.objects.filter(pk=instance.pk).values_list("key", flat=True).first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=PartnerAPIKey)
+def partnerapikey_post_save(sender, instance: PartnerAPIKey, **kwargs):
+    # After commit, or a request in between could re-cache the old row for
+    # the whole cache timeout.
+    keys = (instance.key, getattr(instance, "_previous_key", None) or "")
+    transaction.on_commit(partial(invalidate_partner_key, *keys))
+
+
+@receiver(post_delete, sender=PartnerAPIKey)
+def partnerapikey_post_delete(sender, instance: PartnerAPIKey, **kwargs):
+    transaction.on_commit(partial(invalidate_partner_key, instance.key))
+
+
+@receiver(plans_changed)
+def plans_changed_drop_snapshots(sender, plan_ids, **kwargs):
+    # After commit: dropped earlier, a reader could rebuild from the old row
+    # before the writer commits and that snapshot would stay.
+    if plan_ids:
+        transaction.on_commit(partial(snapshots.invalidate, list(plan_ids)))
+
+
+@receiver(plans_changed)
+def plans_changed_enqueue_webhooks(sender, changes, **kwargs):
+    webhooks.enqueue(changes)
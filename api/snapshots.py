@@ -0,0 +1,131 @@
+"""
+Pre-encoded plan payloads for the public plans API.
+
+Running ``PlanSerializer`` walks styles, gallery images, ``get_absolute_url``
+(one query per plan) and the display properties for every plan on every
+request. Instead, each plan's representation is serialized once, with a
+placeholder origin in its absolute URLs, and stored as JSON text in
+``PlanSnapshot``. Requests fetch the snapshots for a page in one query, swap
+the placeholder for the request origin and join the bytes.
+
+``plans_changed`` (sent by ``PlanChange.record``) drops a plan's snapshot
+once the change commits; it is rebuilt on the next read. A snapshot also
+records the plan's ``modified_date`` and is rebuilt when that no longer
+matches, so one built from the old row by a reader racing the writer's
+commit is not served afterwards. Sparse fieldsets (``?fields=``) decode,
+filter and re-encode the snapshot, which is still far cheaper than DRF.
+"""
+from __future__ import annotations
+
+import json
+from typing import Iterable, Sequence
+
+from django.db.models import F
+from django.http import QueryDict
+from django.utils import timezone
+
+from plans.models import Plans
+
+from .models import PlanSnapshot
+
+try:  # optional fast encoder
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+ORIGIN_PLACEHOLDER = "https://phd-origin.invalid"
+
+
+def dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def loads(data: bytes | str):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class _SnapshotRequest:
+    """Just enough of a request for PlanSerializer, with a placeholder origin."""
+
+    query_params = QueryDict()
+
+    def build_absolute_uri(self, location: str) -> str:
+        if location.startswith(("http://", "https://", "//")):
+            return location
+        return ORIGIN_PLACEHOLDER + location
+
+
+def build_snapshots(plans: Iterable[Plans]) -> dict[int, PlanSnapshot]:
+    """Serialize ``plans`` (prefetch images and house_styles) and upsert their snapshots."""
+    from .serializers import PlanSerializer
+
+    context = {"request": _SnapshotRequest(), "expand_all": True}
+    now = timezone.now()
+    snapshots = {}
+    for plan in plans:
+        data = dict(PlanSerializer(plan, context=context).data)
+        full = dumps(data).decode("utf-8")
+        data.pop("gallery", None)
+        snapshots[plan.pk] = PlanSnapshot(
+            plan_id=plan.pk, card=dumps(data).decode("utf-8"), full=full, plan_modified=plan.modified_date, built_at=now,
+        )
+    if snapshots:
+        PlanSnapshot.objects.bulk_create(
+            snapshots.values(),
+            update_conflicts=True,
+            unique_fields=["plan"],
+            update_fields=["card", "full", "plan_modified", "built_at"],
+        )
+    return snapshots
+
+
+def get_snapshots(plan_ids: Sequence[int]) -> dict[int, PlanSnapshot]:
+    """Snapshots for ``plan_ids``, building any that are missing or older than their plan."""
+    found = {
+        s.plan_id: s
+        for s in PlanSnapshot.objects.filter(plan_id__in=plan_ids, plan_modified=F("plan__modified_date"))
+    }
+    missing = [pk for pk in plan_ids if pk not in found]
+    if missing:
+        plans = Plans.objects.filter(pk__in=missing).prefetch_related("images", "house_styles")
+        found.update(build_snapshots(plans))
+    return found
+
+
+def invalidate(plan_ids: Iterable[int]) -> None:
+    PlanSnapshot.objects.filter(plan_id__in=list(plan_ids)).delete()
+
+
+def encode_plan_map(
+    plan_ids: Sequence[int],
+    origin: str,
+    *,
+    full: bool = False,
+    fields: set[str] | None = None,
+) -> dict[int, bytes]:
+    """Encoded plan objects keyed by id, with absolute URLs on ``origin``; unknown ids are left out."""
+    snapshots = get_snapshots(plan_ids)
+    placeholder, origin_bytes = ORIGIN_PLACEHOLDER.encode(), origin.encode()
+    out = {}
+    for pk in plan_ids:
+        snapshot = snapshots.get(pk)
+        if snapshot is None:
+            continue
+        body = (snapshot.full if full else snapshot.card).encode("utf-8")
+        if fields:
+            body = dumps({k: v for k, v in loads(body).items() if k in fields})
+        out[pk] = body.replace(placeholder, origin_bytes)
+    return out
+
+
+def encode_plans(plan_ids: Sequence[int], origin: str, **options) -> list[bytes]:
+    """Like ``encode_plan_map``, as a list in ``plan_ids`` order."""
+    return list(encode_plan_map(plan_ids, origin, **options).values())
+
+
+def join_array(items: list[bytes]) -> bytes:
+    return b"[" + b",".join(items) + b"]"
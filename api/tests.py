@@ -0,0 +1,423 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.core.cache import cache
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from . import authentication, webhooks
+from .models import PartnerAPIKey, WebhookEvent, WebhookSubscription
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "api-tests"}},
+    PARTNER_KEY_USAGE_FLUSH_INTERVAL=3600,
+)
+class PartnerAPIKeyAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        authentication.flush_usage()
+        self.addCleanup(authentication.flush_usage)
+        self.partner = PartnerAPIKey.objects.create(name="Builder Co", allowed_origins="https://builder.example")
+
+    def get_plans(self, key, **extra):
+        return self.client.get("/api/plans/", HTTP_X_API_KEY=key, **extra)
+
+    def test_repeat_requests_skip_the_key_lookup(self):
+        self.assertEqual(self.get_plans(self.partner.key).status_code, 200)
+
+        with self.assertNumQueries(1):  # the plan list only
+            response = self.get_plans(self.partner.key, HTTP_ORIGIN="https://builder.example")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(self.partner.key, str(cache._cache))  # cached by hash only
+
+    def test_origin_and_unknown_key_are_rejected(self):
+        self.assertEqual(self.get_plans(self.partner.key, HTTP_ORIGIN="https://other.example").status_code, 401)
+        self.assertEqual(self.get_plans("phd_nope").status_code, 401)
+
+    def test_deactivating_a_key_takes_effect_immediately(self):
+        self.assertEqual(self.get_plans(self.partner.key).status_code, 200)
+        self.partner.is_active = False
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.partner.save()
+        # Dropped on commit, so a request before it can't re-cache the old row.
+        self.assertIsNotNone(cache.get(authentication._cache_key(self.partner.key)))
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.get_plans(self.partner.key).status_code, 401)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.partner.delete()
+        self.assertIsNone(cache.get(authentication._cache_key(self.partner.key)))
+
+    def test_usage_is_buffered_then_flushed(self):
+        for _ in range(3):
+            self.get_plans(self.partner.key)
+        self.partner.refresh_from_db()
+        self.assertEqual(self.partner.request_count, 0)
+        self.assertIsNone(self.partner.last_used_at)
+
+        self.assertEqual(authentication.flush_usage(), 1)
+        self.partner.refresh_from_db()
+        self.assertEqual(self.partner.request_count, 3)
+        self.assertIsNotNone(self.partner.last_used_at)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "api-tests"}},
+)
+class PublicPlanListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        from decimal import Decimal
+
+        from plans.models import Plans
+
+        for n in range(3):
+            Plans.objects.create(
+                plan_number=f"PHD-30{n}",
+                slug=f"phd-30{n}",
+                square_footage=1500 + n,
+                bedrooms=3,
+                bathrooms=Decimal("2.0"),
+                stories=1,
+                garage_stalls=2,
+                house_width_in=600,
+                house_depth_in=480,
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(authentication.flush_usage)
+        self.partner = PartnerAPIKey.objects.create(name="Builder Co")
+
+    def get(self, path, **extra):
+        return self.client.get(path, HTTP_X_API_KEY=self.partner.key, **extra)
+
+    def test_list_is_cursor_paginated(self):
+        first = self.get("/api/plans/?page_size=2").json()
+        self.assertEqual(len(first["results"]), 2)
+        self.assertIsNotNone(first["next"])
+
+        second = self.client.get(first["next"], HTTP_X_API_KEY=self.partner.key).json()
+        numbers = [p["plan_number"] for p in first["results"] + second["results"]]
+        self.assertEqual(sorted(numbers), ["PHD-300", "PHD-301", "PHD-302"])
+
+    def test_sparse_fields_and_gallery_expansion(self):
+        card = self.get("/api/plans/?fields=plan_number,bedrooms").json()["results"][0]
+        self.assertEqual(set(card), {"plan_number", "bedrooms"})
+
+        listed = self.get("/api/plans/").json()["results"][0]
+        self.assertNotIn("gallery", listed)
+        self.assertIn("gallery", self.get("/api/plans/?expand=gallery").json()["results"][0])
+        self.assertIn("gallery", self.get("/api/plans/PHD-300/").json())
+
+    def test_matching_etag_returns_not_modified(self):
+        response = self.get("/api/plans/PHD-300/?fields=plan_number")
+        etag = response["ETag"]
+
+        again = self.get("/api/plans/PHD-300/?fields=plan_number", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b"")
+
+    @override_settings(PLAN_CHANGES_SETTLE_SECONDS=0)
+    def test_changes_feed_returns_upserts_and_tombstones(self):
+        from plans.models import Plans
+
+        start = self.get("/api/plans/changes/?since=0").json()
+        self.assertEqual({c["plan_number"] for c in start["changes"]}, {"PHD-300", "PHD-301", "PHD-302"})
+        cursor = start["cursor"]
+
+        plan = Plans.objects.get(plan_number="PHD-301")
+        plan.bedrooms = 4
+        plan.save()
+        Plans.objects.get(plan_number="PHD-302").delete()
+        hidden = Plans.objects.get(plan_number="PHD-300")
+        hidden.is_available = False
+        hidden.save()
+
+        delta = self.get(f"/api/plans/changes/?since={cursor}&fields=plan_number,bedrooms").json()
+        self.assertFalse(delta["has_more"])
+        self.assertEqual(delta["changes"], [
+            {"plan_number": "PHD-301", "action": "upsert", "plan": {"plan_number": "PHD-301", "bedrooms": 4}},
+            {"plan_number": "PHD-302", "action": "remove"},
+            {"plan_number": "PHD-300", "action": "remove"},
+        ])
+
+        caught_up = self.get(f"/api/plans/changes/?since={delta['cursor']}").json()
+        self.assertEqual(caught_up["changes"], [])
+        self.assertEqual(caught_up["cursor"], delta["cursor"])
+
+    def test_deleting_a_plan_with_gallery_logs_only_its_removal(self):
+        from django.db import connection
+
+        from plans.models import PlanChange, PlanGallery, Plans
+
+        plan = Plans.objects.get(plan_number="PHD-302")
+        PlanGallery.objects.create(plan=plan, image="plans/gallery/a.jpg")
+        PlanGallery.objects.create(plan=plan, image="plans/gallery/b.jpg")
+        last = PlanChange.objects.latest("id").id
+
+        plan.delete()
+
+        logged = list(PlanChange.objects.filter(id__gt=last).values_list("plan_id", "plan_number", "action"))
+        self.assertEqual(logged, [(None, "PHD-302", PlanChange.REMOVE)])
+        connection.check_constraints(table_names=[PlanChange._meta.db_table])
+
+    @override_settings(PLAN_CHANGES_SETTLE_SECONDS=30)
+    def test_changes_feed_waits_for_out_of_order_commits(self):
+        from datetime import timedelta
+        from unittest import mock
+
+        from plans.models import PlanChange
+
+        settled = timezone.now() - timedelta(seconds=60)
+        PlanChange.objects.update(changed_at=settled)
+        start = self.get("/api/plans/changes/?since=0").json()
+        cursor = int(start["cursor"])
+
+        # Id cursor+2 commits first; id cursor+1 belongs to a transaction still open.
+        later = PlanChange.objects.create(id=cursor + 2, plan_number="PHD-302", action=PlanChange.UPSERT)
+        early = self.get(f"/api/plans/changes/?since={cursor}").json()
+        self.assertEqual(early["changes"], [])
+        self.assertEqual(early["cursor"], str(cursor))
+        self.assertFalse(early["has_more"])
+
+        PlanChange.objects.create(id=cursor + 1, plan_number="PHD-301", action=PlanChange.UPSERT)
+        with mock.patch("api.views.timezone.now", return_value=later.changed_at + timedelta(seconds=31)):
+            delta = self.get(f"/api/plans/changes/?since={cursor}&fields=plan_number").json()
+        self.assertEqual([c["plan_number"] for c in delta["changes"]], ["PHD-301", "PHD-302"])
+        self.assertEqual(delta["cursor"], str(cursor + 2))
+
+    def test_batch_lookup_uses_one_plan_query(self):
+        self.get("/api/plans/batch/?numbers=PHD-300,PHD-302")  # warm key cache and snapshots
+
+        with self.assertNumQueries(2):  # plans + snapshots
+            data = self.get("/api/plans/batch/?numbers=PHD-302,NOPE,PHD-300").json()
+        self.assertEqual([p["plan_number"] for p in data["results"]], ["PHD-302", "PHD-300"])
+        self.assertEqual(data["missing"], ["NOPE"])
+
+        too_many = ",".join(f"X{n}" for n in range(51))
+        self.assertEqual(self.get(f"/api/plans/batch/?numbers={too_many}").status_code, 400)
+
+
+    def test_snapshots_match_the_serializer_and_follow_changes(self):
+        from rest_framework.test import APIRequestFactory
+
+        from plans.models import HouseStyle, Plans
+
+        from .serializers import PlanSerializer
+
+        plan = Plans.objects.get(plan_number="PHD-301")
+        style = HouseStyle.objects.create(style_name="Ranch", slug="ranch")
+        plan.house_styles.add(style)
+
+        served = self.get("/api/plans/PHD-301/").json()
+        request = APIRequestFactory().get("/api/plans/PHD-301/")
+        request.query_params = request.GET
+        expected = PlanSerializer(plan, context={"request": request, "expand_all": True}).data
+        self.assertEqual(served, json.loads(json.dumps(expected)))
+        self.assertEqual(served["url"], "http://testserver/plans/ranch/phd-301/")
+
+        style.style_name = "Modern Ranch"
+        with self.captureOnCommitCallbacks(execute=True):
+            style.save()
+        served = self.get("/api/plans/PHD-301/").json()
+        self.assertEqual(served["house_styles"][0]["style_name"], "Modern Ranch")
+
+    def test_snapshot_built_from_a_stale_row_is_not_served(self):
+        from plans.models import Plans
+
+        from . import snapshots
+        from .models import PlanSnapshot
+
+        self.get("/api/plans/PHD-301/")
+        plan = Plans.objects.get(plan_number="PHD-301")
+        stale = Plans.objects.prefetch_related("images", "house_styles").get(pk=plan.pk)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            plan.bedrooms = 5
+            plan.save()
+        self.assertTrue(PlanSnapshot.objects.filter(plan=plan).exists())  # dropped only on commit
+        for callback in callbacks:
+            callback()
+        self.assertFalse(PlanSnapshot.objects.filter(plan=plan).exists())
+
+        # A reader that loaded the plan before the commit upserts after the drop.
+        snapshots.build_snapshots([stale])
+        self.assertEqual(self.get("/api/plans/PHD-301/").json()["bedrooms"], 5)
+        self.assertEqual(PlanSnapshot.objects.get(plan=plan).plan_modified, Plans.objects.get(pk=plan.pk).modified_date)
+
+    def test_catalog_exports_stream_and_reuse_the_stored_copy(self):
+        import csv
+        import gzip
+        import io
+        import tempfile
+
+        from django.core.files.storage import default_storage
+
+        from . import exports
+
+        jsonl = b"".join(self.get("/api/plans/export/jsonl/").streaming_content)
+        rows = [json.loads(line) for line in jsonl.splitlines()]
+        self.assertEqual([r["plan_number"] for r in rows], ["PHD-300", "PHD-301", "PHD-302"])
+
+        table = list(csv.DictReader(io.StringIO(b"".join(self.get("/api/plans/export/csv/").streaming_content).decode())))
+        self.assertEqual(table[0]["plan_number"], "PHD-300")
+
+        feed = b"".join(self.get("/api/plans/export/xml/").streaming_content)
+        self.assertEqual(feed.count(b"<item>"), 3)
+
+        local_storage = {
+            "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+            "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+        }
+        with tempfile.TemporaryDirectory() as media, self.settings(MEDIA_ROOT=media, STORAGES=local_storage):
+            response = self.get("/api/plans/export/jsonl/", HTTP_ACCEPT_ENCODING="gzip")
+            self.assertEqual(response["Content-Encoding"], "gzip")
+            self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), jsonl)
+            self.assertTrue(default_storage.exists(exports.cached_name("jsonl", exports.catalog_version())))
+
+            again = self.get("/api/plans/export/jsonl/", HTTP_ACCEPT_ENCODING="gzip")
+            self.assertEqual(gzip.decompress(b"".join(again.streaming_content)), jsonl)
+
+@override_settings(
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    },
+)
+class PlanEmbedLoaderTests(TestCase):
+    def test_loader_points_at_the_static_widget_and_is_cacheable(self):
+        response = self.client.get("/api/embed/widget.js")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'"http://testserver/static/js/embed/plan-widget.js"', response.content)
+        self.assertIn(b'"http://testserver/api/"', response.content)
+        self.assertIn("public", response["Cache-Control"])
+        self.assertIn("max-age=", response["Cache-Control"])
+
+        again = self.client.get("/api/embed/widget.js", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+
+class _ReceiverHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.received.append((dict(self.headers), body))
+        self.send_response(self.server.status)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class WebhookReceiver:
+    """Local partner endpoint that records what it is sent."""
+
+    def __init__(self):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _ReceiverHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.received = []
+        self.httpd.status = 200
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/hooks/plans"
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "api-tests"}},
+    MAIN_SITE_URL="https://www.example.com",
+    WEBHOOK_RETRY_BASE=30,
+    WEBHOOK_MAX_ATTEMPTS=2,
+)
+class WebhookDeliveryTests(TestCase):
+    def setUp(self):
+        from decimal import Decimal
+
+        from plans.models import Plans
+
+        self.receiver = WebhookReceiver()
+        self.addCleanup(self.receiver.close)
+        partner = PartnerAPIKey.objects.create(name="Builder Co")
+        self.subscription = WebhookSubscription.objects.create(partner=partner, url=self.receiver.url)
+        self.plan = Plans.objects.create(
+            plan_number="PHD-400", slug="phd-400", square_footage=1800, bedrooms=3,
+            bathrooms=Decimal("2.0"), stories=1, garage_stalls=2, house_width_in=600, house_depth_in=480,
+        )
+
+    def test_changes_are_batched_signed_and_collapsed_per_plan(self):
+        self.plan.plan_price = 1200
+        self.plan.save()
+        self.plan.is_available = False
+        self.plan.save()
+        self.assertEqual(self.subscription.events.count(), 3)
+
+        deliveries = webhooks.deliver_pending()
+
+        self.assertEqual(len(deliveries), 1)
+        self.assertTrue(deliveries[0].succeeded)
+        self.assertEqual(deliveries[0].event_count, 3)
+        self.assertIsNotNone(deliveries[0].latency_ms)
+        headers, body = self.receiver.httpd.received[0]
+        self.assertTrue(webhooks.verify(self.subscription.secret, headers["X-PHD-Signature"], body))
+        events = json.loads(body)["events"]
+        self.assertEqual([(e["plan_number"], e["type"]) for e in events], [("PHD-400", "plan.removed")])
+        self.assertFalse(self.subscription.events.filter(status=WebhookEvent.PENDING).exists())
+
+    def test_failures_back_off_then_give_up(self):
+        self.receiver.httpd.status = 503
+
+        first = webhooks.deliver_pending()[0]
+        self.assertFalse(first.succeeded)
+        self.assertEqual(first.error, "HTTP 503")
+        event = self.subscription.events.get()
+        self.assertEqual(event.status, WebhookEvent.PENDING)
+        self.assertGreater(event.next_attempt_at, timezone.now())
+        self.assertEqual(webhooks.deliver_pending(), [])  # not due yet
+
+        WebhookEvent.objects.update(next_attempt_at=timezone.now())
+        webhooks.deliver_pending()
+        event.refresh_from_db()
+        self.assertEqual(event.status, WebhookEvent.FAILED)
+        self.subscription.refresh_from_db()
+        self.assertEqual(self.subscription.consecutive_failures, 2)
+
+    def test_a_subscription_locked_by_another_run_is_skipped(self):
+        real = QuerySet.select_for_update
+        calls = []
+
+        def held_elsewhere(qs, **kwargs):
+            calls.append(kwargs)
+            return real(qs, **kwargs).none()  # what skip_locked returns while another run holds the row
+
+        with mock.patch.object(QuerySet, "select_for_update", held_elsewhere):
+            self.assertEqual(webhooks.deliver_pending(), [])
+        self.assertEqual(calls, [{"skip_locked": True}])
+        self.assertEqual(self.receiver.httpd.received, [])
+        self.assertEqual(self.subscription.events.get().status, WebhookEvent.PENDING)
+
+    @override_settings(WEBHOOK_RETENTION_DAYS=30)
+    def test_prune_keeps_pending_and_recent_rows(self):
+        from datetime import timedelta
+
+        webhooks.deliver_pending()
+        self.plan.plan_price = 1300
+        self.plan.save()  # still pending
+        old = timezone.now() - timedelta(days=31)
+        WebhookEvent.objects.update(created_at=old)
+        self.subscription.deliveries.update(attempted_at=old)
+
+        self.assertEqual(webhooks.prune(), (1, 1))
+        self.assertEqual(list(self.subscription.events.values_list("status", flat=True)), [WebhookEvent.PENDING])
+        self.assertEqual(webhooks.prune(), (0, 0))
@@ -1,5 +1,13 @@
-from django.http import HttpResponse
-from django.template.loader import render_to_string
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.templatetags.static import static
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.middleware.http import ConditionalGetMiddleware
+from django.utils.decorators import decorator_from_middleware, method_decorator
 from django.utils import timezone
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
@@ -9,29 +17,40 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.authtoken.models import Token
-from plans.models import Plans
+from plans.models import PlanChange, Plans
 from .authentication import PartnerAPIKeyAuthentication, HasPartnerAPIKey
+from . import exports, snapshots
+from .pagination import PlanCursorPagination
 from .serializers import (
     UserSerializer,
     PlanSerializer,
+    csv_query_param,
 )
 
 
+CHANGES_PAGE_SIZE = 200
+CHANGES_MAX_PAGE_SIZE = 1000
+BATCH_MAX_PLANS = 50
+
+
 class UpdatedAfterMixin:
-    """Filter list responses by ?updated_after=ISO8601 when the model has an updated_at field."""
+    """Filter list responses by ?updated_after=ISO8601 on the model's updated_at/modified_date field."""
+
+    updated_fields = ("updated_at", "modified_date")
 
     def filter_updated_after(self, queryset):
         updated_after = self.request.query_params.get("updated_after")
         if not updated_after:
             return queryset
         model = queryset.model
-        if not hasattr(model, "updated_at"):
+        field = next((f for f in self.updated_fields if hasattr(model, f)), None)
+        if field is None:
             return queryset
         try:
             ts = timezone.datetime.fromisoformat(updated_after)
             if ts.tzinfo is None:
                 ts = timezone.make_aware(ts, timezone=timezone.utc)
-            return queryset.filter(updated_at__gte=ts)
+            return queryset.filter(**{f"{field}__gte": ts})
         except Exception:
             return queryset
 
@@ -102,7 +121,7 @@ class DeviceTokenAuthView(ObtainAuthToken):
 # Public Plans API (partner embed)
 # ---------------------------------------------------------------------------
 
-class PublicPlanViewSet(viewsets.ReadOnlyModelViewSet):
+class PublicPlanViewSet(UpdatedAfterMixin, viewsets.ReadOnlyModelViewSet):
     """
     Read-only plan catalog for partner embeds. Requires a partner API key.
 
@@ -114,14 +133,38 @@ class PublicPlanViewSet(viewsets.ReadOnlyModelViewSet):
       ?style=ranch          (house style slug)
       ?featured=true
       ?plan_number=ABC123   (alternative to detail URL)
+      ?updated_after=ISO8601
+
+    Response shaping:
+      ?fields=plan_number,main_image_url,...   (sparse fieldset)
+      ?expand=gallery       (lists omit the gallery unless asked; detail includes it)
+      ?cursor=...&page_size=N  (cursor pages ordered by -modified_date, id)
+
+    Responses carry an ETag; send it back in If-None-Match to get a 304.
+
+    Batch lookup: GET /api/plans/batch/?numbers=A,B,C (see ``batch``).
+    Catalog export: GET /api/plans/export/<jsonl|csv|xml>/ (see ``export``).
+    Delta sync: GET /api/plans/changes/?since=<cursor> (see ``changes``).
     """
     authentication_classes = [PartnerAPIKeyAuthentication]
     permission_classes = [HasPartnerAPIKey]
     serializer_class = PlanSerializer
+    pagination_class = PlanCursorPagination
     lookup_field = "plan_number"
 
+    @method_decorator(decorator_from_middleware(ConditionalGetMiddleware))
+    def dispatch(self, request, *args, **kwargs):
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["expand_all"] = self.action == "retrieve"
+        return context
+
     def get_queryset(self):
-        qs = Plans.objects.available().prefetch_related("images", "house_styles")
+        # Payloads come from api.snapshots; only the columns needed to
+        # filter, page and key the snapshots are loaded here.
+        qs = Plans.objects.available().only("id", "plan_number", "modified_date")
         p = self.request.query_params
 
         if bedrooms := p.get("bedrooms"):
@@ -149,11 +192,168 @@ class PublicPlanViewSet(viewsets.ReadOnlyModelViewSet):
 
         return qs.distinct()
 
+    # ── pre-encoded responses (api.snapshots) ───────────────────────────────
+    def _encode(self, plan_ids, full: bool | None = None) -> list[bytes]:
+        if full is None:
+            full = "gallery" in csv_query_param(self.request, "expand")
+        origin = f"{self.request.scheme}://{self.request.get_host()}"
+        fields = csv_query_param(self.request, "fields") or None
+        return snapshots.encode_plans(plan_ids, origin, full=full, fields=fields)
+
+    @staticmethod
+    def _json(body: bytes) -> HttpResponse:
+        return HttpResponse(body, content_type="application/json")
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        results = self._encode([plan.pk for plan in page])
+        return self._json(
+            b'{"next":' + snapshots.dumps(self.paginator.get_next_link())
+            + b',"previous":' + snapshots.dumps(self.paginator.get_previous_link())
+            + b',"results":' + snapshots.join_array(results) + b"}"
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        plan = self.get_object()
+        return self._json(self._encode([plan.pk], full=True)[0])
+
+    @action(detail=False, methods=["get"], url_path=r"export/(?P<fmt>jsonl|csv|xml)")
+    def export(self, request, fmt: str):
+        """
+        Stream the whole available catalog as JSONL, CSV or an RSS product
+        feed (see ``api.exports``). Gzip-capable clients get the compressed
+        stream, served from the stored copy for the current catalog version
+        when one exists.
+        """
+        gzip = "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", "")
+        body = exports.stream_gzip_export(fmt) if gzip else exports.export_chunks(fmt)
+        response = StreamingHttpResponse(body, content_type=exports.FORMATS[fmt])
+        if gzip:
+            response["Content-Encoding"] = "gzip"
+        response["Content-Disposition"] = f'attachment; filename="plans.{fmt}"'
+        patch_vary_headers(response, ["Accept-Encoding"])
+        return response
+
+    @action(detail=False, methods=["get"])
+    def batch(self, request):
+        """
+        Several plans in one call: ``?numbers=A,B,C`` (up to BATCH_MAX_PLANS).
+        Results follow the requested order; unknown or unavailable numbers are
+        listed under ``missing``. Used by the embed widget to load a whole page
+        of cards at once.
+        """
+        numbers = list(dict.fromkeys(
+            n.strip() for n in request.query_params.get("numbers", "").split(",") if n.strip()
+        ))
+        if not numbers:
+            return Response({"detail": "numbers is required."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(numbers) > BATCH_MAX_PLANS:
+            return Response(
+                {"detail": f"At most {BATCH_MAX_PLANS} plan numbers per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        plans = {p.plan_number: p.pk for p in self.get_queryset().filter(plan_number__in=numbers)}
+        results = self._encode([plans[n] for n in numbers if n in plans])
+        missing = [n for n in numbers if n not in plans]
+        return self._json(b'{"results":' + snapshots.join_array(results) + b',"missing":' + snapshots.dumps(missing) + b"}")
+
+    @action(detail=False, methods=["get"])
+    def changes(self, request):
+        """
+        Plans created, updated or removed since ``?since=<cursor>`` (0 replays
+        the catalog). Each plan appears once, in its current state: an upsert
+        with the serialized plan, or a tombstone if it is gone, unavailable or
+        no longer matches the list filters in the query string. Store the returned ``cursor`` and keep calling while ``has_more``.
+
+        Ids are taken at insert but become visible at commit, so a later id
+        can show up first. Entries younger than ``PLAN_CHANGES_SETTLE_SECONDS``
+        are held back (along with everything after them) so the cursor never
+        moves past an id whose transaction may still commit.
+        """
+        try:
+            since = int(request.query_params.get("since", 0))
+            limit = min(max(int(request.query_params.get("limit", CHANGES_PAGE_SIZE)), 1), CHANGES_MAX_PAGE_SIZE)
+        except ValueError:
+            return Response({"detail": "since and limit must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+
+        settled_before = timezone.now() - timedelta(seconds=getattr(settings, "PLAN_CHANGES_SETTLE_SECONDS", 30))
+        entries = list(
+            PlanChange.objects.filter(id__gt=since)
+            .order_by("id")
+            .values_list("id", "plan_number", "changed_at")[:limit]
+        )
+        has_more = len(entries) == limit
+        for i, (_, _, changed_at) in enumerate(entries):
+            if changed_at > settled_before:
+                entries, has_more = entries[:i], False
+                break
+        cursor = entries[-1][0] if entries else since
+        # Last occurrence wins; dict preserves the order of first insertion, so re-insert.
+        touched: dict[str, int] = {}
+        for entry_id, number, _ in entries:
+            touched.pop(number, None)
+            touched[number] = entry_id
+
+        live = {p.plan_number: p.pk for p in self.get_queryset().filter(plan_number__in=list(touched))}
+        payloads = dict(zip(live, self._encode(list(live.values()))))
+
+        changes = []
+        for number in touched:
+            head = b'{"plan_number":' + snapshots.dumps(number)
+            if number in live:
+                changes.append(head + b',"action":"upsert","plan":' + payloads[number] + b"}")
+            else:
+                changes.append(head + b',"action":"remove"}')
+        return self._json(
+            b'{"cursor":' + snapshots.dumps(str(cursor))
+            + b',"has_more":' + snapshots.dumps(has_more)
+            + b',"changes":' + snapshots.join_array(changes) + b"}"
+        )
+
+
+EMBED_WIDGET_STATIC = "js/embed/plan-widget.js"
+_LOADER_TEMPLATE = (
+    "/* Provost Home Design - Plan Embed Widget loader */\n"
+    "(function(){var s=document.createElement('script');s.src=%(src)s;s.async=true;"
+    "s.setAttribute('data-phd-api',%(api)s);"
+    "(document.head||document.documentElement).appendChild(s);}());\n"
+)
+_loader_cache: dict[tuple[str, str], tuple[bytes, str]] = {}
+
+
+def _embed_loader(api_base: str, widget_url: str) -> tuple[bytes, str]:
+    """Loader script body and its ETag, built once per (api base, widget URL)."""
+    key = (api_base, widget_url)
+    if key not in _loader_cache:
+        body = (_LOADER_TEMPLATE % {"src": json.dumps(widget_url), "api": json.dumps(api_base)}).encode()
+        _loader_cache[key] = (body, '"%s"' % hashlib.md5(body).hexdigest())
+    return _loader_cache[key]
+
 
 class PlanEmbedWidgetView(View):
-    """Serve the embeddable JavaScript widget (no auth required - key is used client-side)."""
+    """
+    Stable, short-cached loader for the embed widget (no auth required - the
+    key is used client-side).
+
+    The widget itself is a static asset, fingerprinted and precompressed by
+    collectstatic and served by WhiteNoise/CDN with far-future immutable
+    headers; this loader only injects it with the API base for this host.
+    """
 
     def get(self, request, *args, **kwargs):
         api_base = request.build_absolute_uri("/api/")
-        js = render_to_string("api/embed_widget.js", {"api_base": api_base})
-        return HttpResponse(js, content_type="application/javascript; charset=utf-8")
+        widget_url = request.build_absolute_uri(static(EMBED_WIDGET_STATIC))
+        body, etag = _embed_loader(api_base, widget_url)
+        if etag in request.META.get("HTTP_IF_NONE_MATCH", ""):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type="application/javascript; charset=utf-8")
+        response["ETag"] = etag
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=getattr(settings, "EMBED_LOADER_MAX_AGE", 60 * 60),
+        )
+        response["Access-Control-Allow-Origin"] = "*"
+        return response
@@ -0,0 +1,228 @@
+"""
+Partner webhooks for plan changes.
+
+``PlanChange.record`` sends ``plans_changed``, and ``enqueue`` turns each
+change into one ``WebhookEvent`` per active subscription (in the same
+transaction as the change). ``deliver_pending`` runs from
+``manage.py deliver_webhooks``. For each subscription with due events it
+POSTs a single batch, collapsed to the latest state of each plan (with the
+plan payload from ``api.snapshots``). The JSON body is signed::
+
+    X-PHD-Signature: t=<unix time>,v1=<hex HMAC-SHA256 of "<t>.<body>">
+
+Every attempt is recorded as a ``WebhookDelivery`` (status, latency,
+error). Failed batches are retried with exponential backoff until
+``WEBHOOK_MAX_ATTEMPTS``, after which the events are marked failed.
+
+Each subscription is delivered under a ``select_for_update(skip_locked=True)``
+lock on its row, so overlapping runs (a second worker, or a manual run next
+to the Procfile ``worker``) skip it instead of POSTing the same events twice.
+``prune`` drops settled events and delivery logs older than
+``WEBHOOK_RETENTION_DAYS``.
+"""
+from __future__ import annotations
+
+import hashlib
+import hmac
+import logging
+import random
+import time
+from datetime import timedelta
+from typing import Iterable
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from plans.models import PlanChange, Plans
+
+from . import snapshots
+from .models import WebhookDelivery, WebhookEvent, WebhookSubscription
+
+logger = logging.getLogger(__name__)
+
+EVENT_UPDATED = "plan.updated"
+EVENT_REMOVED = "plan.removed"
+SIGNATURE_HEADER = "X-PHD-Signature"
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def enqueue(changes: Iterable[PlanChange]) -> int:
+    """Queue ``changes`` for every active subscription; returns the number of events."""
+    changes = list(changes)
+    if not changes:
+        return 0
+    subscription_ids = list(
+        WebhookSubscription.objects.filter(is_active=True, partner__is_active=True).values_list("id", flat=True)
+    )
+    events = [
+        WebhookEvent(
+            subscription_id=sub_id,
+            change_id=change.pk,
+            event_type=EVENT_UPDATED if change.action == PlanChange.UPSERT else EVENT_REMOVED,
+            plan_number=change.plan_number,
+            plan_id=change.plan_id,
+        )
+        for sub_id in subscription_ids
+        for change in changes
+    ]
+    WebhookEvent.objects.bulk_create(events)
+    return len(events)
+
+
+def sign(secret: str, timestamp: int, body: bytes) -> str:
+    digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+def verify(secret: str, header: str, body: bytes) -> bool:
+    """Receiver-side check of ``X-PHD-Signature`` (also used by the tests)."""
+    try:
+        parts = dict(item.split("=", 1) for item in header.split(","))
+        expected = sign(secret, int(parts["t"]), body)
+    except (KeyError, ValueError):
+        return False
+    return hmac.compare_digest(expected, header)
+
+
+def build_body(events: list[WebhookEvent]) -> bytes:
+    """One entry per plan, in its current state (like the changes feed)."""
+    latest: dict[str, WebhookEvent] = {}
+    for event in events:
+        latest.pop(event.plan_number, None)
+        latest[event.plan_number] = event
+    candidate_ids = [e.plan_id for e in latest.values() if e.plan_id]
+    live_ids = set(Plans.objects.available().filter(pk__in=candidate_ids).values_list("pk", flat=True))
+    origin = _setting("MAIN_SITE_URL", "").rstrip("/")
+    payloads = snapshots.encode_plan_map([pk for pk in candidate_ids if pk in live_ids], origin, full=True)
+
+    items = []
+    for number, event in latest.items():
+        head = b'{"id":' + snapshots.dumps(event.change_id) + b',"plan_number":' + snapshots.dumps(number)
+        if event.plan_id in payloads:
+            items.append(head + b',"type":"' + EVENT_UPDATED.encode() + b'","plan":' + payloads[event.plan_id] + b"}")
+        else:
+            items.append(head + b',"type":"' + EVENT_REMOVED.encode() + b'"}')
+    return b'{"sent_at":' + snapshots.dumps(timezone.now().isoformat()) + b',"events":' + snapshots.join_array(items) + b"}"
+
+
+def backoff(attempt: int) -> timedelta:
+    """Delay before retry ``attempt`` (1-based): base * 2^(n-1), capped, with 10% jitter."""
+    base = float(_setting("WEBHOOK_RETRY_BASE", 30))
+    cap = float(_setting("WEBHOOK_RETRY_MAX", 6 * 60 * 60))
+    delay = min(cap, base * (2 ** max(attempt - 1, 0)))
+    return timedelta(seconds=delay * (1 + random.uniform(0, 0.1)))
+
+
+def _post(session: requests.Session, subscription: WebhookSubscription, body: bytes, count: int):
+    timestamp = int(time.time())
+    headers = {
+        "Content-Type": "application/json",
+        "User-Agent": "ProvostHomeDesign-Webhooks/1.0",
+        SIGNATURE_HEADER: sign(subscription.secret, timestamp, body),
+        "X-PHD-Event-Count": str(count),
+    }
+    timeout = (float(_setting("WEBHOOK_CONNECT_TIMEOUT", 3)), float(_setting("WEBHOOK_READ_TIMEOUT", 10)))
+    started = time.monotonic()
+    try:
+        response = session.post(subscription.url, data=body, headers=headers, timeout=timeout, allow_redirects=False)
+        status_code, error = response.status_code, ""
+        if not 200 <= status_code < 300:
+            error = f"HTTP {status_code}"
+    except requests.RequestException as exc:
+        status_code, error = None, f"{exc.__class__.__name__}: {exc}"
+    latency_ms = int((time.monotonic() - started) * 1000)
+    return status_code, error[:300], latency_ms
+
+
+def deliver_subscription(subscription: WebhookSubscription, session: requests.Session) -> WebhookDelivery | None:
+    """POST one batch to ``subscription``; None if nothing is due or another run holds it."""
+    with transaction.atomic():
+        # The lock is held across the POST (bounded by the request timeouts),
+        # so the events can't be picked up again until their state is saved.
+        locked = (
+            WebhookSubscription.objects.select_for_update(skip_locked=True)
+            .filter(pk=subscription.pk, is_active=True)
+            .first()
+        )
+        if locked is None:
+            return None
+        return _deliver_locked(locked, session)
+
+
+def _deliver_locked(subscription: WebhookSubscription, session: requests.Session) -> WebhookDelivery | None:
+    now = timezone.now()
+    batch_size = int(_setting("WEBHOOK_BATCH_SIZE", 100))
+    events = list(
+        subscription.events.filter(status=WebhookEvent.PENDING, next_attempt_at__lte=now).order_by("id")[:batch_size]
+    )
+    if not events:
+        return None
+
+    status_code, error, latency_ms = _post(session, subscription, build_body(events), len(events))
+    succeeded = not error
+    delivery = WebhookDelivery.objects.create(
+        subscription=subscription,
+        attempted_at=now,
+        event_count=len(events),
+        succeeded=succeeded,
+        status_code=status_code,
+        latency_ms=latency_ms,
+        error=error,
+    )
+
+    max_attempts = int(_setting("WEBHOOK_MAX_ATTEMPTS", 8))
+    for event in events:
+        event.attempts += 1
+        if succeeded:
+            event.status, event.delivered_at = WebhookEvent.DELIVERED, now
+        elif event.attempts >= max_attempts:
+            event.status = WebhookEvent.FAILED
+        else:
+            event.next_attempt_at = now + backoff(event.attempts)
+    WebhookEvent.objects.bulk_update(events, ["attempts", "status", "delivered_at", "next_attempt_at"])
+
+    if succeeded:
+        subscription.last_success_at, subscription.consecutive_failures = now, 0
+    else:
+        subscription.last_failure_at = now
+        subscription.consecutive_failures += 1
+        gave_up = sum(1 for e in events if e.status == WebhookEvent.FAILED)
+        logger.warning(
+            "Webhook delivery to %s failed (%s); %d event(s) to retry, %d given up",
+            subscription.url, error, len(events) - gave_up, gave_up,
+        )
+    subscription.save(update_fields=["last_success_at", "last_failure_at", "consecutive_failures"])
+    return delivery
+
+
+def deliver_pending(session: requests.Session | None = None) -> list[WebhookDelivery]:
+    """One pass: a batch POST for every subscription with due events."""
+    due = (
+        WebhookEvent.objects.filter(status=WebhookEvent.PENDING, next_attempt_at__lte=timezone.now())
+        .values_list("subscription_id", flat=True)
+        .distinct()
+    )
+    subscriptions = WebhookSubscription.objects.filter(pk__in=list(due), is_active=True)
+    session = session or requests.Session()
+    deliveries = []
+    for subscription in subscriptions:
+        delivery = deliver_subscription(subscription, session)
+        if delivery is not None:
+            deliveries.append(delivery)
+    return deliveries
+
+
+def prune(now=None) -> tuple[int, int]:
+    """Delete settled events and delivery logs older than ``WEBHOOK_RETENTION_DAYS``.
+
+    Returns ``(events, deliveries)`` deleted. Pending events are never pruned.
+    """
+    cutoff = (now or timezone.now()) - timedelta(days=int(_setting("WEBHOOK_RETENTION_DAYS", 30)))
+    events, _ = WebhookEvent.objects.exclude(status=WebhookEvent.PENDING).filter(created_at__lt=cutoff).delete()
+    deliveries, _ = WebhookDelivery.objects.filter(attempted_at__lt=cutoff).delete()
+    return events, deliveries
@@ -75,6 +75,7 @@ THUMBNAIL_ALIASES = {
         "plan_thumb_sm": {"size": (400, 250), "crop": "center", "quality": 80},
         "gallery_thumb": {"size": (440, 330), "crop": "center", "quality": 85},
         "plan_detail":   {"size": (1200, 900), "quality": 88},
+        "help_inline":   {"size": (960, 0), "quality": 85},
     }
 }
 
@@ -90,11 +91,21 @@ if REDIS_URL:
         }
     }
 elif not DEBUG:
+    # Hot keys are served from a small per-process LRU (core.cache.TwoTierCache)
+    # for a few seconds; the shared database cache stays authoritative.
     CACHES = {
         "default": {
+            "BACKEND": "core.cache.TwoTierCache",
+            "LOCATION": "shared",
+            "OPTIONS": {
+                "L1_MAX_ENTRIES": config("CACHE_L1_MAX_ENTRIES", cast=int, default=1000),
+                "L1_TIMEOUT": config("CACHE_L1_TIMEOUT", cast=float, default=5.0),
+            },
+        },
+        "shared": {
             "BACKEND": "django.core.cache.backends.db.DatabaseCache",
             "LOCATION": "django_cache",
-        }
+        },
     }
 else:
     CACHES = {
@@ -104,6 +115,19 @@ else:
         }
     }
 
+# Cached SiteSettings/AboutPage/PricingPage snapshots (pages.site_content);
+# saves invalidate them, the timeout is only a safety net.
+SITE_CONTENT_CACHE_TIMEOUT = config("SITE_CONTENT_CACHE_TIMEOUT", cast=int, default=60 * 60 * 24)
+
+# Help article views are buffered per process and flushed this often (seconds).
+HELP_VIEW_FLUSH_INTERVAL = config("HELP_VIEW_FLUSH_INTERVAL", cast=float, default=30.0)
+
+# Per-audience help center landing payload (invalidated on article/category/FAQ changes).
+HELP_CENTER_CACHE_TIMEOUT = config("HELP_CENTER_CACHE_TIMEOUT", cast=int, default=60 * 60)
+
+# sitemap.xml / image-sitemap.xml (invalidated on catalog changes via plans_changed).
+SITEMAP_CACHE_TIMEOUT = config("SITEMAP_CACHE_TIMEOUT", cast=int, default=60 * 60)
+
 # --- Middleware ---
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
@@ -198,6 +222,28 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Partner API keys (api.authentication): cached lookups, buffered usage writes.
+PARTNER_KEY_CACHE_TIMEOUT = config("PARTNER_KEY_CACHE_TIMEOUT", cast=int, default=300)
+PARTNER_KEY_NEGATIVE_CACHE_TIMEOUT = config("PARTNER_KEY_NEGATIVE_CACHE_TIMEOUT", cast=int, default=60)
+PARTNER_KEY_USAGE_FLUSH_INTERVAL = config("PARTNER_KEY_USAGE_FLUSH_INTERVAL", cast=float, default=60.0)
+# The changes feed only serves entries at least this old, so a transaction
+# that took a lower id but committed late is not skipped by a cursor that
+# already moved past it. Keep it above the longest catalog-writing transaction.
+PLAN_CHANGES_SETTLE_SECONDS = config("PLAN_CHANGES_SETTLE_SECONDS", cast=int, default=30)
+# Cache lifetime of the stable /api/embed/widget.js loader; the widget it
+# loads is a fingerprinted static file cached forever.
+EMBED_LOADER_MAX_AGE = config("EMBED_LOADER_MAX_AGE", cast=int, default=60 * 60)
+# Partner webhooks (api.webhooks, delivered by `manage.py deliver_webhooks --loop`,
+# the Procfile worker; run one per deploy, overlapping runs skip locked rows)
+WEBHOOK_BATCH_SIZE = config("WEBHOOK_BATCH_SIZE", cast=int, default=100)
+WEBHOOK_MAX_ATTEMPTS = config("WEBHOOK_MAX_ATTEMPTS", cast=int, default=8)
+WEBHOOK_RETRY_BASE = config("WEBHOOK_RETRY_BASE", cast=float, default=30.0)
+WEBHOOK_RETRY_MAX = config("WEBHOOK_RETRY_MAX", cast=float, default=6 * 60 * 60.0)
+WEBHOOK_CONNECT_TIMEOUT = config("WEBHOOK_CONNECT_TIMEOUT", cast=float, default=3.0)
+WEBHOOK_READ_TIMEOUT = config("WEBHOOK_READ_TIMEOUT", cast=float, default=10.0)
+# Delivered/failed events and delivery logs older than this are pruned.
+WEBHOOK_RETENTION_DAYS = config("WEBHOOK_RETENTION_DAYS", cast=int, default=30)
+
 # ======================================================================
 # Email
 # Strategy (in order):
@@ -316,6 +362,16 @@ RECAPTCHA_MIN_SCORE = float(config("RECAPTCHA_MIN_SCORE", "0.5"))
 RECAPTCHA_ENTERPRISE_API_KEY = config("RECAPTCHA_ENTERPRISE_API_KEY", default="")
 RECAPTCHA_ENTERPRISE_PROJECT_ID = config("RECAPTCHA_ENTERPRISE_PROJECT_ID", default="possible-arch-501217-r3")
 
+# Verification client (core.recaptcha): pooled session, tight timeouts and a
+# circuit breaker. While Google is unreachable, submissions fall back to the
+# local spam gates unless RECAPTCHA_FAIL_OPEN is disabled.
+RECAPTCHA_CONNECT_TIMEOUT = config("RECAPTCHA_CONNECT_TIMEOUT", cast=float, default=1.0)
+RECAPTCHA_READ_TIMEOUT = config("RECAPTCHA_READ_TIMEOUT", cast=float, default=2.0)
+RECAPTCHA_POOL_SIZE = config("RECAPTCHA_POOL_SIZE", cast=int, default=4)
+RECAPTCHA_BREAKER_THRESHOLD = config("RECAPTCHA_BREAKER_THRESHOLD", cast=int, default=5)
+RECAPTCHA_BREAKER_COOLDOWN = config("RECAPTCHA_BREAKER_COOLDOWN", cast=float, default=30.0)
+RECAPTCHA_FAIL_OPEN = config("RECAPTCHA_FAIL_OPEN", cast=bool, default=True)
+
 # --- Testimonial notifications ---
 # The contact view already sends the admin notification on creation,
 # so the signal-based duplicate is disabled by default.
@@ -323,6 +379,13 @@ TESTIMONIAL_NOTIFY_ON_CREATE = config("TESTIMONIAL_NOTIFY_ON_CREATE", cast=bool,
 TESTIMONIAL_THANK_ON_PUBLISH = config("TESTIMONIAL_THANK_ON_PUBLISH", cast=bool, default=True)
 
 PLAN_CHANGE_RATE_LIMIT = config("PLAN_CHANGE_RATE_LIMIT", "3/h")
+
+# --- Rate limiting (core.ratelimit) ---
+# "auto" follows CACHES: Redis -> Lua sliding window, DatabaseCache -> single
+# upsert per check, otherwise in-process. Policies override the defaults in
+# core.ratelimit.default_policies, e.g. {"contact": "10/m", "form": "3/10m, 1/m"}.
+RATE_LIMIT_BACKEND = config("RATE_LIMIT_BACKEND", default="auto")
+RATE_LIMIT_POLICIES: dict[str, str] = {}
 PLAN_CHANGE_MIN_MESSAGE_LEN = int(config("PLAN_CHANGE_MIN_MESSAGE_LEN", "20"))
 
 # --- Logging ---
@@ -2,7 +2,6 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.views.decorators.cache import cache_page
 from django.contrib.sitemaps.views import sitemap as sitemap_view
 
 from config.sitemaps import (
@@ -13,8 +12,9 @@ from config.sitemaps import (
     ResourceSitemap,
     ServicePagesSitemap,
 )
+from core.views import runtime_metrics
 from pages.views import robots_txt, llms_txt
-from plans.seo_views import image_sitemap
+from plans.seo_views import cached_sitemap, image_sitemap
 
 sitemaps = {
     "pages": CorePagesSitemap,
@@ -38,13 +38,16 @@ urlpatterns = [
     # API
     path("api/", include("api.urls")),
 
+    # Staff-only runtime counters (cache tiers, reCAPTCHA, spam gates)
+    path("internal/metrics/", runtime_metrics, name="runtime_metrics"),
+
     # SEO endpoints
     path("robots.txt", robots_txt, name="robots_txt"),
     path("llms.txt", llms_txt, name="llms_txt"),
-    path("image-sitemap.xml", cache_page(60 * 60)(image_sitemap), name="image_sitemap"),
+    path("image-sitemap.xml", cached_sitemap(image_sitemap), name="image_sitemap"),
     path(
         "sitemap.xml",
-        cache_page(60 * 60)(sitemap_view),    # cache for 1 hour
+        cached_sitemap(sitemap_view),    # until the catalog changes, at most 1 hour
         {"sitemaps": sitemaps},
         name="sitemap",
     ),
@@ -0,0 +1,268 @@
+"""
+Two-tier cache backend: a bounded per-process LRU (L1) in front of a shared
+Django cache (L2).
+
+Without Redis the shared tier is ``DatabaseCache``, so every ``cache.get``
+is a SQL query. ``TwoTierCache`` answers hot keys from process memory for a
+few seconds and only falls through to the shared tier on an L1 miss.
+
+Correctness still comes from L2:
+
+* every write goes to L2 first, and L1 entries live at most ``L1_TIMEOUT``
+  seconds;
+* ``delete``, ``delete_many``, ``incr`` and ``clear`` also bump a version
+  key for the key's namespace (the part before the first ``:``) in L2.
+  Workers poll the version keys of the namespaces they hold, at most once
+  per ``VERSION_CHECK_INTERVAL`` seconds and in one ``get_many``, and drop
+  stale namespaces from their L1.
+
+``set``/``add``/``set_many`` don't bump: they are mostly fills after a miss,
+and bumping on them would cost extra L2 writes and wipe every worker's L1
+for busy namespaces. An overwrite with ``set`` therefore reaches other
+workers within ``L1_TIMEOUT``; invalidate with ``delete`` (or move a version
+counter with ``incr``) when that is too slow.
+
+Configuration::
+
+    CACHES = {
+        "default": {
+            "BACKEND": "core.cache.TwoTierCache",
+            "LOCATION": "shared",            # alias of the L2 cache
+            "OPTIONS": {"L1_MAX_ENTRIES": 1000, "L1_TIMEOUT": 5},
+        },
+        "shared": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", ...},
+    }
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+_MISSING = object()
+VERSION_KEY_PREFIX = "__tt_ver"
+GLOBAL_NAMESPACE = "*"
+
+
+class TwoTierCache(BaseCache):
+    def __init__(self, location: str, params: dict[str, Any]):
+        super().__init__(params)
+        options = params.get("OPTIONS") or {}
+        self._shared_alias = location or options.get("SHARED", "shared")
+        self.l1_max_entries = int(options.get("L1_MAX_ENTRIES", 1000))
+        self.l1_timeout = float(options.get("L1_TIMEOUT", 5))
+        self.version_check_interval = float(options.get("VERSION_CHECK_INTERVAL", 1.0))
+        self.l1_bypass_prefixes = tuple(options.get("L1_BYPASS_PREFIXES", ()))
+
+        self._lock = threading.RLock()
+        # l1 key -> (value, expires_at, namespace)
+        self._l1: OrderedDict[str, tuple[Any, float, str]] = OrderedDict()
+        self._ns_versions: dict[str, Any] = {}
+        self._last_version_check = 0.0
+        self._stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+
+    # ── helpers ──────────────────────────────────────────────────────────────
+    @property
+    def shared(self) -> BaseCache:
+        return caches[self._shared_alias]
+
+    @staticmethod
+    def namespace(key: str) -> str:
+        return key.split(":", 1)[0] if ":" in key else ""
+
+    def _version_key(self, namespace: str) -> str:
+        return f"{VERSION_KEY_PREFIX}:{namespace}"
+
+    def _cacheable(self, key: str) -> bool:
+        return self.l1_max_entries > 0 and not key.startswith(self.l1_bypass_prefixes)
+
+    def _l1_get(self, key: str, version: int | None) -> Any:
+        l1_key = self.make_and_validate_key(key, version)
+        with self._lock:
+            entry = self._l1.get(l1_key)
+            if entry is None:
+                return _MISSING
+            value, expires_at, _ = entry
+            if expires_at <= time.monotonic():
+                del self._l1[l1_key]
+                return _MISSING
+            self._l1.move_to_end(l1_key)
+            return value
+
+    def _l1_set(self, key: str, value: Any, version: int | None, timeout: Any = DEFAULT_TIMEOUT) -> None:
+        if not self._cacheable(key):
+            return
+        ttl = self.l1_timeout
+        if timeout is not DEFAULT_TIMEOUT and timeout is not None:
+            if timeout <= 0:
+                self._l1_pop(key, version)
+                return
+            ttl = min(ttl, float(timeout))
+        namespace = self.namespace(key)
+        if namespace not in self._ns_versions:
+            # First entry of this namespace: note its current version so the
+            # next poll can tell a later invalidation from an old one.
+            latest = self.shared.get(self._version_key(namespace))
+            with self._lock:
+                self._ns_versions.setdefault(namespace, latest)
+        l1_key = self.make_and_validate_key(key, version)
+        with self._lock:
+            self._l1[l1_key] = (value, time.monotonic() + ttl, namespace)
+            self._l1.move_to_end(l1_key)
+            while len(self._l1) > self.l1_max_entries:
+                self._l1.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def _l1_pop(self, key: str, version: int | None) -> None:
+        with self._lock:
+            self._l1.pop(self.make_and_validate_key(key, version), None)
+
+    def _bump(self, *namespaces: str) -> None:
+        """Advance the shared version of each namespace (other workers drop their L1 copies)."""
+        for namespace in set(namespaces):
+            vkey = self._version_key(namespace)
+            if self.shared.add(vkey, 1, timeout=None):
+                new_version: Any = 1
+            else:
+                try:
+                    new_version = self.shared.incr(vkey)
+                except ValueError:
+                    self.shared.set(vkey, 1, timeout=None)
+                    new_version = 1
+            with self._lock:
+                self._ns_versions[namespace] = new_version
+
+    def _sync_versions(self) -> None:
+        now = time.monotonic()
+        if now - self._last_version_check < self.version_check_interval:
+            return
+        with self._lock:
+            self._last_version_check = now
+            namespaces = {ns for _, _, ns in self._l1.values()} | {GLOBAL_NAMESPACE}
+        current = self.shared.get_many([self._version_key(ns) for ns in namespaces])
+        with self._lock:
+            stale = set()
+            for ns in namespaces:
+                seen = self._ns_versions.get(ns, _MISSING)
+                latest = current.get(self._version_key(ns))
+                changed = seen is not _MISSING and seen != latest
+                if changed:
+                    stale.add(ns)
+                self._ns_versions[ns] = latest
+            if GLOBAL_NAMESPACE in stale:
+                self._stats["invalidations"] += len(self._l1)
+                self._l1.clear()
+            elif stale:
+                for l1_key in [k for k, (_, _, ns) in self._l1.items() if ns in stale]:
+                    del self._l1[l1_key]
+                    self._stats["invalidations"] += 1
+
+    def _count(self, stat: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[stat] += n
+
+    # ── cache API ────────────────────────────────────────────────────────────
+    def get(self, key, default=None, version=None):
+        self._sync_versions()
+        value = self._l1_get(key, version)
+        if value is not _MISSING:
+            self._count("l1_hits")
+            return value
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            self._count("misses")
+            return default
+        self._count("l2_hits")
+        self._l1_set(key, value, version)
+        return value
+
+    def get_many(self, keys, version=None):
+        self._sync_versions()
+        found, pending = {}, []
+        for key in keys:
+            value = self._l1_get(key, version)
+            if value is _MISSING:
+                pending.append(key)
+            else:
+                found[key] = value
+        self._count("l1_hits", len(found))
+        if pending:
+            fetched = self.shared.get_many(pending, version=version)
+            for key, value in fetched.items():
+                self._l1_set(key, value, version)
+            found.update(fetched)
+            self._count("l2_hits", len(fetched))
+            self._count("misses", len(pending) - len(fetched))
+        return found
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version=version) is not _MISSING
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout=timeout, version=version)
+        self._l1_set(key, value, version, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout=timeout, version=version)
+        if added:
+            self._l1_set(key, value, version, timeout)
+        return added
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout=timeout, version=version)
+        for key, value in data.items():
+            if key not in failed:
+                self._l1_set(key, value, version, timeout)
+        return failed
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout=timeout, version=version)
+
+    def delete(self, key, version=None):
+        self._l1_pop(key, version)
+        deleted = self.shared.delete(key, version=version)
+        self._bump(self.namespace(key))
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        for key in keys:
+            self._l1_pop(key, version)
+        self.shared.delete_many(keys, version=version)
+        self._bump(*(self.namespace(k) for k in keys))
+
+    def incr(self, key, delta=1, version=None):
+        self._l1_pop(key, version)
+        value = self.shared.incr(key, delta, version=version)
+        self._bump(self.namespace(key))
+        return value
+
+    def decr(self, key, delta=1, version=None):
+        return self.incr(key, -delta, version=version)
+
+    def clear(self):
+        with self._lock:
+            self._l1.clear()
+        self.shared.clear()
+        self._bump(GLOBAL_NAMESPACE)
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
+
+    # ── metrics ──────────────────────────────────────────────────────────────
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["l1_entries"] = len(self._l1)
+        lookups = stats["l1_hits"] + stats["l2_hits"] + stats["misses"]
+        stats["l1_hit_ratio"] = round(stats["l1_hits"] / lookups, 4) if lookups else None
+        return stats
+
+    def clear_local(self) -> None:
+        """Drop this process's L1 only (tests, or after out-of-band L2 changes)."""
+        with self._lock:
+            self._l1.clear()
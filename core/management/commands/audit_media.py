@@ -0,0 +1,97 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import media_audit
+
+
+class Command(BaseCommand):
+    help = "Check that every referenced media file exists in storage, is non-empty and (optionally) decodes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model",
+            action="append",
+            default=[],
+            help="Limit to an app label or app_label.Model (repeatable), e.g. plans or pages.ProjectCaseStudyImage",
+        )
+        parser.add_argument(
+            "--decode",
+            action="store_true",
+            help="Also open image files and parse their headers with Pillow",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=media_audit.DEFAULT_WORKERS,
+            help=f"Concurrent storage checks (default: {media_audit.DEFAULT_WORKERS})",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the JSON report to this file ('-' for stdout)",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="List healthy files in the report too, not only problems",
+        )
+        parser.add_argument(
+            "--fail-on-problems",
+            action="store_true",
+            help="Exit with an error when any file is missing, empty, corrupt or unreadable.",
+        )
+
+    def handle(self, *args, **options):
+        fields = media_audit.media_fields(options["model"])
+        if not fields:
+            raise CommandError(f"No media fields match {', '.join(options['model'])}")
+
+        report = media_audit.audit(
+            fields,
+            decode=options["decode"],
+            workers=options["workers"],
+            include_ok=options["all"],
+        )
+        summary = report["summary"]
+        problems = summary["references"] - summary[media_audit.OK]
+
+        output = options["output"]
+        if output == "-":
+            self.stdout.write(json.dumps(report, indent=2, default=str))
+        else:
+            if output:
+                with open(output, "w", encoding="utf-8") as fh:
+                    json.dump(report, fh, indent=2, default=str)
+            self.write_summary(report, output)
+
+        if problems and options["fail_on_problems"]:
+            raise CommandError(f"Media audit found {problems} broken file reference(s).")
+
+    def write_summary(self, report, output):
+        summary = report["summary"]
+        self.stdout.write(self.style.MIGRATE_HEADING("Media files"))
+        for name, counts in report["by_field"].items():
+            broken = sum(n for status, n in counts.items() if status != media_audit.OK)
+            line = f"{name}: {sum(counts.values())} checked"
+            if broken:
+                details = ", ".join(f"{n} {status}" for status, n in sorted(counts.items()) if status != media_audit.OK)
+                self.stdout.write(self.style.WARNING(f"{line}, {details}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"{line}, all ok"))
+
+        for item in report["files"]:
+            if item["status"] != media_audit.OK:
+                detail = f" ({item['detail']})" if item["detail"] else ""
+                self.stdout.write(
+                    self.style.WARNING(f"{item['status'].upper()} {item['model']} #{item['pk']} {item['field']}: {item['name']}{detail}")
+                )
+
+        self.stdout.write(
+            f"{summary['files_checked']} files for {summary['references']} references in "
+            f"{report['elapsed_ms'] / 1000:.2f}s ({summary['files_per_second'] or 0:.0f} files/s, "
+            f"p50 {summary['check_ms_p50'] or 0:.0f} ms, max {summary['check_ms_max'] or 0:.0f} ms)"
+        )
+        if output:
+            self.stdout.write(f"Report written to {output}")
+        if summary["references"] == summary[media_audit.OK]:
+            self.stdout.write(self.style.SUCCESS("Media audit passed."))
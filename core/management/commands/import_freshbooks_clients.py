@@ -1,12 +1,56 @@
 """
 Management command to import clients from Freshbooks CSV export.
 Usage: python manage.py import_freshbooks_clients <csv_file_path>
+
+The CSV is streamed: existing emails and usernames are read once up front,
+username collisions are resolved in memory, and rows are written with
+bulk_create/bulk_update in chunks of --batch-size, each committed on its
+own. If a chunk fails, the rows before it are kept and the command reports
+the --start-row to resume from.
+
+Clients are portal users (auth.User). When the billing app is installed,
+a billing Client record is created for each new user as well.
 """
 import csv
-from django.core.management.base import BaseCommand, CommandError
+import re
+import time
+
+from django.apps import apps
 from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
-from billing.models import Client
+
+
+def client_model():
+    """billing.Client when the billing app is installed, else None."""
+    try:
+        return apps.get_model('billing', 'Client')
+    except LookupError:
+        return None
+
+
+class UsernameAllocator:
+    """Free usernames from an in-memory set of taken ones (no queries per row)."""
+
+    def __init__(self, taken):
+        self.taken = set(taken)
+        self._next = {}
+
+    def allocate(self, base, current=None):
+        if current and (current == base or re.fullmatch(rf'{re.escape(base)}\d+', current)):
+            return current
+        if base not in self.taken:
+            name = base
+        else:
+            counter = self._next.get(base, 1)
+            while f'{base}{counter}' in self.taken:
+                counter += 1
+            self._next[base] = counter + 1
+            name = f'{base}{counter}'
+        self.taken.add(name)
+        if current:
+            self.taken.discard(current)
+        return name
 
 
 class Command(BaseCommand):
@@ -28,172 +72,177 @@ class Command(BaseCommand):
             action='store_true',
             help='Update existing users if email already exists'
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows written (and committed) per chunk (default: 500)'
+        )
+        parser.add_argument(
+            '--start-row',
+            type=int,
+            default=2,
+            help='CSV row to start from, to resume an interrupted import (header is row 1)'
+        )
 
     def handle(self, *args, **options):
         csv_file = options['csv_file']
-        dry_run = options['dry_run']
-        update_existing = options['update']
+        self.dry_run = options['dry_run']
+        self.update_existing = options['update']
+        self.batch_size = max(1, options['batch_size'])
+        start_row = max(2, options['start_row'])
+        self.client_model = client_model()
+
+        self.started = time.monotonic()
+        self.counts = {'rows': 0, 'created': 0, 'updated': 0, 'skipped': 0}
+
+        # One read of what already exists; everything else is resolved in memory.
+        self.existing = {}
+        taken = []
+        for pk, email, username in User.objects.values_list('id', 'email', 'username').iterator(chunk_size=2000):
+            taken.append(username)
+            if email:
+                self.existing.setdefault(email.strip().lower(), (pk, username))
+        self.usernames = UsernameAllocator(taken)
+        self.seen = set()
+        self.creates, self.updates = [], []
+        self.chunk_start = start_row
+        last_row = start_row - 1
 
         try:
             with open(csv_file, 'r', encoding='utf-8') as f:
                 reader = csv.DictReader(f)
-                
-                created_count = 0
-                updated_count = 0
-                skipped_count = 0
-                errors = []
+                for row_num, row in enumerate(reader, start=2):  # Start at 2 (header is row 1)
+                    if row_num < start_row:
+                        continue
+                    last_row = row_num
+                    self.counts['rows'] += 1
+                    self.process_row(row_num, row)
+                    if len(self.creates) + len(self.updates) >= self.batch_size:
+                        self.flush(row_num + 1)
+                self.flush(last_row + 1)
+        except FileNotFoundError:
+            raise CommandError(f'File not found: {csv_file}')
+        except csv.Error as e:
+            raise CommandError(f'Error reading CSV file: {e}')
 
-                with transaction.atomic():
-                    for row_num, row in enumerate(reader, start=2):  # Start at 2 (header is row 1)
-                        try:
-                            email = row.get('Email', '').strip().lower()
-                            first_name = row.get('First Name', '').strip()
-                            last_name = row.get('Last Name', '').strip()
-                            
-                            # Skip rows without email
-                            if not email:
-                                self.stdout.write(
-                                    self.style.WARNING(
-                                        f'Row {row_num}: Skipping - no email address'
-                                    )
-                                )
-                                skipped_count += 1
-                                continue
-                            
-                            # Skip rows without first name
-                            if not first_name:
-                                self.stdout.write(
-                                    self.style.WARNING(
-                                        f'Row {row_num}: Skipping {email} - no first name'
-                                    )
-                                )
-                                skipped_count += 1
-                                continue
-
-                            # Generate username from email (everything before @)
-                            username = email.split('@')[0]
-                            
-                            # Handle duplicate usernames by appending number
-                            base_username = username
-                            counter = 1
-                            while User.objects.filter(username=username).exclude(email=email).exists():
-                                username = f"{base_username}{counter}"
-                                counter += 1
-
-                            # Check if user exists
-                            user_exists = User.objects.filter(email=email).exists()
-                            
-                            if user_exists and not update_existing:
-                                self.stdout.write(
-                                    self.style.WARNING(
-                                        f'Row {row_num}: User {email} already exists (use --update to update)'
-                                    )
-                                )
-                                skipped_count += 1
-                                continue
+        self.summary()
+
+    def process_row(self, row_num, row):
+        email = (row.get('Email') or '').strip().lower()
+        first_name = (row.get('First Name') or '').strip()
+        last_name = (row.get('Last Name') or '').strip()
+
+        if not email:
+            return self.skip(f'Row {row_num}: Skipping - no email address')
+        if not first_name:
+            return self.skip(f'Row {row_num}: Skipping {email} - no first name')
+        if email in self.seen:
+            return self.skip(f'Row {row_num}: Skipping {email} - duplicate of an earlier row')
+        self.seen.add(email)
+
+        base = email.split('@')[0]
+        if email in self.existing:
+            if not self.update_existing:
+                return self.skip(f'Row {row_num}: User {email} already exists (use --update to update)')
+            pk, current = self.existing[email]
+            username = self.usernames.allocate(base, current=current)
+            self.existing[email] = (pk, username)
+            self.updates.append(User(pk=pk, username=username, first_name=first_name, last_name=last_name))
+            self.counts['updated'] += 1
+            return
+
+        user = User(
+            username=self.usernames.allocate(base),
+            email=email,
+            first_name=first_name,
+            last_name=last_name,
+            is_active=True,
+            is_staff=False,
+            is_superuser=False,
+        )
+        # Unusable password - users will need to reset
+        user.set_unusable_password()
+        self.creates.append(user)
+        self.counts['created'] += 1
+
+    def skip(self, message):
+        self.counts['skipped'] += 1
+        self.stdout.write(self.style.WARNING(message))
+
+    def flush(self, next_row):
+        """Write the pending chunk in one transaction; ``next_row`` is the first row after it."""
+        creates, updates = self.creates, self.updates
+        self.creates, self.updates = [], []
+        if not (creates or updates):
+            self.chunk_start = next_row
+            return
 
-                            if dry_run:
-                                action = "UPDATE" if user_exists else "CREATE"
-                                self.stdout.write(
-                                    f'[DRY RUN] {action}: {first_name} {last_name} ({email})'
+        if not self.dry_run:
+            try:
+                with transaction.atomic():
+                    created = User.objects.bulk_create(creates, batch_size=self.batch_size)
+                    if self.client_model is not None and created:
+                        self.client_model.objects.bulk_create(
+                            [
+                                self.client_model(
+                                    user=user, first_name=user.first_name, last_name=user.last_name, email=user.email
                                 )
-                                if user_exists:
-                                    updated_count += 1
-                                else:
-                                    created_count += 1
-                            else:
-                                if user_exists and update_existing:
-                                    # Update existing user
-                                    user = User.objects.get(email=email)
-                                    user.first_name = first_name
-                                    user.last_name = last_name
-                                    user.username = username
-                                    user.save()
-                                    
-                                    self.stdout.write(
-                                        self.style.SUCCESS(
-                                            f'Row {row_num}: Updated {first_name} {last_name} ({email})'
-                                        )
-                                    )
-                                    updated_count += 1
-                                else:
-                                    # Create new user
-                                    user = User.objects.create_user(
-                                        username=username,
-                                        email=email,
-                                        first_name=first_name,
-                                        last_name=last_name,
-                                        is_active=True,
-                                        is_staff=False,
-                                        is_superuser=False
-                                    )
-                                    # Set unusable password - users will need to reset
-                                    user.set_unusable_password()
-                                    user.save()
-                                    
-                                    # Create corresponding Client record
-                                    Client.objects.create(
-                                        user=user,
-                                        first_name=first_name,
-                                        last_name=last_name,
-                                        email=email
-                                    )
-                                    
-                                    self.stdout.write(
-                                        self.style.SUCCESS(
-                                            f'Row {row_num}: Created {first_name} {last_name} ({email})'
-                                        )
-                                    )
-                                    created_count += 1
-
-                        except Exception as e:
-                            error_msg = f'Row {row_num}: Error processing {row.get("Email", "unknown")} - {str(e)}'
-                            errors.append(error_msg)
-                            self.stdout.write(self.style.ERROR(error_msg))
-
-                    # If dry run, rollback transaction
-                    if dry_run:
-                        transaction.set_rollback(True)
-
-                # Summary
-                self.stdout.write('\n' + '='*60)
-                if dry_run:
-                    self.stdout.write(self.style.WARNING('DRY RUN - No changes made to database'))
-                
-                self.stdout.write(f'Created: {created_count}')
-                self.stdout.write(f'Updated: {updated_count}')
-                self.stdout.write(f'Skipped: {skipped_count}')
-                self.stdout.write(f'Errors: {len(errors)}')
-                self.stdout.write('='*60)
-
-                if errors:
-                    self.stdout.write(self.style.ERROR('\nErrors encountered:'))
-                    for error in errors:
-                        self.stdout.write(self.style.ERROR(f'  - {error}'))
-
-                if dry_run:
-                    self.stdout.write(
-                        self.style.WARNING(
-                            '\nRun without --dry-run to actually import the data'
-                        )
-                    )
-                else:
-                    self.stdout.write(
-                        self.style.SUCCESS(
-                            f'\n✅ Successfully imported {created_count + updated_count} clients!'
-                        )
-                    )
-                    if created_count > 0:
-                        self.stdout.write(
-                            self.style.WARNING(
-                                '\n⚠️  Note: New users have no password set. '
-                                'They will need to use password reset to access their accounts.'
-                            )
+                                for user in created
+                            ],
+                            batch_size=self.batch_size,
                         )
+                    User.objects.bulk_update(updates, ['username', 'first_name', 'last_name'], batch_size=self.batch_size)
+            except Exception as e:
+                done_created = self.counts['created'] - len(creates)
+                done_updated = self.counts['updated'] - len(updates)
+                raise CommandError(
+                    f'Chunk starting at row {self.chunk_start} failed ({e}); rows before it were imported '
+                    f'({done_created} created, {done_updated} updated). Resume with --start-row {self.chunk_start}'
+                )
 
-        except FileNotFoundError:
-            raise CommandError(f'File not found: {csv_file}')
-        except csv.Error as e:
-            raise CommandError(f'Error reading CSV file: {e}')
-        except Exception as e:
-            raise CommandError(f'Unexpected error: {e}')
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(
+            f'{"[DRY RUN] " if self.dry_run else ""}Rows {self.chunk_start}-{next_row - 1}: '
+            f'{len(creates)} created, {len(updates)} updated '
+            f'({self.counts["rows"] / elapsed if elapsed else 0:.0f} rows/s)'
+        )
+        self.chunk_start = next_row
+
+    def summary(self):
+        elapsed = time.monotonic() - self.started
+        counts = self.counts
+
+        self.stdout.write('\n' + '='*60)
+        if self.dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN - No changes made to database'))
+
+        self.stdout.write(f'Created: {counts["created"]}')
+        self.stdout.write(f'Updated: {counts["updated"]}')
+        self.stdout.write(f'Skipped: {counts["skipped"]}')
+        self.stdout.write(
+            f'Rows: {counts["rows"]} in {elapsed:.2f}s ({counts["rows"] / elapsed if elapsed else 0:.0f} rows/s)'
+        )
+        if self.client_model is None:
+            self.stdout.write('Billing app not installed: created portal users only (no Client records)')
+        self.stdout.write('='*60)
+
+        if self.dry_run:
+            self.stdout.write(
+                self.style.WARNING(
+                    '\nRun without --dry-run to actually import the data'
+                )
+            )
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\n✅ Successfully imported {counts["created"] + counts["updated"]} clients!'
+            )
+        )
+        if counts['created'] > 0:
+            self.stdout.write(
+                self.style.WARNING(
+                    '\n⚠️  Note: New users have no password set. '
+                    'They will need to use password reset to access their accounts.'
+                )
+            )
@@ -0,0 +1,162 @@
+"""
+Media integrity audit.
+
+Every file referenced by a ``FileField``/``ImageField`` (plan main and
+gallery images, case-study images, style images, logos, attachments, ...)
+is checked against its field's storage: that it exists, that it is not
+empty and, with ``decode=True``, that image files open with Pillow (only
+the header is parsed). Checks run on a bounded thread pool, since each one
+is a network round trip on S3; a file referenced by several rows is checked
+once. Workers only talk to storage; the references are read up front by
+the calling thread.
+
+``audit()`` returns a JSON-serializable report with per-file timings, for
+``manage.py audit_media``.
+"""
+from __future__ import annotations
+
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Iterable, Iterator
+
+from django.apps import apps
+from django.db import models
+from django.utils import timezone
+
+DEFAULT_WORKERS = 16
+OK = "ok"
+MISSING = "missing"
+EMPTY = "empty"
+CORRUPT = "corrupt"
+ERROR = "error"
+
+
+@dataclass
+class MediaCheck:
+    model: str
+    pk: object
+    field: str
+    name: str
+    status: str = OK
+    size: int | None = None
+    ms: float = 0.0
+    detail: str = ""
+
+
+def media_fields(labels: Iterable[str] = ()) -> list[tuple[type[models.Model], models.FileField]]:
+    """``(model, field)`` for every stored file field, optionally limited to ``app_label[.Model]`` labels."""
+    labels = [label.lower() for label in labels]
+    found = []
+    for model in apps.get_models():
+        opts = model._meta
+        if labels and not any(label in (opts.app_label, opts.label_lower) for label in labels):
+            continue
+        found += [(model, f) for f in opts.concrete_fields if isinstance(f, models.FileField)]
+    return found
+
+
+def references(fields) -> Iterator[MediaCheck]:
+    """One unchecked ``MediaCheck`` per row with a file set, streamed in chunks."""
+    for model, f in fields:
+        rows = (
+            model._default_manager.exclude(**{f.attname: ""})
+            .exclude(**{f"{f.attname}__isnull": True})
+            .order_by("pk")
+            .values_list("pk", f.attname)
+        )
+        for pk, name in rows.iterator(chunk_size=2000):
+            yield MediaCheck(model=model._meta.label, pk=pk, field=f.name, name=name)
+
+
+def _decode(storage, name: str) -> str:
+    from PIL import Image
+
+    with storage.open(name, "rb") as fh:
+        with Image.open(fh) as image:  # parses the header only
+            return f"{image.format} {image.width}x{image.height}"
+
+
+def check_file(storage, name: str, *, decode: bool = False) -> tuple[str, int | None, str]:
+    """``(status, size, detail)`` for one stored file."""
+    try:
+        size = storage.size(name)
+    except Exception as exc:
+        # One round trip in the common case; only failures ask whether the file is there.
+        try:
+            exists = storage.exists(name)
+        except Exception:
+            exists = True
+        return (ERROR, None, str(exc)) if exists else (MISSING, None, "")
+    if not size:
+        return EMPTY, 0, ""
+    if decode:
+        try:
+            return OK, size, _decode(storage, name)
+        except Exception as exc:
+            return CORRUPT, size, f"{type(exc).__name__}: {exc}"
+    return OK, size, ""
+
+
+def audit(
+    fields=None,
+    *,
+    decode: bool = False,
+    workers: int = DEFAULT_WORKERS,
+    include_ok: bool = False,
+) -> dict:
+    """Check every file referenced by ``fields`` (default: all media fields) and return the report."""
+    fields = media_fields() if fields is None else fields
+    storages = {(model._meta.label, f.name): f.storage for model, f in fields}
+    image_fields = {(model._meta.label, f.name) for model, f in fields if isinstance(f, models.ImageField)}
+    started_at = timezone.now()
+    started = time.monotonic()
+
+    refs = list(references(fields))
+    unique: dict[tuple[int, str], tuple[object, str, bool]] = {}
+    for ref in refs:
+        storage = storages[(ref.model, ref.field)]
+        key = (id(storage), ref.name)
+        decode_this = decode and (ref.model, ref.field) in image_fields
+        if key not in unique or (decode_this and not unique[key][2]):
+            unique[key] = (storage, ref.name, decode_this)
+
+    def timed(item):
+        storage, name, decode_this = item
+        t0 = time.monotonic()
+        status, size, detail = check_file(storage, name, decode=decode_this)
+        return status, size, detail, (time.monotonic() - t0) * 1000
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="media-audit") as pool:
+        results = dict(zip(unique, pool.map(timed, unique.values())))
+
+    counts = Counter()
+    by_field: dict[str, Counter] = {}
+    files = []
+    for ref in refs:
+        status, size, detail, ms = results[(id(storages[(ref.model, ref.field)]), ref.name)]
+        ref.status, ref.size, ref.detail, ref.ms = status, size, detail, round(ms, 1)
+        counts[status] += 1
+        by_field.setdefault(f"{ref.model}.{ref.field}", Counter())[status] += 1
+        if include_ok or status != OK:
+            files.append(asdict(ref))
+
+    timings = sorted(r[3] for r in results.values())
+    elapsed = time.monotonic() - started
+    return {
+        "started_at": started_at.isoformat(),
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "workers": workers,
+        "decode": decode,
+        "summary": {
+            "references": len(refs),
+            "files_checked": len(results),
+            "files_per_second": round(len(results) / elapsed, 1) if elapsed else None,
+            "check_ms_p50": round(timings[len(timings) // 2], 1) if timings else None,
+            "check_ms_max": round(timings[-1], 1) if timings else None,
+            **{status: counts[status] for status in (OK, MISSING, EMPTY, CORRUPT, ERROR)},
+        },
+        "by_field": {name: dict(c) for name, c in sorted(by_field.items())},
+        "files": files,
+    }
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_seed_freshbooks_clients'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateLimitWindow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=200)),
+                ('window_start', models.BigIntegerField(help_text='Unix time the window began')),
+                ('period', models.PositiveIntegerField(help_text='Window length in seconds')),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('expires_at', models.BigIntegerField(db_index=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('key', 'window_start'), name='core_ratelimit_key_window')],
+            },
+        ),
+    ]
@@ -1,3 +1,24 @@
 from django.db import models
 
-# Create your models here.
+
+class RateLimitWindow(models.Model):
+    """
+    Fixed-window hit counter used by ``core.ratelimit`` when the shared cache
+    is the database. Each check upserts the current window and reads the
+    previous one in a single statement; the two are blended into a sliding
+    window estimate.
+    """
+
+    key = models.CharField(max_length=200)
+    window_start = models.BigIntegerField(help_text="Unix time the window began")
+    period = models.PositiveIntegerField(help_text="Window length in seconds")
+    hits = models.PositiveIntegerField(default=0)
+    expires_at = models.BigIntegerField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["key", "window_start"], name="core_ratelimit_key_window"),
+        ]
+
+    def __str__(self):
+        return f"{self.key} @ {self.window_start}: {self.hits}"
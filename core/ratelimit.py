@@ -0,0 +1,309 @@
+"""
+Sliding-window rate limiting shared by view decorators and form throttles.
+
+Every check is one atomic round trip to the shared store:
+
+* Redis (``CACHES["default"]`` is ``RedisCache``): a Lua script keeps a sorted
+  set per window, trims it, adds the hit and returns the counts for every
+  window of the policy in a single ``EVALSHA``.
+* Database cache: one ``INSERT ... ON CONFLICT DO UPDATE ... RETURNING``
+  statement bumps the current fixed window for every rate of the policy and
+  returns the previous window's count, which is blended into a sliding
+  estimate.
+* Anything else (locmem in dev): an in-process sliding log.
+
+Policies are named rate lists such as ``"5/m"`` or ``"3/10m, 1/m"``; defaults
+live in :func:`default_policies` and can be overridden per name through
+``settings.RATE_LIMIT_POLICIES``.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from functools import lru_cache, wraps
+from typing import Callable, Iterable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.db import connection
+from django.dispatch import receiver
+from django.http import HttpRequest
+
+from core.utils import get_client_ip
+
+logger = logging.getLogger(__name__)
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+_RATE_RE = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*([smhd])\s*$")
+
+
+@dataclass(frozen=True)
+class Rate:
+    limit: int
+    period: int  # seconds
+
+    def __str__(self) -> str:
+        return f"{self.limit}/{self.period}s"
+
+
+@lru_cache(maxsize=64)
+def parse_rates(spec: str) -> tuple[Rate, ...]:
+    """Parse ``"3/10m, 1/60s"`` into rates. Units: s, m, h, d (optionally multiplied)."""
+    rates = []
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        match = _RATE_RE.match(part)
+        if not match:
+            raise ValueError(f"Invalid rate {part!r}; expected e.g. '5/m' or '3/10m'")
+        limit, multiplier, unit = match.groups()
+        rates.append(Rate(int(limit), int(multiplier or 1) * _UNITS[unit]))
+    return tuple(rates)
+
+
+def default_policies() -> dict[str, str]:
+    window = int(getattr(settings, "FORM_THROTTLE_WINDOW_SECONDS", 600))
+    max_attempts = int(getattr(settings, "FORM_THROTTLE_MAX_ATTEMPTS", 3))
+    burst_window = int(getattr(settings, "FORM_THROTTLE_BURST_WINDOW_SECONDS", 60))
+    burst_max = int(getattr(settings, "FORM_THROTTLE_BURST_MAX_ATTEMPTS", 1))
+    return {
+        # Per-IP view limits (previously literal django_ratelimit decorator rates)
+        "contact": "5/m",
+        "web_contact": "5/m",
+        "email_saved_plans": "3/h",
+        "plan_comment": getattr(settings, "PLAN_CHANGE_RATE_LIMIT", "3/h"),
+        # Per-IP, per-form submission throttle (wide + burst window)
+        "form": f"{max_attempts}/{window}s, {burst_max}/{burst_window}s",
+    }
+
+
+def get_policy(name: str) -> tuple[Rate, ...]:
+    overrides = getattr(settings, "RATE_LIMIT_POLICIES", None) or {}
+    spec = overrides.get(name) or default_policies().get(name)
+    if spec is None:
+        raise KeyError(f"Unknown rate limit policy {name!r}")
+    if not isinstance(spec, str):
+        spec = ", ".join(spec)
+    return parse_rates(spec)
+
+
+@dataclass
+class RateLimitResult:
+    limited: bool
+    counts: list[tuple[Rate, float]]
+
+    @property
+    def retry_after(self) -> int:
+        """Seconds of the longest window that is currently exceeded (0 when not limited)."""
+        return max((r.period for r, c in self.counts if c > r.limit), default=0)
+
+
+# ── backends ─────────────────────────────────────────────────────────────────
+class LocalBackend:
+    """In-process sliding log; correct within one process only (dev/tests)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hits: dict[str, deque[float]] = defaultdict(deque)
+
+    def hit(self, key: str, rates: Iterable[Rate], now: float) -> list[float]:
+        counts = []
+        with self._lock:
+            for rate in rates:
+                log = self._hits[f"{key}:{rate.period}"]
+                while log and log[0] <= now - rate.period:
+                    log.popleft()
+                log.append(now)
+                counts.append(float(len(log)))
+        return counts
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hits.clear()
+
+
+class RedisBackend:
+    SCRIPT = """
+local now = tonumber(ARGV[1])
+local member = ARGV[2]
+local out = {}
+for i, key in ipairs(KEYS) do
+  local period = tonumber(ARGV[2 + i])
+  redis.call('ZREMRANGEBYSCORE', key, '-inf', now - period)
+  redis.call('ZADD', key, now, member)
+  redis.call('PEXPIRE', key, period)
+  out[i] = redis.call('ZCARD', key)
+end
+return out
+"""
+
+    def __init__(self, redis_cache):
+        self.cache = redis_cache
+        self._script = None
+
+    def hit(self, key: str, rates: Iterable[Rate], now: float) -> list[float]:
+        rates = list(rates)
+        keys = [self.cache.make_and_validate_key(f"rl:{key}:{r.period}") for r in rates]
+        client = self.cache._cache.get_client(keys[0], write=True)
+        if self._script is None:
+            self._script = client.register_script(self.SCRIPT)
+        now_ms = int(now * 1000)
+        args = [now_ms, f"{now_ms}-{uuid.uuid4().hex[:8]}", *[r.period * 1000 for r in rates]]
+        return [float(c) for c in self._script(keys=keys, args=args, client=client)]
+
+
+class DatabaseBackend:
+    """Fixed windows in ``core.RateLimitWindow`` blended into a sliding estimate."""
+
+    PRUNE_EVERY = 500
+
+    def __init__(self):
+        self._calls = 0
+
+    def hit(self, key: str, rates: Iterable[Rate], now: float) -> list[float]:
+        from core.models import RateLimitWindow
+
+        rates = list(rates)
+        qn = connection.ops.quote_name
+        table = qn(RateLimitWindow._meta.db_table)
+        now_i = int(now)
+        rows, params = [], []
+        for rate in rates:
+            window_start = now_i - now_i % rate.period
+            rows.append("(%s, %s, %s, 1, %s)")
+            params += [f"{key}:{rate.period}", window_start, rate.period, window_start + 2 * rate.period]
+
+        sql = (
+            f"INSERT INTO {table} ({qn('key')}, {qn('window_start')}, {qn('period')}, {qn('hits')}, {qn('expires_at')}) "
+            f"VALUES {', '.join(rows)} "
+            f"ON CONFLICT ({qn('key')}, {qn('window_start')}) DO UPDATE SET {qn('hits')} = {table}.{qn('hits')} + 1 "
+            f"RETURNING {table}.{qn('key')}, {table}.{qn('window_start')}, {table}.{qn('hits')}, "
+            f"(SELECT p.{qn('hits')} FROM {table} p WHERE p.{qn('key')} = {table}.{qn('key')} "
+            f"AND p.{qn('window_start')} = {table}.{qn('window_start')} - {table}.{qn('period')})"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            returned = {row[0]: row[1:] for row in cursor.fetchall()}
+
+        counts = []
+        for rate in rates:
+            window_start, current, previous = returned[f"{key}:{rate.period}"]
+            weight = 1.0 - (now - window_start) / rate.period
+            counts.append(current + (previous or 0) * max(weight, 0.0))
+
+        self._calls += 1
+        if self._calls % self.PRUNE_EVERY == 0:
+            RateLimitWindow.objects.filter(expires_at__lt=now_i).delete()
+        return counts
+
+
+_local_backend = LocalBackend()
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _select_backend()
+    return _backend
+
+
+def _select_backend():
+    from django.core.cache.backends.db import DatabaseCache
+    from django.core.cache.backends.redis import RedisCache
+
+    from core.cache import TwoTierCache
+
+    shared = caches["default"]
+    if isinstance(shared, TwoTierCache):
+        shared = shared.shared  # count in the shared tier, never in per-process L1
+    choice = (getattr(settings, "RATE_LIMIT_BACKEND", "auto") or "auto").lower()
+    if choice == "redis" or (choice == "auto" and isinstance(shared, RedisCache)):
+        return RedisBackend(shared)
+    if choice == "db" or (choice == "auto" and isinstance(shared, DatabaseCache)):
+        return DatabaseBackend()
+    return _local_backend
+
+
+def reset_backend() -> None:
+    global _backend
+    with _backend_lock:
+        _backend = None
+    _local_backend.clear()
+
+
+@receiver(setting_changed)
+def _reset_on_setting_change(sender, setting, **kwargs):
+    if setting in ("CACHES", "RATE_LIMIT_BACKEND"):
+        reset_backend()
+
+
+# ── public API ───────────────────────────────────────────────────────────────
+def hit(policy: str, identity: str) -> RateLimitResult:
+    """Record one hit for ``identity`` under ``policy`` and report whether it is over any rate."""
+    rates = get_policy(policy)
+    digest = hashlib.sha1(identity.encode("utf-8")).hexdigest()[:20]
+    try:
+        counts = get_backend().hit(f"{policy}:{digest}", rates, time.time())
+    except Exception:
+        if getattr(settings, "RATE_LIMIT_FAIL_OPEN", True):
+            logger.exception("Rate limit backend failed for policy %s; allowing request", policy)
+            return RateLimitResult(False, [])
+        raise
+    pairs = list(zip(rates, counts))
+    return RateLimitResult(any(c > r.limit for r, c in pairs), pairs)
+
+
+def _identity(request: HttpRequest, key: str | Callable[[HttpRequest], str]) -> str:
+    if callable(key):
+        return str(key(request))
+    if key == "ip":
+        return get_client_ip(request) or "unknown"
+    if key == "user_or_ip":
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            return f"user:{user.pk}"
+        return get_client_ip(request) or "unknown"
+    raise ValueError(f"Unsupported rate limit key {key!r}")
+
+
+def ratelimit(policy: str, key: str | Callable[[HttpRequest], str] = "ip", block: bool = True):
+    """
+    View decorator with django_ratelimit semantics: sets ``request.limited``
+    and, when ``block`` is true, raises ``django_ratelimit``'s ``Ratelimited``
+    (a ``PermissionDenied``) so existing 403 handling still applies.
+    """
+
+    def decorator(fn):
+        @wraps(fn)
+        def _wrapped(request, *args, **kwargs):
+            if getattr(settings, "RATELIMIT_ENABLE", True):
+                limited = hit(policy, _identity(request, key)).limited
+            else:
+                limited = False
+            request.limited = limited or getattr(request, "limited", False)
+            if limited and block:
+                from django_ratelimit.exceptions import Ratelimited
+
+                raise Ratelimited()
+            return fn(request, *args, **kwargs)
+
+        return _wrapped
+
+    return decorator
+
+
+def is_rate_limited(request: HttpRequest, policy: str, scope: str = "", key="ip") -> bool:
+    """Form-throttle helper: count this submission and report whether it is over the policy."""
+    identity = _identity(request, key)
+    return hit(policy, f"{scope}:{identity}" if scope else identity).limited
@@ -0,0 +1,259 @@
+"""
+Pooled, circuit-broken HTTP client for reCAPTCHA verification.
+
+Every form POST that carries a reCAPTCHA token calls out to Google. A bare
+``requests.post`` opens a fresh TCP+TLS connection each time and, with a long
+timeout, lets a slow upstream stall every worker serving a form. This module
+keeps one ``requests.Session`` per process (so connections are reused), applies
+tight connect/read timeouts, records latency/outcome metrics and trips a
+circuit breaker after repeated upstream failures. While the breaker is open
+calls are short-circuited and the caller degrades to the local spam gates
+(honeypot, timing token, throttle).
+
+Endpoints are configurable so tests can point the client at a local server.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENTERPRISE_ENDPOINT = "https://recaptchaenterprise.googleapis.com/v1"
+DEFAULT_VERIFY_URL = "https://www.google.com/recaptcha/api/siteverify"
+
+
+class RecaptchaUnavailable(Exception):
+    """Raised when the verification upstream can't give a usable answer."""
+
+
+class CircuitBreaker:
+    """
+    Minimal thread-safe breaker: closed -> open after ``threshold`` consecutive
+    failures, open -> half-open once ``cooldown`` seconds pass (one trial call
+    is let through), half-open -> closed on success or back to open on failure.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0, clock=time.monotonic):
+        self.threshold = max(1, int(threshold))
+        self.cooldown = float(cooldown)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state_locked()
+
+    def _state_locked(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.cooldown:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state_locked()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.threshold:
+                if self._opened_at is None or self._trial_in_flight:
+                    logger.warning(
+                        "reCAPTCHA circuit opened after %s failure(s); cooling down %.0fs",
+                        self._failures, self.cooldown,
+                    )
+                self._opened_at = self._clock()
+            self._trial_in_flight = False
+
+
+class RecaptchaClient:
+    """Process-wide verification client; use :func:`get_client`."""
+
+    LATENCY_WINDOW = 256
+
+    def __init__(
+        self,
+        *,
+        connect_timeout: float = 1.0,
+        read_timeout: float = 2.0,
+        pool_size: int = 4,
+        breaker: CircuitBreaker | None = None,
+    ):
+        self.timeout = (float(connect_timeout), float(read_timeout))
+        self.pool_size = max(1, int(pool_size))
+        self.breaker = breaker or CircuitBreaker()
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._counts: dict[str, int] = {}
+        self._latencies: deque[float] = deque(maxlen=self.LATENCY_WINDOW)
+
+    # ── transport ────────────────────────────────────────────────────────────
+    @property
+    def session(self):
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests  # type: ignore
+                    from requests.adapters import HTTPAdapter  # type: ignore
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=self.pool_size,
+                        pool_maxsize=self.pool_size,
+                        max_retries=0,
+                    )
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+
+    def close(self) -> None:
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def post_json(self, url: str, **kwargs: Any) -> dict[str, Any]:
+        """
+        POST to ``url`` and return the decoded JSON body.
+
+        Raises :class:`RecaptchaUnavailable` on timeouts, connection errors,
+        5xx responses, undecodable bodies, or while the breaker is open.
+        """
+        if not self.breaker.allow():
+            self._count("short_circuit")
+            raise RecaptchaUnavailable("circuit open")
+
+        import requests  # type: ignore
+
+        started = time.perf_counter()
+        try:
+            resp = self.session.post(url, timeout=self.timeout, **kwargs)
+            if resp.status_code >= 500:
+                raise RecaptchaUnavailable(f"upstream returned HTTP {resp.status_code}")
+            data = resp.json()
+            if not isinstance(data, dict):
+                raise RecaptchaUnavailable("unexpected response body")
+        except requests.Timeout as exc:
+            self._fail("timeout", started)
+            raise RecaptchaUnavailable("timed out") from exc
+        except RecaptchaUnavailable:
+            self._fail("error", started)
+            raise
+        except Exception as exc:  # connection errors, bad JSON, ...
+            self._fail("error", started)
+            raise RecaptchaUnavailable(str(exc) or exc.__class__.__name__) from exc
+
+        self._observe(started)
+        self._count("ok")
+        self.breaker.record_success()
+        return data
+
+    # ── metrics ──────────────────────────────────────────────────────────────
+    def _fail(self, outcome: str, started: float) -> None:
+        self._observe(started)
+        self._count(outcome)
+        self.breaker.record_failure()
+
+    def _count(self, outcome: str) -> None:
+        with self._metrics_lock:
+            self._counts[outcome] = self._counts.get(outcome, 0) + 1
+
+    def _observe(self, started: float) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        with self._metrics_lock:
+            self._latencies.append(elapsed_ms)
+
+    def metrics(self) -> dict[str, Any]:
+        """Snapshot of outcome counters, recent latency percentiles and breaker state."""
+        with self._metrics_lock:
+            counts = dict(self._counts)
+            samples = sorted(self._latencies)
+
+        def pct(p: float) -> float | None:
+            if not samples:
+                return None
+            idx = min(len(samples) - 1, int(round(p * (len(samples) - 1))))
+            return round(samples[idx], 2)
+
+        return {
+            "counts": counts,
+            "latency_ms": {"p50": pct(0.5), "p95": pct(0.95), "max": pct(1.0), "samples": len(samples)},
+            "breaker": self.breaker.state,
+        }
+
+
+# ── process-wide instance ────────────────────────────────────────────────────
+_client: RecaptchaClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> RecaptchaClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = RecaptchaClient(
+                    connect_timeout=getattr(settings, "RECAPTCHA_CONNECT_TIMEOUT", 1.0),
+                    read_timeout=getattr(settings, "RECAPTCHA_READ_TIMEOUT", 2.0),
+                    pool_size=getattr(settings, "RECAPTCHA_POOL_SIZE", 4),
+                    breaker=CircuitBreaker(
+                        threshold=getattr(settings, "RECAPTCHA_BREAKER_THRESHOLD", 5),
+                        cooldown=getattr(settings, "RECAPTCHA_BREAKER_COOLDOWN", 30.0),
+                    ),
+                )
+    return _client
+
+
+def reset_client() -> None:
+    """Drop the shared client (closing its pool); the next call rebuilds it from settings."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+
+
+def enterprise_assessment_url(project_id: str) -> str:
+    base = (getattr(settings, "RECAPTCHA_ENTERPRISE_ENDPOINT", "") or DEFAULT_ENTERPRISE_ENDPOINT).rstrip("/")
+    return f"{base}/projects/{project_id}/assessments"
+
+
+def siteverify_url() -> str:
+    return getattr(settings, "RECAPTCHA_VERIFY_URL", "") or DEFAULT_VERIFY_URL
+
+
+@receiver(setting_changed)
+def _reset_on_setting_change(sender, setting, **kwargs):
+    if setting.startswith("RECAPTCHA_"):
+        reset_client()
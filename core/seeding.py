@@ -0,0 +1,193 @@
+"""
+Idempotent bulk seeding for management commands.
+
+Seed commands describe their rows declaratively, as dicts keyed by a
+natural key (``slug``, ``("category", "title")``, ...). ``seed()`` reads
+the matching rows in one query, diffs each record against them and writes
+only what changed: new rows with one ``bulk_create`` (an upsert on the key
+when the key is unique, so concurrent seeds don't collide) and changed
+rows with one ``bulk_update`` of just the changed fields. Re-running a seed
+is a read and nothing else.
+
+Bulk writes skip ``save()`` and model signals. ``prepare`` runs on every
+object about to be written (for derived fields the model would normally
+fill in on save), and callers apply any other side effects from the
+returned ``SeedResult``.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Mapping, Sequence
+
+from django.db import models, transaction
+from django.utils import timezone
+
+
+@dataclass
+class SeedResult:
+    model: type[models.Model]
+    key: tuple[str, ...]
+    created: list[models.Model] = field(default_factory=list)
+    updated: list[models.Model] = field(default_factory=list)
+    unchanged: list[models.Model] = field(default_factory=list)
+    changed_fields: dict[Any, list[str]] = field(default_factory=dict)
+
+    @property
+    def objects(self) -> list[models.Model]:
+        return self.created + self.updated + self.unchanged
+
+    def by_key(self) -> dict[Any, models.Model]:
+        """Every seeded object by natural key (a bare value for single-field keys)."""
+        return {_unwrap(natural_key(obj, self.key)): obj for obj in self.objects}
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.created or self.updated)
+
+    def summary(self) -> str:
+        name = self.model._meta.verbose_name_plural
+        return f"{name}: {len(self.created)} created, {len(self.updated)} updated, {len(self.unchanged)} unchanged"
+
+    def lines(self) -> list[str]:
+        """One line per created (+) or updated (~) object."""
+        out = [f"  + {obj}" for obj in self.created]
+        for obj in self.updated:
+            fields = ", ".join(self.changed_fields.get(_unwrap(natural_key(obj, self.key)), ()))
+            out.append(f"  ~ {obj} ({fields})")
+        return out
+
+
+def _unwrap(key: tuple):
+    return key[0] if len(key) == 1 else key
+
+
+def _attname(model: type[models.Model], name: str) -> str:
+    return model._meta.get_field(name).attname
+
+
+def natural_key(obj: models.Model, key: Sequence[str]) -> tuple:
+    return tuple(getattr(obj, _attname(type(obj), name)) for name in key)
+
+
+def _normalize(model: type[models.Model], record: Mapping[str, Any]) -> dict[str, Any]:
+    """Record values by attname, with related objects replaced by their pk."""
+    out = {}
+    for name, value in record.items():
+        f = model._meta.get_field(name)
+        if f.is_relation and isinstance(value, models.Model):
+            value = value.pk
+        out[f.attname] = value
+    return out
+
+
+def _key_is_unique(model: type[models.Model], key: tuple[str, ...]) -> bool:
+    opts = model._meta
+    if len(key) == 1 and opts.get_field(key[0]).unique:
+        return True
+    together = [tuple(fields) for fields in opts.unique_together]
+    together += [
+        tuple(c.fields) for c in opts.constraints
+        if isinstance(c, models.UniqueConstraint) and c.condition is None and c.fields
+    ]
+    return any(set(fields) == set(key) for fields in together)
+
+
+def seed(
+    model: type[models.Model],
+    records: Iterable[Mapping[str, Any]],
+    *,
+    key: str | Sequence[str],
+    update: bool | Sequence[str] = True,
+    prepare: Callable[[models.Model], Any] | None = None,
+    prepared_fields: Sequence[str] = (),
+    queryset: models.QuerySet | None = None,
+    dry_run: bool = False,
+) -> SeedResult:
+    """
+    Make the rows of ``model`` match ``records`` (matched on ``key``).
+
+    ``update`` controls existing rows: True compares every field in the
+    record, a list of names compares only those, False leaves them alone.
+    ``prepare(obj)`` runs on objects about to be written; list the fields it
+    sets in ``prepared_fields`` so updates include them.
+    """
+    key = (key,) if isinstance(key, str) else tuple(key)
+    key_attnames = [_attname(model, name) for name in key]
+    rows = [_normalize(model, r) for r in records]
+    result = SeedResult(model=model, key=key)
+
+    wanted_keys = {tuple(row[a] for a in key_attnames) for row in rows}
+    if len(wanted_keys) != len(rows):
+        raise ValueError(f"Duplicate {model.__name__} records for key {key}")
+
+    qs = queryset if queryset is not None else model._default_manager.all()
+    first = key_attnames[0]
+    existing = {
+        natural_key(obj, key): obj
+        for obj in qs.filter(**{f"{first}__in": {k[0] for k in wanted_keys}}).order_by()
+    }
+
+    if update is True:
+        compared = None
+    elif update:
+        compared = {_attname(model, name) for name in update}
+    else:
+        compared = set()
+    auto_now = [f.attname for f in model._meta.concrete_fields if getattr(f, "auto_now", False)]
+
+    update_fields: set[str] = set()
+    for row in rows:
+        natural = tuple(row[a] for a in key_attnames)
+        obj = existing.get(natural)
+        if obj is None:
+            obj = model(**row)
+            if prepare:
+                prepare(obj)
+            result.created.append(obj)
+            continue
+        diff = [
+            name for name, value in row.items()
+            if name not in key_attnames and (compared is None or name in compared) and getattr(obj, name) != value
+        ]
+        if not diff:
+            result.unchanged.append(obj)
+            continue
+        for name in diff:
+            setattr(obj, name, row[name])
+        if prepare:
+            prepare(obj)
+        result.updated.append(obj)
+        result.changed_fields[_unwrap(natural)] = diff
+        update_fields.update(diff)
+
+    if dry_run or not result.changed:
+        return result
+
+    now = timezone.now()
+    for obj in result.updated:
+        for name in auto_now:
+            setattr(obj, name, now)
+    with transaction.atomic():
+        if result.created:
+            if _key_is_unique(model, key):
+                # Upsert on the key: a row created since the read is updated, not duplicated.
+                insert_fields = [
+                    f.name for f in model._meta.concrete_fields
+                    if not f.primary_key and f.attname not in key_attnames and not getattr(f, "auto_now_add", False)
+                ]
+                model._default_manager.bulk_create(
+                    result.created, update_conflicts=True, unique_fields=list(key), update_fields=insert_fields,
+                )
+            else:
+                model._default_manager.bulk_create(result.created)
+        if result.updated:
+            fields = sorted(update_fields | set(prepared_fields) | set(auto_now))
+            model._default_manager.bulk_update(result.updated, [_field_name(model, a) for a in fields])
+    return result
+
+
+def _field_name(model: type[models.Model], attname: str) -> str:
+    for f in model._meta.concrete_fields:
+        if f.attname == attname:
+            return f.name
+    return attname
@@ -0,0 +1,290 @@
+"""
+Cheap-first spam defense shared by the public form views.
+
+A :class:`SpamPipeline` runs a fixed list of stages in cost order and stops at
+the first one that rejects the submission, so a filled honeypot or a
+too-fast post never costs a form validation pass, let alone a round trip to
+Google. The usual order is::
+
+    Honeypot -> TimingToken -> Throttle -> FormValid -> MinLength/Gibberish -> Recaptcha
+
+Each stage carries the user-facing message, message level and HTTP status a
+view should use when it rejects; views map a :class:`SpamVerdict` onto their
+own response (redirect, HTMX partial, re-render). Per-stage hit counts and
+latency are kept per pipeline and exposed via :func:`spam_metrics`.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+from django.http import HttpRequest
+
+from core.utils import get_client_ip, verify_recaptcha_v3
+
+logger = logging.getLogger(__name__)
+
+SPAM_TRIGGERED = "Spam protection triggered. Please try again."
+
+
+def looks_like_gibberish(text: str) -> bool:
+    """Lightweight heuristic for obvious bot payloads like vVbHEmdFhhvJENIU."""
+    t = (text or "").strip()
+    if not t:
+        return True
+
+    # If it's a single "word" with no spaces and mostly mixed-case letters, it's often spam
+    if " " not in t and len(t) >= 12:
+        letters = sum(ch.isalpha() for ch in t)
+        if letters / max(len(t), 1) > 0.8:
+            upp = sum(ch.isupper() for ch in t)
+            low = sum(ch.islower() for ch in t)
+            if upp >= 3 and low >= 3:
+                return True
+
+    return False
+
+
+@dataclass
+class SpamContext:
+    request: HttpRequest
+    form: Any = None
+    score: float | None = None
+
+    @property
+    def cleaned_data(self) -> dict[str, Any]:
+        return getattr(self.form, "cleaned_data", None) or {}
+
+
+class Stage:
+    """Base stage. ``check`` returns True when the submission may continue."""
+
+    name = "stage"
+    message = SPAM_TRIGGERED
+    level = "error"
+    status = 400
+    silent = False  # reject without telling the client (pretend success)
+
+    def __init__(self, *, message: str | None = None, level: str | None = None,
+                 status: int | None = None, silent: bool | None = None):
+        if message is not None:
+            self.message = message
+        if level is not None:
+            self.level = level
+        if status is not None:
+            self.status = status
+        if silent is not None:
+            self.silent = silent
+
+    def check(self, ctx: SpamContext) -> bool:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    def format_message(self, ctx: SpamContext) -> str:
+        return self.message
+
+
+class Honeypot(Stage):
+    """Reject when a hidden field (e.g. ``website`` / ``contact-website``) is filled."""
+
+    name = "honeypot"
+
+    def __init__(self, field_name: str = "website", **kwargs):
+        super().__init__(**kwargs)
+        self.field_name = field_name
+
+    def check(self, ctx: SpamContext) -> bool:
+        return not (ctx.request.POST.get(self.field_name) or "").strip()
+
+
+class TimingToken(Stage):
+    """
+    Reject posts that arrive less than ``min_seconds`` after the GET that seeded
+    ``session[session_key]``. The seed is refreshed either way so a token can't
+    be replayed.
+    """
+
+    name = "timing"
+
+    def __init__(self, session_key: str, min_seconds: float = 2.0, **kwargs):
+        super().__init__(**kwargs)
+        self.session_key = session_key
+        self.min_seconds = min_seconds
+
+    def check(self, ctx: SpamContext) -> bool:
+        session = ctx.request.session
+        try:
+            started = float(session.get(self.session_key, 0))
+        except (TypeError, ValueError):
+            started = 0.0
+        now = time.time()
+        session[self.session_key] = now
+        return now - started >= self.min_seconds
+
+
+class Throttle(Stage):
+    """Per-IP submission throttle; ``limiter(request, form_type)`` returns True when over the limit."""
+
+    name = "throttle"
+    level = "warning"
+    status = 429
+    message = "You're sending messages too quickly. Please wait a minute and try again."
+
+    def __init__(self, form_type: str, limiter: Callable[[HttpRequest, str], bool], **kwargs):
+        super().__init__(**kwargs)
+        self.form_type = form_type
+        self.limiter = limiter
+
+    def check(self, ctx: SpamContext) -> bool:
+        return not self.limiter(ctx.request, self.form_type)
+
+
+class FormValid(Stage):
+    """Run the bound form's validation. Views render the form errors themselves."""
+
+    name = "form"
+    message = "Please correct the errors below."
+
+    def check(self, ctx: SpamContext) -> bool:
+        return ctx.form is None or ctx.form.is_valid()
+
+
+class MinLength(Stage):
+    """Require ``field_name`` (from cleaned data) to have at least ``min_length`` characters."""
+
+    name = "min_length"
+    message = "Please provide a bit more detail (at least {min_length} characters)."
+
+    def __init__(self, field_name: str, min_length: int | Callable[[], int], **kwargs):
+        super().__init__(**kwargs)
+        self.field_name = field_name
+        self._min_length = min_length
+
+    @property
+    def min_length(self) -> int:
+        value = self._min_length() if callable(self._min_length) else self._min_length
+        return int(value)
+
+    def check(self, ctx: SpamContext) -> bool:
+        return len((ctx.cleaned_data.get(self.field_name) or "").strip()) >= self.min_length
+
+    def format_message(self, ctx: SpamContext) -> str:
+        return self.message.format(min_length=self.min_length)
+
+
+class Gibberish(Stage):
+    name = "gibberish"
+    message = "That message looks like spam. Please rephrase and try again."
+
+    def __init__(self, field_name: str, **kwargs):
+        super().__init__(**kwargs)
+        self.field_name = field_name
+
+    def check(self, ctx: SpamContext) -> bool:
+        return not looks_like_gibberish(ctx.cleaned_data.get(self.field_name) or "")
+
+
+class Recaptcha(Stage):
+    """The only networked stage; always last. Stores the score on the context."""
+
+    name = "recaptcha"
+    message = "Spam detection failed. Please try again."
+
+    def __init__(self, action: str | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.action = action
+
+    def check(self, ctx: SpamContext) -> bool:
+        ok, score = verify_recaptcha_v3(ctx.request, expected_action=self.action)
+        ctx.score = score
+        return ok
+
+
+@dataclass
+class SpamVerdict:
+    passed: bool
+    stage: Stage | None = None
+    message: str = ""
+    score: float | None = None
+
+    @property
+    def stage_name(self) -> str:
+        return self.stage.name if self.stage else ""
+
+    @property
+    def form_invalid(self) -> bool:
+        return self.stage_name == FormValid.name
+
+    @property
+    def level(self) -> str:
+        return self.stage.level if self.stage else "success"
+
+    @property
+    def status(self) -> int:
+        return self.stage.status if self.stage else 200
+
+    @property
+    def silent(self) -> bool:
+        return bool(self.stage and self.stage.silent)
+
+
+class SpamPipeline:
+    def __init__(self, name: str, stages: Iterable[Stage]):
+        self.name = name
+        self.stages = list(stages)
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict[str, float]] = {
+            s.name: {"runs": 0, "hits": 0, "total_ms": 0.0} for s in self.stages
+        }
+        _registry[name] = self
+
+    def run(self, request: HttpRequest, form: Any = None) -> SpamVerdict:
+        ctx = SpamContext(request=request, form=form)
+        for stage in self.stages:
+            started = time.perf_counter()
+            passed = stage.check(ctx)
+            self._record(stage.name, passed, (time.perf_counter() - started) * 1000.0)
+            if not passed:
+                if not isinstance(stage, FormValid):
+                    logger.info(
+                        "Spam gate tripped: %s pipeline=%s ip=%s ua=%s",
+                        stage.name, self.name, get_client_ip(request),
+                        request.META.get("HTTP_USER_AGENT"),
+                    )
+                return SpamVerdict(False, stage, stage.format_message(ctx), ctx.score)
+        return SpamVerdict(True, None, "", ctx.score)
+
+    def _record(self, stage_name: str, passed: bool, elapsed_ms: float) -> None:
+        with self._lock:
+            stats = self._stats[stage_name]
+            stats["runs"] += 1
+            stats["total_ms"] += elapsed_ms
+            if not passed:
+                stats["hits"] += 1
+
+    def metrics(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            out = {}
+            for name, stats in self._stats.items():
+                runs = int(stats["runs"])
+                out[name] = {
+                    "runs": runs,
+                    "hits": int(stats["hits"]),
+                    "avg_ms": round(stats["total_ms"] / runs, 3) if runs else 0.0,
+                }
+            return out
+
+    def reset_metrics(self) -> None:
+        with self._lock:
+            for stats in self._stats.values():
+                stats.update(runs=0, hits=0, total_ms=0.0)
+
+
+_registry: dict[str, SpamPipeline] = {}
+
+
+def spam_metrics() -> dict[str, dict[str, dict[str, float]]]:
+    """Per-pipeline, per-stage counters for every pipeline defined in this process."""
+    return {name: pipeline.metrics() for name, pipeline in _registry.items()}
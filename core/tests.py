@@ -1,3 +1,542 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
 
-# Create your tests here.
+from django import forms
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.core.management import CommandError, call_command
+from django.test import RequestFactory, TestCase, override_settings
+
+from core import ratelimit
+from core.cache import TwoTierCache
+from core.seeding import seed
+from core.recaptcha import CircuitBreaker, get_client, reset_client
+from core.spam import FormValid, Gibberish, Honeypot, Recaptcha, SpamPipeline, Throttle, TimingToken
+from core.utils import verify_recaptcha_v3
+
+
+class _FakeVerifyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        server.hits += 1
+        server.peers.add(self.client_address)
+        if server.delay:
+            time.sleep(server.delay)
+        body = json.dumps(server.payload).encode()
+        self.send_response(server.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client gave up (timeout tests)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeVerificationServer:
+    """Local stand-in for Google's siteverify endpoint."""
+
+    def __init__(self):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _FakeVerifyHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.hits = 0
+        self.httpd.peers = set()
+        self.httpd.delay = 0
+        self.httpd.status = 200
+        self.httpd.payload = {"success": True, "score": 0.9, "action": "contact_form", "hostname": "testserver"}
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/siteverify"
+
+    def __enter__(self):
+        self.thread.start()
+        return self.httpd
+
+    def __exit__(self, *exc):
+        reset_client()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class RecaptchaClientTests(TestCase):
+    def setUp(self):
+        reset_client()
+        self.server = FakeVerificationServer()
+        self.httpd = self.server.__enter__()
+        self.addCleanup(self.server.__exit__)
+        overrides = override_settings(
+            RECAPTCHA_ENTERPRISE_API_KEY="",
+            RECAPTCHA_SECRET_KEY="secret",
+            RECAPTCHA_VERIFY_URL=self.server.url,
+            RECAPTCHA_MIN_SCORE=0.5,
+            RECAPTCHA_READ_TIMEOUT=0.3,
+            RECAPTCHA_BREAKER_THRESHOLD=2,
+            RECAPTCHA_BREAKER_COOLDOWN=60,
+            RECAPTCHA_FAIL_OPEN=True,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def _verify(self, action="contact_form"):
+        request = RequestFactory().post("/contact/", {"recaptcha_token": "tok"})
+        return verify_recaptcha_v3(request, expected_action=action)
+
+    def test_successful_verifications_reuse_one_pooled_connection(self):
+        self.assertEqual(self._verify(), (True, 0.9))
+        self.assertEqual(self._verify(), (True, 0.9))
+
+        self.assertEqual(self.httpd.hits, 2)
+        self.assertEqual(len(self.httpd.peers), 1)
+        metrics = get_client().metrics()
+        self.assertEqual(metrics["counts"], {"ok": 2})
+        self.assertEqual(metrics["latency_ms"]["samples"], 2)
+        self.assertEqual(metrics["breaker"], CircuitBreaker.CLOSED)
+
+    def test_low_score_is_rejected(self):
+        self.httpd.payload = {**self.httpd.payload, "score": 0.1}
+        self.assertEqual(self._verify(), (False, 0.1))
+
+    def test_breaker_opens_after_failures_and_short_circuits(self):
+        self.httpd.status = 503
+
+        self.assertEqual(self._verify(), (True, None))
+        self.assertEqual(self._verify(), (True, None))
+        self.assertEqual(self._verify(), (True, None))
+
+        self.assertEqual(self.httpd.hits, 2)
+        metrics = get_client().metrics()
+        self.assertEqual(metrics["counts"], {"error": 2, "short_circuit": 1})
+        self.assertEqual(metrics["breaker"], CircuitBreaker.OPEN)
+
+    def test_slow_upstream_times_out_quickly(self):
+        self.httpd.delay = 1.0
+
+        started = time.monotonic()
+        self.assertEqual(self._verify(), (True, None))
+        self.assertLess(time.monotonic() - started, 0.9)
+        self.assertEqual(get_client().metrics()["counts"], {"timeout": 1})
+
+    @override_settings(RECAPTCHA_FAIL_OPEN=False)
+    def test_unavailable_upstream_can_fail_closed(self):
+        self.httpd.status = 500
+        self.assertEqual(self._verify(), (False, 0.0))
+
+
+class CircuitBreakerTests(TestCase):
+    def test_half_open_trial_closes_or_reopens(self):
+        now = [0.0]
+        breaker = CircuitBreaker(threshold=1, cooldown=10, clock=lambda: now[0])
+
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+
+        now[0] = 11
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())  # only one trial call at a time
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        now[0] = 22
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+
+class _MessageForm(forms.Form):
+    message = forms.CharField()
+
+
+class SpamPipelineTests(TestCase):
+    def setUp(self):
+        self.throttled = False
+        self.pipeline = SpamPipeline("test", [
+            Honeypot("website"),
+            TimingToken("test_started_ts"),
+            Throttle("test", lambda request, form_type: self.throttled),
+            FormValid(),
+            Gibberish("message"),
+            Recaptcha("test_form"),
+        ])
+        patcher = mock.patch("core.spam.verify_recaptcha_v3", return_value=(True, 0.9))
+        self.recaptcha = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run(self, data, started_ago=5):
+        request = RequestFactory().post("/", data)
+        request.session = SessionStore()
+        request.session["test_started_ts"] = time.time() - started_ago
+        return self.pipeline.run(request, form=_MessageForm(data))
+
+    def test_clean_submission_passes_every_stage_and_keeps_score(self):
+        verdict = self._run({"message": "Please send pricing for this plan."})
+
+        self.assertTrue(verdict.passed)
+        self.assertEqual(verdict.score, 0.9)
+        self.recaptcha.assert_called_once()
+        self.assertEqual(self.pipeline.metrics()["recaptcha"]["runs"], 1)
+
+    def test_cheap_gates_short_circuit_before_recaptcha(self):
+        cases = [
+            ({"message": "hello there", "website": "spam.example"}, 5, "honeypot"),
+            ({"message": "hello there"}, 0, "timing"),
+            ({"message": ""}, 5, "form"),
+            ({"message": "vVbHEmdFhhvJENIU"}, 5, "gibberish"),
+        ]
+        for data, started_ago, stage in cases:
+            with self.subTest(stage=stage):
+                verdict = self._run(data, started_ago=started_ago)
+                self.assertFalse(verdict.passed)
+                self.assertEqual(verdict.stage_name, stage)
+
+        self.recaptcha.assert_not_called()
+        metrics = self.pipeline.metrics()
+        self.assertEqual((metrics["honeypot"]["runs"], metrics["honeypot"]["hits"]), (4, 1))
+        self.assertEqual(metrics["form"]["hits"], 1)
+        self.assertEqual(metrics["recaptcha"]["runs"], 0)
+
+    def test_throttle_verdict_carries_warning_and_429(self):
+        self.throttled = True
+        verdict = self._run({"message": "hello there"})
+
+        self.assertEqual(verdict.stage_name, "throttle")
+        self.assertEqual((verdict.level, verdict.status), ("warning", 429))
+
+
+class RateLimitTests(TestCase):
+    def setUp(self):
+        ratelimit.reset_backend()
+        self.addCleanup(ratelimit.reset_backend)
+
+    def test_parse_rates_supports_multiplied_units_and_lists(self):
+        self.assertEqual(
+            ratelimit.parse_rates("3/10m, 1/60s,5/h"),
+            (ratelimit.Rate(3, 600), ratelimit.Rate(1, 60), ratelimit.Rate(5, 3600)),
+        )
+        with self.assertRaises(ValueError):
+            ratelimit.parse_rates("lots/minute")
+
+    @override_settings(RATE_LIMIT_BACKEND="db", RATE_LIMIT_POLICIES={"form": "3/10m, 1/m"})
+    def test_database_backend_checks_every_window_in_one_statement(self):
+        with self.assertNumQueries(1):
+            first = ratelimit.hit("form", "contact:203.0.113.5")
+        second = ratelimit.hit("form", "contact:203.0.113.5")
+        other = ratelimit.hit("form", "contact:198.51.100.7")
+
+        self.assertFalse(first.limited)
+        self.assertTrue(second.limited)  # burst window: 1/minute
+        self.assertEqual(second.retry_after, 60)
+        self.assertFalse(other.limited)
+
+    @override_settings(RATE_LIMIT_BACKEND="local", RATE_LIMIT_POLICIES={"contact": "2/m"})
+    def test_decorator_blocks_with_403_once_policy_is_exceeded(self):
+        from django.core.exceptions import PermissionDenied
+        from django.http import HttpResponse
+
+        def plain(request):
+            return HttpResponse("ok")
+
+        view = ratelimit.ratelimit("contact")(plain)
+
+        factory = RequestFactory()
+        self.assertEqual(view(factory.post("/")).status_code, 200)
+        self.assertEqual(view(factory.post("/")).status_code, 200)
+        with self.assertRaises(PermissionDenied):
+            view(factory.post("/"))
+
+        unblocked = ratelimit.ratelimit("contact", block=False)(plain)
+        request = factory.post("/")
+        unblocked(request)
+        self.assertTrue(request.limited)
+
+
+TWO_TIER_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "tt-default"},
+    "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "tt-shared"},
+}
+
+
+@override_settings(CACHES=TWO_TIER_CACHES)
+class TwoTierCacheTests(TestCase):
+    def _worker(self, **options):
+        options.setdefault("VERSION_CHECK_INTERVAL", 0)
+        return TwoTierCache("shared", {"OPTIONS": options})
+
+    def setUp(self):
+        from django.core.cache import caches
+
+        caches["shared"].clear()
+
+    def test_hot_keys_are_served_from_l1(self):
+        worker = self._worker(VERSION_CHECK_INTERVAL=60)
+        worker.set("sitemap:main", "<xml/>")
+
+        with mock.patch.object(worker.shared, "get", wraps=worker.shared.get) as shared_get:
+            self.assertEqual(worker.get("sitemap:main"), "<xml/>")
+            self.assertEqual(worker.get("sitemap:main"), "<xml/>")
+        self.assertNotIn("sitemap:main", [c.args[0] for c in shared_get.call_args_list])
+        self.assertEqual(worker.metrics()["l1_hits"], 2)
+        self.assertIsNone(worker.get("sitemap:missing"))
+        self.assertEqual(worker.metrics()["misses"], 1)
+
+    def test_invalidations_in_one_worker_reach_other_workers_l1(self):
+        first, second = self._worker(), self._worker()
+        first.set("page:contact", "v1")
+        self.assertEqual(second.get("page:contact"), "v1")
+
+        first.delete("page:contact")
+        self.assertIsNone(second.get("page:contact"))
+
+        first.set("page:counter", 1)
+        self.assertEqual(second.get("page:counter"), 1)
+        first.incr("page:counter")
+        self.assertEqual(second.get("page:counter"), 2)
+
+    def test_fills_do_not_evict_other_workers_l1(self):
+        first, second = self._worker(), self._worker()
+        first.set("page:contact", "v1")
+        self.assertEqual(second.get("page:contact"), "v1")
+
+        with mock.patch.object(first.shared, "incr", wraps=first.shared.incr) as shared_incr:
+            first.set("page:about", "about")
+            first.add("page:pricing", "pricing")
+            first.set_many({"page:faq": "faq"})
+        shared_incr.assert_not_called()
+
+        with mock.patch.object(second.shared, "get", wraps=second.shared.get) as shared_get:
+            self.assertEqual(second.get("page:contact"), "v1")
+        self.assertNotIn("page:contact", [c.args[0] for c in shared_get.call_args_list])
+        self.assertEqual(second.metrics()["invalidations"], 0)
+
+    def test_overwrites_reach_other_workers_within_the_l1_timeout(self):
+        first, second = self._worker(L1_TIMEOUT=0.05), self._worker(L1_TIMEOUT=0.05)
+        first.set("page:contact", "v1")
+        self.assertEqual(second.get("page:contact"), "v1")
+
+        first.set("page:contact", "v2")
+        time.sleep(0.06)
+        self.assertEqual(second.get("page:contact"), "v2")
+
+    def test_l1_is_bounded_lru(self):
+        worker = self._worker(L1_MAX_ENTRIES=2)
+        worker.set("a:1", 1)
+        worker.set("a:2", 2)
+        worker.get("a:1")
+        worker.set("a:3", 3)
+
+        self.assertEqual(worker.metrics()["l1_entries"], 2)
+        self.assertEqual(worker.metrics()["evictions"], 1)
+        self.assertEqual(worker.get("a:2"), 2)  # still correct from L2
+        self.assertEqual(worker.metrics()["l2_hits"], 1)
+
+
+class FreshbooksImportTests(TestCase):
+    def _csv(self, rows):
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write('First Name,Last Name,Email\n')
+            for row in rows:
+                f.write(','.join(row) + '\n')
+        self.addCleanup(os.remove, path)
+        return path
+
+    def _import(self, path, *args):
+        out = io.StringIO()
+        call_command('import_freshbooks_clients', path, *args, stdout=out)
+        return out.getvalue()
+
+    def test_bulk_import_resolves_usernames_in_memory(self):
+        User.objects.create_user('sam', email='sam@other.example')
+        path = self._csv([
+            ('Sam', 'One', 'sam@a.example'),
+            ('Sam', 'Two', 'SAM@b.example'),
+            ('Sam', 'Dup', 'sam@a.example'),
+            ('', 'Nameless', 'x@a.example'),
+            ('Pat', 'Three', 'pat@a.example'),
+        ])
+
+        # user preload, then one INSERT per chunk of two users, each in its own transaction
+        with self.assertNumQueries(1 + 2 * 3):
+            output = self._import(path, '--batch-size', '2')
+
+        users = dict(User.objects.filter(email__endswith='example').values_list('email', 'username'))
+        self.assertEqual(users, {
+            'sam@other.example': 'sam',
+            'sam@a.example': 'sam1',
+            'sam@b.example': 'sam2',
+            'pat@a.example': 'pat',
+        })
+        self.assertFalse(User.objects.get(email='pat@a.example').has_usable_password())
+        self.assertIn('Created: 3', output)
+        self.assertIn('Skipped: 2', output)
+        self.assertIn('rows/s', output)
+
+    def test_update_and_resume(self):
+        User.objects.create_user('old-name', email='lee@a.example', first_name='L')
+        path = self._csv([
+            ('Skipped', 'Row', 'skip@a.example'),
+            ('Lee', 'Updated', 'lee@a.example'),
+            ('Kim', 'New', 'kim@a.example'),
+        ])
+
+        output = self._import(path, '--update', '--start-row', '3')
+
+        self.assertFalse(User.objects.filter(email='skip@a.example').exists())
+        lee = User.objects.get(email='lee@a.example')
+        self.assertEqual((lee.username, lee.first_name, lee.last_name), ('lee', 'Lee', 'Updated'))
+        self.assertIn('Rows 3-4: 1 created, 1 updated', output)
+
+    def test_failed_chunk_reports_resume_row(self):
+        path = self._csv([('Ann', 'A', 'ann@a.example'), ('Bo', 'B', 'bo@a.example')])
+        with mock.patch.object(User.objects, 'bulk_create', side_effect=[[], RuntimeError('boom')]):
+            with self.assertRaisesMessage(CommandError, 'Resume with --start-row 3'):
+                self._import(path, '--batch-size', '1')
+
+    def test_dry_run_writes_nothing(self):
+        path = self._csv([('Ann', 'A', 'ann@a.example')])
+        output = self._import(path, '--dry-run')
+        self.assertFalse(User.objects.filter(email='ann@a.example').exists())
+        self.assertIn('DRY RUN', output)
+
+
+class SeedingTests(TestCase):
+    def setUp(self):
+        from plans.models import HouseStyle
+
+        self.HouseStyle = HouseStyle
+        HouseStyle.objects.filter(slug__startswith='seed-').delete()
+        self.records = [
+            {'slug': 'seed-a', 'style_name': 'Seed A', 'order': 1},
+            {'slug': 'seed-b', 'style_name': 'Seed B', 'order': 2},
+        ]
+
+    def test_second_run_is_one_read(self):
+        first = seed(self.HouseStyle, self.records, key='slug')
+        self.assertEqual((len(first.created), len(first.updated)), (2, 0))
+        self.assertTrue(all(obj.pk for obj in first.created))
+
+        with self.assertNumQueries(1):
+            again = seed(self.HouseStyle, self.records, key='slug')
+        self.assertEqual(len(again.unchanged), 2)
+        self.assertFalse(again.changed)
+
+    def test_only_changed_fields_are_updated(self):
+        seed(self.HouseStyle, self.records, key='slug')
+        self.records[1]['order'] = 9
+
+        result = seed(self.HouseStyle, self.records, key='slug')
+
+        self.assertEqual([s.slug for s in result.updated], ['seed-b'])
+        self.assertEqual(result.changed_fields, {'seed-b': ['order']})
+        self.assertEqual(self.HouseStyle.objects.get(slug='seed-b').order, 9)
+        self.assertIn('house styles: 0 created, 1 updated, 1 unchanged', result.summary())
+
+    def test_update_modes(self):
+        seed(self.HouseStyle, self.records, key='slug')
+        self.records[0].update(style_name='Seed A2', order=5)
+
+        self.assertFalse(seed(self.HouseStyle, self.records, key='slug', update=False).changed)
+        seed(self.HouseStyle, self.records, key='slug', update=['order'])
+        style = self.HouseStyle.objects.get(slug='seed-a')
+        self.assertEqual((style.style_name, style.order), ('Seed A', 5))
+
+    def test_dry_run_and_duplicates(self):
+        result = seed(self.HouseStyle, self.records, key='slug', dry_run=True)
+        self.assertEqual(len(result.created), 2)
+        self.assertFalse(self.HouseStyle.objects.filter(slug__startswith='seed-').exists())
+        with self.assertRaises(ValueError):
+            seed(self.HouseStyle, self.records + self.records[:1], key='slug')
+
+    def test_seed_commands_are_idempotent(self):
+        call_command('seed_house_styles', stdout=io.StringIO())
+        call_command('seed_affiliate_products', '--tag', 'test-20', stdout=io.StringIO())
+        out = io.StringIO()
+        with self.assertNumQueries(2):  # HouseStyle names, then the seed read
+            call_command('seed_house_styles', stdout=out)
+        self.assertIn('0 created, 0 updated', out.getvalue())
+        with self.assertNumQueries(1):
+            call_command('seed_affiliate_products', '--tag', 'test-20', stdout=io.StringIO())
+
+
+class MediaAuditTests(TestCase):
+    def setUp(self):
+        from decimal import Decimal
+
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+        from PIL import Image
+
+        from plans.models import PlanGallery, Plans
+
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        overrides = override_settings(
+            MEDIA_ROOT=self.tmp,
+            STORAGES={
+                'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+                'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+            },
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        png = io.BytesIO()
+        Image.new('RGB', (4, 3)).save(png, 'PNG')
+        plan = Plans.objects.create(
+            plan_number='AUD-1', slug='aud-1', square_footage=1000, bedrooms=2, bathrooms=Decimal('1.0'),
+            stories=1, garage_stalls=0, house_width_in=400, house_depth_in=400,
+            main_image=default_storage.save('plans/main/ok.png', ContentFile(png.getvalue())),
+        )
+        for name, data in [('plans/gallery/corrupt.jpg', b'not an image'), ('plans/gallery/empty.jpg', b'')]:
+            PlanGallery.objects.create(plan=plan, image=default_storage.save(name, ContentFile(data)))
+        PlanGallery.objects.create(plan=plan, image='plans/gallery/missing.jpg')
+        PlanGallery.objects.create(plan=plan, image='plans/main/ok.png')
+
+    def test_report_lists_broken_files_with_timings(self):
+        path = os.path.join(self.tmp, 'report.json')
+
+        out = io.StringIO()
+        call_command('audit_media', '--model', 'plans', '--decode', '--workers', '4', '--output', path, stdout=out)
+
+        with open(path) as fh:
+            report = json.load(fh)
+        summary = report['summary']
+        self.assertEqual((summary['references'], summary['files_checked']), (5, 4))
+        self.assertEqual([summary[s] for s in ('ok', 'missing', 'empty', 'corrupt')], [2, 1, 1, 1])
+        self.assertEqual(report['by_field']['plans.PlanGallery.image'], {'corrupt': 1, 'empty': 1, 'missing': 1, 'ok': 1})
+        statuses = {item['name']: item['status'] for item in report['files']}
+        self.assertEqual(statuses, {
+            'plans/gallery/corrupt.jpg': 'corrupt',
+            'plans/gallery/empty.jpg': 'empty',
+            'plans/gallery/missing.jpg': 'missing',
+        })
+        self.assertTrue(all('ms' in item for item in report['files']))
+        self.assertIn('MISSING plans.PlanGallery', out.getvalue())
+
+    def test_without_decode_only_existence_and_size_are_checked(self):
+        out = io.StringIO()
+        call_command('audit_media', '--model', 'plans.PlanGallery', '--output', '-', '--all', stdout=out)
+
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['summary']['ok'], 2)  # the corrupt file has a size
+        self.assertEqual(len(report['files']), 4)
+
+    def test_fail_on_problems(self):
+        with self.assertRaisesMessage(CommandError, '2 broken file reference(s)'):
+            call_command('audit_media', '--model', 'plans', '--fail-on-problems', stdout=io.StringIO())
@@ -9,6 +9,13 @@ import logging
 from django.conf import settings
 from django.http import HttpRequest
 
+from core.recaptcha import (
+    RecaptchaUnavailable,
+    enterprise_assessment_url,
+    get_client,
+    siteverify_url,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -54,6 +61,21 @@ def _check_hostname(response_host: str, request_host: str, configured_hosts: lis
     return False
 
 
+def _degraded_result(flavor: str, exc: Exception) -> tuple[bool, float | None]:
+    """
+    Outcome when Google can't be reached (timeout, 5xx, breaker open).
+
+    With RECAPTCHA_FAIL_OPEN (default) the submission is let through with no
+    score so the views' cheap gates (honeypot, timing token, throttle) decide;
+    otherwise it is rejected like a low score.
+    """
+    if getattr(settings, "RECAPTCHA_FAIL_OPEN", True):
+        logger.warning("reCAPTCHA %s unavailable (%s); degrading to local spam gates", flavor, exc)
+        return True, None
+    logger.warning("reCAPTCHA %s unavailable (%s); rejecting submission", flavor, exc)
+    return False, 0.0
+
+
 def verify_recaptcha_v3(request: HttpRequest, expected_action: str | None = None) -> tuple[bool, float | None]:
     """Verify a reCAPTCHA Enterprise token. Returns (ok, score)."""
     api_key = (getattr(settings, "RECAPTCHA_ENTERPRISE_API_KEY", "") or "").strip()
@@ -70,11 +92,7 @@ def verify_recaptcha_v3(request: HttpRequest, expected_action: str | None = None
         logger.warning("reCAPTCHA: no token in POST data")
         return False, 0.0
 
-    try:
-        import requests as http  # type: ignore
-    except Exception:
-        return False, 0.0
-
+    client = get_client()
     min_score = float(getattr(settings, "RECAPTCHA_MIN_SCORE", getattr(settings, "RECAPTCHA_REQUIRED_SCORE", 0.5)))
     request_host = _normalize_host(request.get_host())
     configured_hosts = [(h or "").strip().lower() for h in getattr(settings, "ALLOWED_HOSTS", [])]
@@ -96,16 +114,13 @@ def verify_recaptcha_v3(request: HttpRequest, expected_action: str | None = None
             body["event"]["expectedAction"] = expected_action
 
         try:
-            resp = http.post(
-                f"https://recaptchaenterprise.googleapis.com/v1/projects/{project_id}/assessments",
+            data: dict[str, Any] = client.post_json(
+                enterprise_assessment_url(project_id),
                 params={"key": api_key},
                 json=body,
-                timeout=5,
             )
-            data: dict[str, Any] = resp.json()
-        except Exception:
-            logger.exception("reCAPTCHA Enterprise API call failed")
-            return False, 0.0
+        except RecaptchaUnavailable as exc:
+            return _degraded_result("Enterprise", exc)
 
         token_props: dict[str, Any] = data.get("tokenProperties") or {}
         risk: dict[str, Any] = data.get("riskAnalysis") or {}
@@ -137,15 +152,12 @@ def verify_recaptcha_v3(request: HttpRequest, expected_action: str | None = None
     else:
         # ── Standard reCAPTCHA v3 (fallback when no Enterprise key) ──────────
         try:
-            resp = http.post(
-                "https://www.google.com/recaptcha/api/siteverify",
+            data = client.post_json(
+                siteverify_url(),
                 data={"secret": secret, "response": token, "remoteip": get_client_ip(request)},
-                timeout=5,
             )
-            data = resp.json()
-        except Exception:
-            logger.exception("reCAPTCHA v3 API call failed")
-            return False, 0.0
+        except RecaptchaUnavailable as exc:
+            return _degraded_result("v3", exc)
 
         success = bool(data.get("success"))
         score = data.get("score")
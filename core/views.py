@@ -1,3 +1,23 @@
-from django.shortcuts import render
+from __future__ import annotations
 
-# Create your views here.
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.cache import caches
+from django.http import HttpRequest, JsonResponse
+
+from core.recaptcha import get_client
+from core.spam import spam_metrics
+
+
+@staff_member_required
+def runtime_metrics(request: HttpRequest) -> JsonResponse:
+    """Per-process counters: cache tiers, reCAPTCHA client and spam pipelines."""
+    cache_stats = {}
+    for alias in caches:
+        backend = caches[alias]
+        if hasattr(backend, "metrics"):
+            cache_stats[alias] = backend.metrics()
+    return JsonResponse({
+        "cache": cache_stats,
+        "recaptcha": get_client().metrics(),
+        "spam": spam_metrics(),
+    })
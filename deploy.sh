@@ -39,6 +39,8 @@ python manage.py collectstatic --noinput
 # Run migrations
 echo "🗄️  Running migrations..."
 python manage.py migrate --noinput
+python manage.py populate_help
+python manage.py render_help_articles
 
 # Check for issues
 echo "🔍 Running Django system checks..."
@@ -40,6 +40,8 @@ pip install -r requirements.txt
 # Django operations
 echo "🗄️  Running migrations"
 python manage.py migrate --noinput
+python manage.py populate_help
+python manage.py render_help_articles
 
 echo "📦 Collecting static files"
 python manage.py collectstatic --noinput
@@ -0,0 +1,112 @@
+"""
+Cached help center landing payload, one per audience.
+
+The help center used to prefetch every category's articles and FAQs, then
+run a COUNT per category plus separate featured, popular and recent
+queries on every request. The payload is now built with two queries (the
+categories with an annotated per-audience article count, and the active
+articles for that audience) and kept in the default cache per audience
+until an article, category or FAQ changes (see ``help.signals``) or view
+counts are flushed. The related-articles lists on article pages are
+cached per audience the same way.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .models import HelpArticle, HelpCategory
+
+logger = logging.getLogger(__name__)
+
+AUDIENCES = ('client', 'staff')
+
+FEATURED_LIMIT = 6
+POPULAR_LIMIT = 5
+RECENT_LIMIT = 5
+RELATED_LIMIT = 3
+
+_warned = False
+
+
+def audience_for(user):
+    return 'staff' if user.is_staff else 'client'
+
+
+def audience_filter(audience, prefix=''):
+    return Q(**{f'{prefix}audience__in': [audience, 'both']})
+
+
+def cache_key(audience):
+    return f'help_center:{audience}'
+
+
+def related_cache_key(audience):
+    return f'help_related:{audience}'
+
+
+def _timeout():
+    return int(getattr(settings, 'HELP_CENTER_CACHE_TIMEOUT', 60 * 60))
+
+
+def build(audience):
+    categories = list(
+        HelpCategory.objects.filter(is_active=True)
+        .annotate(filtered_article_count=Count(
+            'articles',
+            filter=Q(articles__is_active=True) & audience_filter(audience, 'articles__'),
+        ))
+        .filter(filtered_article_count__gt=0)
+        .order_by('order')
+    )
+    articles = list(
+        HelpArticle.objects.filter(is_active=True)
+        .filter(audience_filter(audience))
+        .select_related('category')
+        # Only what help_center.html renders (and the featured/popular/recent
+        # selection below): the cached payload never carries article bodies.
+        .only('id', 'slug', 'title', 'summary', 'views', 'created_at', 'is_featured', 'category__name')
+    )
+    return {
+        'categories': categories,
+        'featured_articles': [a for a in articles if a.is_featured][:FEATURED_LIMIT],
+        'popular_articles': sorted(articles, key=lambda a: -a.views)[:POPULAR_LIMIT],
+        'recent_articles': sorted(articles, key=lambda a: a.created_at, reverse=True)[:RECENT_LIMIT],
+    }
+
+
+def get_landing(audience):
+    payload = cache.get(cache_key(audience))
+    if payload is None:
+        payload = build(audience)
+        cache.set(cache_key(audience), payload, _timeout())
+    return payload
+
+
+def get_related(article, audience, limit=RELATED_LIMIT):
+    """Other active articles in ``article``'s category for ``audience``."""
+    by_category = cache.get(related_cache_key(audience))
+    if by_category is None:
+        by_category = {}
+        articles = (
+            HelpArticle.objects.filter(is_active=True)
+            .filter(audience_filter(audience))
+            .only('id', 'category_id', 'title', 'slug', 'summary')
+        )
+        for related in articles:
+            by_category.setdefault(related.category_id, []).append(related)
+        cache.set(related_cache_key(audience), by_category, _timeout())
+    return [a for a in by_category.get(article.category_id, ()) if a.pk != article.pk][:limit]
+
+
+def invalidate():
+    # Also reached from the seeding migration, before the database cache
+    # table exists.
+    try:
+        cache.delete_many([key(a) for a in AUDIENCES for key in (cache_key, related_cache_key)])
+    except Exception as exc:
+        global _warned
+        if not _warned:  # the seeding migration would log this for every row
+            logger.warning("Could not invalidate the cached help center payloads: %s", exc)
+            _warned = True
@@ -1,104 +1,100 @@
+"""
+Seed the portal help center: categories, articles and FAQs.
+
+The content is declared below and applied with core.seeding, so a run is one
+read per model plus bulk writes for whatever is missing (or, with --update,
+changed). Articles are matched on slug, categories on slug and FAQs on their
+question; articles and FAQs name their category by slug.
+"""
 from django.core.management.base import BaseCommand
-from help.models import HelpCategory, HelpArticle, FAQ
+from django.db import transaction
 
+from core.seeding import seed
+from help import landing, rendering, search
+from help.models import HelpCategory, HelpArticle, FAQ
 
-class Command(BaseCommand):
-    help = 'Populate initial help content for the portal'
+CATEGORIES = [
+    {
+        'slug': 'client-portal-basics',
+        'name': 'Client Portal Basics',
+        'description': 'Learn the fundamentals of using your client portal',
+        'icon': 'fa-user',
+        'audience': 'client',
+        'order': 1,
+    },
+    {
+        'slug': 'invoices-and-payments',
+        'name': 'Invoices & Payments',
+        'description': 'Understanding invoices, proposals, and making payments',
+        'icon': 'fa-file-invoice-dollar',
+        'audience': 'client',
+        'order': 2,
+    },
+    {
+        'slug': 'projects-and-plans',
+        'name': 'Projects & Plans',
+        'description': 'Viewing your projects and accessing plan files',
+        'icon': 'fa-project-diagram',
+        'audience': 'client',
+        'order': 3,
+    },
+    {
+        'slug': 'staff-portal-guide',
+        'name': 'Staff Portal Guide',
+        'description': 'Complete guide for staff members using the portal',
+        'icon': 'fa-user-tie',
+        'audience': 'staff',
+        'order': 1,
+    },
+    {
+        'slug': 'client-management',
+        'name': 'Client Management',
+        'description': 'Managing clients, projects, and communication',
+        'icon': 'fa-users',
+        'audience': 'staff',
+        'order': 2,
+    },
+    {
+        'slug': 'invoicing-proposals',
+        'name': 'Invoicing & Proposals',
+        'description': 'Creating invoices, proposals, and tracking payments',
+        'icon': 'fa-file-invoice',
+        'audience': 'staff',
+        'order': 3,
+    },
+    {
+        'slug': 'time-tracking',
+        'name': 'Time Tracking',
+        'description': 'Track time on projects and bill for hours worked',
+        'icon': 'fa-clock',
+        'audience': 'staff',
+        'order': 4,
+    },
+    {
+        'slug': 'expense-management',
+        'name': 'Expense Management',
+        'description': 'Track, manage, and approve business expenses',
+        'icon': 'fa-money-bill',
+        'audience': 'staff',
+        'order': 7,
+    },
+    {
+        'slug': 'invoice-reminders',
+        'name': 'Invoice Reminders',
+        'description': 'Automatic reminders for unpaid invoices',
+        'icon': 'fa-bell',
+        'audience': 'staff',
+        'order': 8,
+    },
+]
 
-    def handle(self, *args, **options):
-        self.stdout.write('Creating help categories...')
-        
-        # Client Categories
-        client_portal = HelpCategory.objects.get_or_create(
-            slug='client-portal-basics',
-            defaults={
-                'name': 'Client Portal Basics',
-                'description': 'Learn the fundamentals of using your client portal',
-                'icon': 'fa-user',
-                'audience': 'client',
-                'order': 1
-            }
-        )[0]
-        
-        invoices_payments = HelpCategory.objects.get_or_create(
-            slug='invoices-and-payments',
-            defaults={
-                'name': 'Invoices & Payments',
-                'description': 'Understanding invoices, proposals, and making payments',
-                'icon': 'fa-file-invoice-dollar',
-                'audience': 'client',
-                'order': 2
-            }
-        )[0]
-        
-        projects_plans = HelpCategory.objects.get_or_create(
-            slug='projects-and-plans',
-            defaults={
-                'name': 'Projects & Plans',
-                'description': 'Viewing your projects and accessing plan files',
-                'icon': 'fa-project-diagram',
-                'audience': 'client',
-                'order': 3
-            }
-        )[0]
-        
-        # Staff Categories
-        staff_portal = HelpCategory.objects.get_or_create(
-            slug='staff-portal-guide',
-            defaults={
-                'name': 'Staff Portal Guide',
-                'description': 'Complete guide for staff members using the portal',
-                'icon': 'fa-user-tie',
-                'audience': 'staff',
-                'order': 1
-            }
-        )[0]
-        
-        client_management = HelpCategory.objects.get_or_create(
-            slug='client-management',
-            defaults={
-                'name': 'Client Management',
-                'description': 'Managing clients, projects, and communication',
-                'icon': 'fa-users',
-                'audience': 'staff',
-                'order': 2
-            }
-        )[0]
-        
-        invoicing = HelpCategory.objects.get_or_create(
-            slug='invoicing-proposals',
-            defaults={
-                'name': 'Invoicing & Proposals',
-                'description': 'Creating invoices, proposals, and tracking payments',
-                'icon': 'fa-file-invoice',
-                'audience': 'staff',
-                'order': 3
-            }
-        )[0]
-        
-        time_tracking = HelpCategory.objects.get_or_create(
-            slug='time-tracking',
-            defaults={
-                'name': 'Time Tracking',
-                'description': 'Track time on projects and bill for hours worked',
-                'icon': 'fa-clock',
-                'audience': 'staff',
-                'order': 4
-            }
-        )[0]
-        
-        self.stdout.write(self.style.SUCCESS('✓ Categories created'))
-        
-        # CLIENT ARTICLES
-        self.stdout.write('Creating client help articles...')
-        
-        HelpArticle.objects.get_or_create(
-            slug='getting-started-client-portal',
-            defaults={
-                'category': client_portal,
-                'title': 'Getting Started with Your Client Portal',
-                'summary': 'Learn how to access and navigate your client portal dashboard',
-                'content': '''
+ARTICLES = [
+    {
+        'slug': 'getting-started-client-portal',
+        'category': 'client-portal-basics',
+        'title': 'Getting Started with Your Client Portal',
+        'summary': 'Learn how to access and navigate your client portal dashboard',
+        'content': '''
                     <h3>Welcome to Your Client Portal</h3>
                     <p>Your client portal is your central hub for managing your projects with Provost Home Design. Here's what you can do:</p>
                     
@@ -128,19 +124,16 @@ class Command(BaseCommand):
                         <li><strong>Profile:</strong> Update your information</li>
                     </ul>
                 ''',
-                'audience': 'client',
-                'is_featured': True,
-                'order': 1
-            }
-        )
-        
-        HelpArticle.objects.get_or_create(
-            slug='how-to-view-pay-invoices',
-            defaults={
-                'category': invoices_payments,
-                'title': 'How to View and Pay Invoices',
-                'summary': 'Step-by-step guide to viewing invoices and making payments',
-                'content': '''
+        'audience': 'client',
+        'is_featured': True,
+        'order': 1,
+    },
+    {
+        'slug': 'how-to-view-pay-invoices',
+        'category': 'invoices-and-payments',
+        'title': 'How to View and Pay Invoices',
+        'summary': 'Step-by-step guide to viewing invoices and making payments',
+        'content': '''
                     <h3>Viewing Your Invoices</h3>
                     <ol>
                         <li>Click "Invoices" in the sidebar menu</li>
@@ -172,19 +165,16 @@ class Command(BaseCommand):
                         <li>ACH Bank Transfer</li>
                     </ul>
                 ''',
-                'audience': 'client',
-                'is_featured': True,
-                'order': 1
-            }
-        )
-        
-        HelpArticle.objects.get_or_create(
-            slug='accessing-plan-files',
-            defaults={
-                'category': projects_plans,
-                'title': 'Accessing Your Plan Files',
-                'summary': 'Learn how to view and download your design plans',
-                'content': '''
+        'audience': 'client',
+        'is_featured': True,
+        'order': 1,
+    },
+    {
+        'slug': 'accessing-plan-files',
+        'category': 'projects-and-plans',
+        'title': 'Accessing Your Plan Files',
+        'summary': 'Learn how to view and download your design plans',
+        'content': '''
                     <h3>Finding Your Plans</h3>
                     <p>You can access your plan files in two ways:</p>
                     
@@ -218,21 +208,15 @@ class Command(BaseCommand):
                         <li>Link to view in your portal</li>
                     </ul>
                 ''',
-                'audience': 'client',
-                'order': 1
-            }
-        )
-        
-        # STAFF ARTICLES
-        self.stdout.write('Creating staff help articles...')
-        
-        HelpArticle.objects.get_or_create(
-            slug='staff-portal-overview',
-            defaults={
-                'category': staff_portal,
-                'title': 'Staff Portal Overview',
-                'summary': 'Complete overview of staff portal features and capabilities',
-                'content': '''
+        'audience': 'client',
+        'order': 1,
+    },
+    {
+        'slug': 'staff-portal-overview',
+        'category': 'staff-portal-guide',
+        'title': 'Staff Portal Overview',
+        'summary': 'Complete overview of staff portal features and capabilities',
+        'content': '''
                     <h3>Staff Portal Features</h3>
                     <p>As a staff member, you have access to advanced features for managing clients and projects:</p>
                     
@@ -260,19 +244,16 @@ class Command(BaseCommand):
                         <li>Send email notifications to clients</li>
                     </ul>
                 ''',
-                'audience': 'staff',
-                'is_featured': True,
-                'order': 1
-            }
-        )
-        
-        HelpArticle.objects.get_or_create(
-            slug='creating-invoices',
-            defaults={
-                'category': invoicing,
-                'title': 'Creating and Sending Invoices',
-                'summary': 'How to create invoices and manage billing for clients',
-                'content': '''
+        'audience': 'staff',
+        'is_featured': True,
+        'order': 1,
+    },
+    {
+        'slug': 'creating-invoices',
+        'category': 'invoicing-proposals',
+        'title': 'Creating and Sending Invoices',
+        'summary': 'How to create invoices and manage billing for clients',
+        'content': '''
                     <h3>Creating a New Invoice</h3>
                     <ol>
                         <li>Click "Create Invoice" in the sidebar</li>
@@ -318,19 +299,16 @@ class Command(BaseCommand):
                         <li><strong>Overdue:</strong> Past due date</li>
                     </ul>
                 ''',
-                'audience': 'staff',
-                'is_featured': True,
-                'order': 1
-            }
-        )
-        
-        HelpArticle.objects.get_or_create(
-            slug='time-tracking-guide',
-            defaults={
-                'category': time_tracking,
-                'title': 'Using the Time Tracking System',
-                'summary': 'Track time on projects and convert hours to invoices',
-                'content': '''
+        'audience': 'staff',
+        'is_featured': True,
+        'order': 1,
+    },
+    {
+        'slug': 'time-tracking-guide',
+        'category': 'time-tracking',
+        'title': 'Using the Time Tracking System',
+        'summary': 'Track time on projects and convert hours to invoices',
+        'content': '''
                     <h3>Starting a Timer</h3>
                     <ol>
                         <li>Go to Time Tracking dashboard</li>
@@ -382,19 +360,16 @@ class Command(BaseCommand):
                         <li>All time entries for project</li>
                     </ul>
                 ''',
-                'audience': 'staff',
-                'is_featured': True,
-                'order': 1
-            }
-        )
-        
-        HelpArticle.objects.get_or_create(
-            slug='uploading-plan-files',
-            defaults={
-                'category': staff_portal,
-                'title': 'Uploading Plan Files for Clients',
-                'summary': 'How to upload and share design plans with clients',
-                'content': '''
+        'audience': 'staff',
+        'is_featured': True,
+        'order': 1,
+    },
+    {
+        'slug': 'uploading-plan-files',
+        'category': 'staff-portal-guide',
+        'title': 'Uploading Plan Files for Clients',
+        'summary': 'How to upload and share design plans with clients',
+        'content': '''
                     <h3>Uploading a Plan File</h3>
                     <ol>
                         <li>Click "Upload Plan File" in sidebar</li>
@@ -431,114 +406,15 @@ class Command(BaseCommand):
                         <li>Organized by project</li>
                     </ul>
                 ''',
-                'audience': 'staff',
-                'order': 2
-            }
-        )
-        
-        # FAQs
-        self.stdout.write('Creating FAQs...')
-        
-        FAQ.objects.get_or_create(
-            question='How do I reset my password?',
-            defaults={
-                'answer': 'Click the "Forgot Password" link on the login page. Enter your email address and we\'ll send you instructions to reset your password.',
-                'category': client_portal,
-                'audience': 'both',
-                'order': 1
-            }
-        )
-        
-        FAQ.objects.get_or_create(
-            question='When will I receive my invoice?',
-            defaults={
-                'answer': 'Invoices are typically sent within 24-48 hours after work is completed. You\'ll receive an email notification when a new invoice is available in your portal.',
-                'category': invoices_payments,
-                'audience': 'client',
-                'order': 2
-            }
-        )
-        
-        FAQ.objects.get_or_create(
-            question='What payment methods do you accept?',
-            defaults={
-                'answer': 'We accept credit cards (Visa, Mastercard, American Express) and ACH bank transfers. All payments are processed securely through our payment processor.',
-                'category': invoices_payments,
-                'audience': 'client',
-                'order': 3
-            }
-        )
-        
-        FAQ.objects.get_or_create(
-            question='How do I view my project status?',
-            defaults={
-                'answer': 'Click "Projects" in the sidebar to see all your projects. Each project shows its current status, timeline, and any associated files or invoices.',
-                'category': projects_plans,
-                'audience': 'client',
-                'order': 4
-            }
-        )
-        
-        FAQ.objects.get_or_create(
-            question='Can I download my plan files?',
-            defaults={
-                'answer': 'Yes! Click on any plan file in your project or dashboard to view or download it. Files are stored securely and you can access them anytime.',
-                'category': projects_plans,
-                'audience': 'client',
-                'order': 5
-            }
-        )
-        
-        FAQ.objects.get_or_create(
-            question='How do I add a new client?',
-            defaults={
-                'answer': 'Go to "Manage Clients" and click "Add Client". Fill in the client\'s information including name, email, and contact details. The client will automatically receive login credentials.',
-                'category': client_management,
-                'audience': 'staff',
-                'order': 1
-            }
-        )
-        
-        FAQ.objects.get_or_create(
-            question='Can I track time on multiple projects?',
-            defaults={
-                'answer': 'Yes! You can only have one active timer at a time, but you can switch between projects. You can also manually add time entries for multiple projects.',
-                'category': time_tracking,
-                'audience': 'staff',
-                'order': 2
-            }
-        )
-        
-        FAQ.objects.get_or_create(
-            question='How do I mark an invoice as paid?',
-            defaults={
-                'answer': 'Open the invoice and click "Record Payment". Enter the payment amount, method, and date. The invoice status will automatically update to "Paid".',
-                'category': invoicing,
-                'audience': 'staff',
-                'order': 3
-            }
-        )
-        
-        # NEW: Expenses Category (Staff Only)
-        expenses_category = HelpCategory.objects.get_or_create(
-            slug='expense-management',
-            defaults={
-                'name': 'Expense Management',
-                'description': 'Track, manage, and approve business expenses',
-                'icon': 'fa-money-bill',
-                'audience': 'staff',
-                'order': 7
-            }
-        )[0]
-        
-        # NEW: Expense Articles
-        HelpArticle.objects.get_or_create(
-            slug='creating-expenses',
-            defaults={
-                'category': expenses_category,
-                'title': 'Creating & Submitting Expenses',
-                'summary': 'How to create and submit expense reports for reimbursement',
-                'content': '''
+        'audience': 'staff',
+        'order': 2,
+    },
+    {
+        'slug': 'creating-expenses',
+        'category': 'expense-management',
+        'title': 'Creating & Submitting Expenses',
+        'summary': 'How to create and submit expense reports for reimbursement',
+        'content': '''
                     <h3>Creating a New Expense</h3>
                     <ol>
                         <li>Navigate to <strong>Billing → Expenses → Create</strong></li>
@@ -571,19 +447,16 @@ class Command(BaseCommand):
                         <li><strong>Reimbursed:</strong> Payment processed</li>
                     </ul>
                 ''',
-                'audience': 'staff',
-                'is_featured': True,
-                'order': 1
-            }
-        )
-        
-        HelpArticle.objects.get_or_create(
-            slug='approving-expenses',
-            defaults={
-                'category': expenses_category,
-                'title': 'Approving Expenses',
-                'summary': 'How to review and approve submitted expenses',
-                'content': '''
+        'audience': 'staff',
+        'is_featured': True,
+        'order': 1,
+    },
+    {
+        'slug': 'approving-expenses',
+        'category': 'expense-management',
+        'title': 'Approving Expenses',
+        'summary': 'How to review and approve submitted expenses',
+        'content': '''
                     <h3>Reviewing Pending Expenses</h3>
                     <ol>
                         <li>Go to <strong>Billing → Expenses</strong></li>
@@ -616,19 +489,16 @@ class Command(BaseCommand):
                         <li>All selected expenses approved at once</li>
                     </ul>
                 ''',
-                'audience': 'staff',
-                'is_featured': True,
-                'order': 2
-            }
-        )
-        
-        HelpArticle.objects.get_or_create(
-            slug='expense-reports',
-            defaults={
-                'category': expenses_category,
-                'title': 'Viewing Expense Reports & Analytics',
-                'summary': 'Generate and analyze expense reports',
-                'content': '''
+        'audience': 'staff',
+        'is_featured': True,
+        'order': 2,
+    },
+    {
+        'slug': 'expense-reports',
+        'category': 'expense-management',
+        'title': 'Viewing Expense Reports & Analytics',
+        'summary': 'Generate and analyze expense reports',
+        'content': '''
                     <h3>Accessing the Expense Dashboard</h3>
                     <ol>
                         <li>Navigate to <strong>Billing → Expenses → Dashboard</strong></li>
@@ -678,18 +548,15 @@ class Command(BaseCommand):
                         <li>Export data if needed (admin)</li>
                     </ol>
                 ''',
-                'audience': 'staff',
-                'order': 3
-            }
-        )
-        
-        HelpArticle.objects.get_or_create(
-            slug='expense-tips',
-            defaults={
-                'category': expenses_category,
-                'title': 'Best Practices for Expense Tracking',
-                'summary': 'Tips for accurate and efficient expense management',
-                'content': '''
+        'audience': 'staff',
+        'order': 3,
+    },
+    {
+        'slug': 'expense-tips',
+        'category': 'expense-management',
+        'title': 'Best Practices for Expense Tracking',
+        'summary': 'Tips for accurate and efficient expense management',
+        'content': '''
                     <h3>Receipt Storage</h3>
                     <ul>
                         <li>Use Dropbox, Google Drive, or OneDrive for cloud storage</li>
@@ -727,61 +594,15 @@ class Command(BaseCommand):
                         <li>Gather receipt within a few days</li>
                     </ul>
                 ''',
-                'audience': 'staff',
-                'order': 4
-            }
-        )
-        
-        # NEW: FAQs for Expenses
-        FAQ.objects.get_or_create(
-            question='Can I edit an expense after submitting it?',
-            defaults={
-                'answer': 'You can only edit expenses with "Pending" status. Once approved, rejected, or reimbursed, the expense is locked. Contact your manager if you need to make changes.',
-                'category': expenses_category,
-                'audience': 'staff',
-                'order': 1
-            }
-        )
-        
-        FAQ.objects.get_or_create(
-            question='How long does expense approval take?',
-            defaults={
-                'answer': 'Managers typically review and approve expenses within 2-3 business days. For faster approval, include complete information and a valid receipt URL when submitting.',
-                'category': expenses_category,
-                'audience': 'staff',
-                'order': 2
-            }
-        )
-        
-        FAQ.objects.get_or_create(
-            question='What information should I include in the receipt?',
-            defaults={
-                'answer': 'Include a link to the original receipt showing date, amount, vendor name, and itemization if possible. Cloud storage links (Dropbox, Google Drive) work perfectly.',
-                'category': expenses_category,
-                'audience': 'staff',
-                'order': 3
-            }
-        )
-        
-        # NEW: Reminders Category
-        reminders_category = HelpCategory.objects.get_or_create(
-            slug='invoice-reminders',
-            defaults={
-                'name': 'Invoice Reminders',
-                'description': 'Automatic reminders for unpaid invoices',
-                'icon': 'fa-bell',
-                'audience': 'staff',
-                'order': 8
-            }
-        )[0]
-        
-        HelpArticle.objects.get_or_create(
-            slug='how-overdue-reminders-work',
-            defaults={
-                'category': reminders_category,
-                'title': 'How Overdue Invoice Reminders Work',
-                'summary': 'Understand automatic reminder emails for unpaid invoices',
-                'content': '''
+        'audience': 'staff',
+        'order': 4,
+    },
+    {
+        'slug': 'how-overdue-reminders-work',
+        'category': 'invoice-reminders',
+        'title': 'How Overdue Invoice Reminders Work',
+        'summary': 'Understand automatic reminder emails for unpaid invoices',
+        'content': '''
                     <h3>Automated Reminder System</h3>
                     <p>The system automatically sends professional reminder emails to clients when invoices become overdue:</p>
                     
@@ -827,19 +648,16 @@ class Command(BaseCommand):
                         <li>Payment instructions</li>
                     </ul>
                 ''',
-                'audience': 'staff',
-                'is_featured': True,
-                'order': 1
-            }
-        )
-        
-        HelpArticle.objects.get_or_create(
-            slug='configuring-reminders',
-            defaults={
-                'category': reminders_category,
-                'title': 'Configuring Email Reminders',
-                'summary': 'Set up automatic reminder emails for your system',
-                'content': '''
+        'audience': 'staff',
+        'is_featured': True,
+        'order': 1,
+    },
+    {
+        'slug': 'configuring-reminders',
+        'category': 'invoice-reminders',
+        'title': 'Configuring Email Reminders',
+        'summary': 'Set up automatic reminder emails for your system',
+        'content': '''
                     <h3>Email Configuration</h3>
                     <p>To enable reminder emails, configure your email settings:</p>
                     
@@ -877,18 +695,15 @@ send_mail('Test', 'Message', 'from@example.com', ['to@example.com'])
                     <p>Or for specific day threshold:</p>
                     <pre><code>python manage.py send_overdue_reminders --days 30</code></pre>
                 ''',
-                'audience': 'staff',
-                'order': 2
-            }
-        )
-        
-        HelpArticle.objects.get_or_create(
-            slug='scheduling-reminders',
-            defaults={
-                'category': reminders_category,
-                'title': 'Scheduling Daily Reminder Emails',
-                'summary': 'Set up reminders to run automatically each day',
-                'content': '''
+        'audience': 'staff',
+        'order': 2,
+    },
+    {
+        'slug': 'scheduling-reminders',
+        'category': 'invoice-reminders',
+        'title': 'Scheduling Daily Reminder Emails',
+        'summary': 'Set up reminders to run automatically each day',
+        'content': '''
                     <h3>Scheduling Reminders (Production)</h3>
                     <p>Schedule reminders to run automatically each day at 8:00 AM:</p>
                     
@@ -935,18 +750,15 @@ scheduler.start()</code></pre>
                         <li>Verify clients receive emails on schedule</li>
                     </ol>
                 ''',
-                'audience': 'staff',
-                'order': 3
-            }
-        )
-        
-        HelpArticle.objects.get_or_create(
-            slug='reminder-troubleshooting',
-            defaults={
-                'category': reminders_category,
-                'title': 'Troubleshooting Reminder Emails',
-                'summary': 'Solve common issues with overdue reminder emails',
-                'content': '''
+        'audience': 'staff',
+        'order': 3,
+    },
+    {
+        'slug': 'reminder-troubleshooting',
+        'category': 'invoice-reminders',
+        'title': 'Troubleshooting Reminder Emails',
+        'summary': 'Solve common issues with overdue reminder emails',
+        'content': '''
                     <h3>Problem: Reminders Not Being Sent</h3>
                     
                     <h4>Check 1: Email Configuration</h4>
@@ -1017,43 +829,178 @@ python manage.py send_overdue_reminders
 inv = Invoice.objects.get(invoice_number='TEST-001')
 print(inv.reminder_sent)  # Should be True</code></pre>
                 ''',
-                'audience': 'staff',
-                'order': 4
-            }
-        )
-        
-        # NEW: FAQs for Reminders
-        FAQ.objects.get_or_create(
-            question='How do I send reminders without waiting for the scheduled time?',
-            defaults={
-                'answer': 'Run the command manually: `python manage.py send_overdue_reminders`. This sends all pending reminders immediately. You can also use `--days N` to send reminders for specific day thresholds.',
-                'category': reminders_category,
-                'audience': 'staff',
-                'order': 1
-            }
-        )
-        
-        FAQ.objects.get_or_create(
-            question='Why are reminders not going out?',
-            defaults={
-                'answer': 'Check: (1) Email settings configured in settings.py, (2) System settings filled in (Company Name), (3) Client has email address, (4) Invoice is unpaid and past due. Run the command manually to see error messages.',
-                'category': reminders_category,
-                'audience': 'staff',
-                'order': 2
-            }
+        'audience': 'staff',
+        'order': 4,
+    },
+]
+
+FAQS = [
+    {
+        'question': 'How do I reset my password?',
+        'answer': 'Click the "Forgot Password" link on the login page. Enter your email address and we\'ll send you instructions to reset your password.',
+        'category': 'client-portal-basics',
+        'audience': 'both',
+        'order': 1,
+    },
+    {
+        'question': 'When will I receive my invoice?',
+        'answer': 'Invoices are typically sent within 24-48 hours after work is completed. You\'ll receive an email notification when a new invoice is available in your portal.',
+        'category': 'invoices-and-payments',
+        'audience': 'client',
+        'order': 2,
+    },
+    {
+        'question': 'What payment methods do you accept?',
+        'answer': 'We accept credit cards (Visa, Mastercard, American Express) and ACH bank transfers. All payments are processed securely through our payment processor.',
+        'category': 'invoices-and-payments',
+        'audience': 'client',
+        'order': 3,
+    },
+    {
+        'question': 'How do I view my project status?',
+        'answer': 'Click "Projects" in the sidebar to see all your projects. Each project shows its current status, timeline, and any associated files or invoices.',
+        'category': 'projects-and-plans',
+        'audience': 'client',
+        'order': 4,
+    },
+    {
+        'question': 'Can I download my plan files?',
+        'answer': 'Yes! Click on any plan file in your project or dashboard to view or download it. Files are stored securely and you can access them anytime.',
+        'category': 'projects-and-plans',
+        'audience': 'client',
+        'order': 5,
+    },
+    {
+        'question': 'How do I add a new client?',
+        'answer': 'Go to "Manage Clients" and click "Add Client". Fill in the client\'s information including name, email, and contact details. The client will automatically receive login credentials.',
+        'category': 'client-management',
+        'audience': 'staff',
+        'order': 1,
+    },
+    {
+        'question': 'Can I track time on multiple projects?',
+        'answer': 'Yes! You can only have one active timer at a time, but you can switch between projects. You can also manually add time entries for multiple projects.',
+        'category': 'time-tracking',
+        'audience': 'staff',
+        'order': 2,
+    },
+    {
+        'question': 'How do I mark an invoice as paid?',
+        'answer': 'Open the invoice and click "Record Payment". Enter the payment amount, method, and date. The invoice status will automatically update to "Paid".',
+        'category': 'invoicing-proposals',
+        'audience': 'staff',
+        'order': 3,
+    },
+    {
+        'question': 'Can I edit an expense after submitting it?',
+        'answer': 'You can only edit expenses with "Pending" status. Once approved, rejected, or reimbursed, the expense is locked. Contact your manager if you need to make changes.',
+        'category': 'expense-management',
+        'audience': 'staff',
+        'order': 1,
+    },
+    {
+        'question': 'How long does expense approval take?',
+        'answer': 'Managers typically review and approve expenses within 2-3 business days. For faster approval, include complete information and a valid receipt URL when submitting.',
+        'category': 'expense-management',
+        'audience': 'staff',
+        'order': 2,
+    },
+    {
+        'question': 'What information should I include in the receipt?',
+        'answer': 'Include a link to the original receipt showing date, amount, vendor name, and itemization if possible. Cloud storage links (Dropbox, Google Drive) work perfectly.',
+        'category': 'expense-management',
+        'audience': 'staff',
+        'order': 3,
+    },
+    {
+        'question': 'How do I send reminders without waiting for the scheduled time?',
+        'answer': 'Run the command manually: `python manage.py send_overdue_reminders`. This sends all pending reminders immediately. You can also use `--days N` to send reminders for specific day thresholds.',
+        'category': 'invoice-reminders',
+        'audience': 'staff',
+        'order': 1,
+    },
+    {
+        'question': 'Why are reminders not going out?',
+        'answer': 'Check: (1) Email settings configured in settings.py, (2) System settings filled in (Company Name), (3) Client has email address, (4) Invoice is unpaid and past due. Run the command manually to see error messages.',
+        'category': 'invoice-reminders',
+        'audience': 'staff',
+        'order': 2,
+    },
+    {
+        'question': 'Can I customize the reminder email?',
+        'answer': 'The email templates are in templates/billing/email/. You can edit overdue_reminder.html for the HTML version and overdue_reminder.txt for the text version to customize the message and branding.',
+        'category': 'invoice-reminders',
+        'audience': 'staff',
+        'order': 3,
+    },
+]
+
+
+class Command(BaseCommand):
+    help = 'Populate initial help content for the portal'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--update',
+            action='store_true',
+            help='Also bring existing categories, articles and FAQs back in line with this content',
         )
-        
-        FAQ.objects.get_or_create(
-            question='Can I customize the reminder email?',
-            defaults={
-                'answer': 'The email templates are in templates/billing/email/. You can edit overdue_reminder.html for the HTML version and overdue_reminder.txt for the text version to customize the message and branding.',
-                'category': reminders_category,
-                'audience': 'staff',
-                'order': 3
-            }
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would change without writing',
         )
-        
+
+    def handle(self, *args, **options):
+        update = options.get('update', False)
+        dry_run = options.get('dry_run', False)
+
+        with transaction.atomic():
+            self.stdout.write('Creating help categories...')
+            categories = seed(HelpCategory, CATEGORIES, key='slug', update=update, dry_run=dry_run)
+            by_slug = categories.by_key()
+            self.stdout.write(self.style.SUCCESS(f'✓ {categories.summary()}'))
+
+            self.stdout.write('Creating help articles...')
+            articles = seed(
+                HelpArticle,
+                [{**record, 'category': by_slug[record['category']]} for record in ARTICLES],
+                key='slug',
+                update=update,
+                # Bulk writes skip the pre_save hook that renders the body.
+                prepare=rendering.render_into,
+                prepared_fields=['rendered_content', 'toc', 'content_hash'],
+                dry_run=dry_run,
+            )
+            self.stdout.write(self.style.SUCCESS(f'✓ {articles.summary()}'))
+
+            self.stdout.write('Creating FAQs...')
+            faqs = seed(
+                FAQ,
+                [
+                    {**record, 'category': by_slug[record['category']]} if 'category' in record else record
+                    for record in FAQS
+                ],
+                key='question',
+                update=update,
+                dry_run=dry_run,
+            )
+            self.stdout.write(self.style.SUCCESS(f'✓ {faqs.summary()}'))
+
+            for result in (categories, articles, faqs):
+                for line in result.lines():
+                    self.stdout.write(line)
+
+            if not dry_run:
+                # ...and the post_save hooks that keep search and the landing cache current.
+                if articles.changed:
+                    search.rebuild()
+                if categories.changed or articles.changed or faqs.changed:
+                    transaction.on_commit(landing.invalidate)
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN - No changes made to database'))
         self.stdout.write(self.style.SUCCESS('✓ Help content created successfully!'))
-        self.stdout.write(self.style.SUCCESS(f'Categories: {HelpCategory.objects.count()}'))
-        self.stdout.write(self.style.SUCCESS(f'Articles: {HelpArticle.objects.count()}'))
-        self.stdout.write(self.style.SUCCESS(f'FAQs: {FAQ.objects.count()}'))
+        self.stdout.write(self.style.SUCCESS(f'Categories: {len(categories.objects)}'))
+        self.stdout.write(self.style.SUCCESS(f'Articles: {len(articles.objects)}'))
+        self.stdout.write(self.style.SUCCESS(f'FAQs: {len(faqs.objects)}'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from help import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the help article full-text search index'
+
+    def handle(self, *args, **options):
+        count = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} help articles'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from help import rendering
+from help.models import HelpArticle
+
+
+class Command(BaseCommand):
+    help = 'Render help article bodies (sanitized HTML, heading anchors, table of contents, thumbnails)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Re-render articles that are already current')
+
+    def handle(self, *args, **options):
+        changed = []
+        for article in HelpArticle.objects.only('id', 'content', 'content_hash').iterator(chunk_size=100):
+            if rendering.render_into(article, force=options['force']):
+                changed.append(article)
+        # bulk_update skips the save signals (and updated_at): only derived fields change.
+        HelpArticle.objects.bulk_update(changed, ['rendered_content', 'toc', 'content_hash'], batch_size=100)
+        self.stdout.write(self.style.SUCCESS(f'Rendered {len(changed)} help articles'))
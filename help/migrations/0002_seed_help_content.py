@@ -4,15 +4,11 @@ from django.db import migrations
 
 
 def seed_help_content(apps, schema_editor):
-    """Populate help content automatically during migration."""
-    HelpCategory = apps.get_model('help', 'HelpCategory')
-    HelpArticle = apps.get_model('help', 'HelpArticle')
-    FAQ = apps.get_model('help', 'FAQ')
-    
-    # Import and run the populate logic
-    from help.management.commands.populate_help import Command
-    command = Command()
-    command.handle()
+    """Help content is seeded by ``manage.py populate_help`` at deploy time.
+
+    That command uses the live models, which a migration this early can't
+    rely on, so there is nothing left to do here.
+    """
 
 
 def reverse_seed(apps, schema_editor):
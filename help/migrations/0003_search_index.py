@@ -0,0 +1,94 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:25
+
+import html
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils.html import strip_tags
+
+PG_VECTOR = (
+    "setweight(to_tsvector('english', title), 'A') || "
+    "setweight(to_tsvector('english', summary), 'B') || "
+    "setweight(to_tsvector('english', body), 'C')"
+)
+
+SQLITE_SQL = [
+    """CREATE VIRTUAL TABLE help_search_fts USING fts5(
+        title, summary, body, audience UNINDEXED,
+        content='help_helpsearchentry', content_rowid='article_id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER help_search_ai AFTER INSERT ON help_helpsearchentry BEGIN
+        INSERT INTO help_search_fts(rowid, title, summary, body, audience)
+        VALUES (new.article_id, new.title, new.summary, new.body, new.audience);
+    END""",
+    """CREATE TRIGGER help_search_ad AFTER DELETE ON help_helpsearchentry BEGIN
+        INSERT INTO help_search_fts(help_search_fts, rowid, title, summary, body, audience)
+        VALUES ('delete', old.article_id, old.title, old.summary, old.body, old.audience);
+    END""",
+    """CREATE TRIGGER help_search_au AFTER UPDATE ON help_helpsearchentry BEGIN
+        INSERT INTO help_search_fts(help_search_fts, rowid, title, summary, body, audience)
+        VALUES ('delete', old.article_id, old.title, old.summary, old.body, old.audience);
+        INSERT INTO help_search_fts(rowid, title, summary, body, audience)
+        VALUES (new.article_id, new.title, new.summary, new.body, new.audience);
+    END""",
+]
+
+
+def install_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(f"CREATE INDEX help_search_vector_idx ON help_helpsearchentry USING GIN (({PG_VECTOR}))")
+    elif vendor == 'sqlite':
+        for sql in SQLITE_SQL:
+            schema_editor.execute(sql)
+
+
+def remove_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS help_search_vector_idx")
+    elif vendor == 'sqlite':
+        for trigger in ('help_search_ai', 'help_search_ad', 'help_search_au'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        schema_editor.execute("DROP TABLE IF EXISTS help_search_fts")
+
+
+def index_articles(apps, schema_editor):
+    HelpArticle = apps.get_model('help', 'HelpArticle')
+    HelpSearchEntry = apps.get_model('help', 'HelpSearchEntry')
+    HelpSearchEntry.objects.bulk_create([
+        HelpSearchEntry(
+            article_id=a.pk,
+            title=a.title,
+            summary=a.summary,
+            body=' '.join(html.unescape(strip_tags(a.content or '')).split()),
+            audience=a.audience,
+        )
+        for a in HelpArticle.objects.filter(is_active=True)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('help', '0002_seed_help_content'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HelpSearchEntry',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_entry', serialize=False, to='help.helparticle')),
+                ('title', models.CharField(max_length=200)),
+                ('summary', models.CharField(max_length=300)),
+                ('body', models.TextField(help_text='Article content with the HTML stripped')),
+                ('audience', models.CharField(choices=[('client', 'Client'), ('staff', 'Staff'), ('both', 'Both')], max_length=10)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Help search entries',
+            },
+        ),
+        migrations.RunPython(install_search_index, remove_search_index),
+        migrations.RunPython(index_articles, migrations.RunPython.noop),
+    ]
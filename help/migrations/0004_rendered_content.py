@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('help', '0003_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='helparticle',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='helparticle',
+            name='rendered_content',
+            field=models.TextField(blank=True, editable=False, help_text='Sanitized content with heading anchors'),
+        ),
+        migrations.AddField(
+            model_name='helparticle',
+            name='toc',
+            field=models.JSONField(blank=True, default=list, editable=False, help_text='Table of contents from the headings'),
+        ),
+    ]
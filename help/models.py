@@ -49,6 +49,11 @@ class HelpArticle(models.Model):
     is_active = models.BooleanField(default=True)
     views = models.IntegerField(default=0, editable=False)
     
+    # Processed on save by help.rendering
+    rendered_content = models.TextField(blank=True, editable=False, help_text="Sanitized content with heading anchors")
+    toc = models.JSONField(default=list, blank=True, editable=False, help_text="Table of contents from the headings")
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -61,9 +66,9 @@ class HelpArticle(models.Model):
         return self.title
     
     def increment_views(self):
-        """Increment the view counter."""
+        """Increment the view counter now (atomically). Views use help.view_counts instead."""
+        HelpArticle.objects.filter(pk=self.pk).update(views=models.F('views') + 1)
         self.views += 1
-        self.save(update_fields=['views'])
 
 
 class FAQ(models.Model):
@@ -90,3 +95,20 @@ class FAQ(models.Model):
     
     def __str__(self):
         return self.question
+
+
+class HelpSearchEntry(models.Model):
+    """Plain-text copy of an active article for full-text search (see help.search)."""
+    
+    article = models.OneToOneField(HelpArticle, on_delete=models.CASCADE, primary_key=True, related_name='search_entry')
+    title = models.CharField(max_length=200)
+    summary = models.CharField(max_length=300)
+    body = models.TextField(help_text="Article content with the HTML stripped")
+    audience = models.CharField(max_length=10, choices=HelpArticle.AUDIENCE_CHOICES)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = "Help search entries"
+    
+    def __str__(self):
+        return self.title
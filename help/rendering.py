@@ -0,0 +1,170 @@
+"""
+Pre-rendered help article bodies.
+
+``HelpArticle.content`` is admin-written HTML. On save (see
+``help.signals``) it is processed once into ``rendered_content``:
+
+* sanitized against a tag/attribute allowlist (scripts, styles, event
+  handlers and ``javascript:`` URLs are dropped);
+* ``h2``-``h4`` headings get unique anchor ids and make up ``toc``;
+* images stored in media are swapped for the ``help_inline`` thumbnail.
+
+``content_hash`` (of the source and ``RENDER_VERSION``) lets saves and
+``manage.py render_help_articles`` skip articles that are already current.
+"""
+import hashlib
+import logging
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils.html import escape
+from django.utils.text import slugify
+
+logger = logging.getLogger(__name__)
+
+# Bump when the output of render() changes so stored renderings are redone.
+RENDER_VERSION = 1
+THUMBNAIL_ALIAS = 'help_inline'
+
+ALLOWED_TAGS = {
+    'a', 'b', 'blockquote', 'br', 'code', 'div', 'em', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'i', 'img',
+    'kbd', 'li', 'ol', 'p', 'pre', 'small', 'span', 'strong', 'table', 'tbody', 'td', 'th', 'thead',
+    'tr', 'u', 'ul',
+}
+VOID_TAGS = {'br', 'hr', 'img'}
+DROP_WITH_CONTENT = {'script', 'style', 'iframe', 'object', 'embed', 'template', 'noscript'}
+TOC_HEADINGS = {'h2', 'h3', 'h4'}
+ALLOWED_ATTRS = {
+    'a': {'href', 'title', 'target'},
+    'img': {'src', 'alt', 'title', 'width', 'height'},
+    'td': {'colspan', 'rowspan'},
+    'th': {'colspan', 'rowspan'},
+}
+GLOBAL_ATTRS = {'class'}
+URL_ATTRS = {'href', 'src'}
+SAFE_SCHEMES = {'', 'http', 'https', 'mailto', 'tel'}
+
+
+def content_hash(content):
+    return hashlib.sha256(f'{RENDER_VERSION}:{content or ""}'.encode('utf-8')).hexdigest()
+
+
+def _safe_url(value):
+    compact = ''.join(ch for ch in value if ch.isprintable() and not ch.isspace())
+    try:
+        scheme = urlsplit(compact).scheme.lower()
+    except ValueError:
+        return False
+    return scheme in SAFE_SCHEMES
+
+
+def inline_thumbnail(src):
+    """``(url, width, height)`` of the thumbnail for a media image URL, or None."""
+    media_url = settings.MEDIA_URL or ''
+    if not media_url or not src.startswith(media_url):
+        return None
+    name = src[len(media_url):].split('?', 1)[0]
+    try:
+        from easy_thumbnails.files import get_thumbnailer
+
+        thumb = get_thumbnailer(default_storage.open(name), relative_name=name)[THUMBNAIL_ALIAS]
+        return thumb.url, thumb.width, thumb.height
+    except Exception:
+        logger.warning("Could not build a help thumbnail for %s", name, exc_info=True)
+        return None
+
+
+class _ArticleRenderer(HTMLParser):
+    def __init__(self, thumbnail):
+        super().__init__(convert_charrefs=True)
+        self.thumbnail = thumbnail
+        self.out = []
+        self.toc = []
+        self._ids = set()
+        self._skip = 0
+        self._heading = None  # (tag, index of its placeholder in out, text parts)
+
+    def _attrs(self, tag, attrs):
+        allowed = ALLOWED_ATTRS.get(tag, set()) | GLOBAL_ATTRS
+        cleaned = {}
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name in URL_ATTRS and not _safe_url(value):
+                continue
+            cleaned[name] = value
+        if tag == 'a' and cleaned.get('target') == '_blank':
+            cleaned['rel'] = 'noopener noreferrer'
+        if tag == 'img' and cleaned.get('src'):
+            thumb = self.thumbnail(cleaned['src'])
+            if thumb:
+                cleaned['src'], cleaned['width'], cleaned['height'] = thumb
+            cleaned['loading'] = 'lazy'
+        return ''.join(f' {name}="{escape(value)}"' for name, value in cleaned.items())
+
+    def _anchor(self, text):
+        base = slugify(text) or 'section'
+        anchor, n = base, 2
+        while anchor in self._ids:
+            anchor, n = f'{base}-{n}', n + 1
+        self._ids.add(anchor)
+        return anchor
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_WITH_CONTENT:
+            self._skip += 1
+            return
+        if self._skip or tag not in ALLOWED_TAGS:
+            return
+        if tag in TOC_HEADINGS and self._heading is None:
+            self._heading = (tag, len(self.out), [])
+            self.out.append('')
+            return
+        self.out.append(f'<{tag}{self._attrs(tag, attrs)}>')
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROP_WITH_CONTENT:
+            self._skip = max(self._skip - 1, 0)
+            return
+        if self._skip or tag not in ALLOWED_TAGS or tag in VOID_TAGS:
+            return
+        if self._heading and tag == self._heading[0]:
+            _tag, index, parts = self._heading
+            title = ' '.join(''.join(parts).split())
+            anchor = self._anchor(title)
+            self.out[index] = f'<{tag} id="{anchor}">'
+            self.toc.append({'level': int(tag[1]), 'id': anchor, 'title': title})
+            self._heading = None
+        self.out.append(f'</{tag}>')
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        self.out.append(escape(data))
+        if self._heading:
+            self._heading[2].append(data)
+
+
+def render(content, thumbnail=inline_thumbnail):
+    """Sanitized HTML and table of contents for article ``content``."""
+    renderer = _ArticleRenderer(thumbnail)
+    renderer.feed(content or '')
+    renderer.close()
+    return ''.join(renderer.out), renderer.toc
+
+
+def render_into(article, force=False):
+    """Fill the rendered fields of ``article``; returns False when they were already current."""
+    digest = content_hash(article.content)
+    if not force and article.content_hash == digest:
+        return False
+    article.rendered_content, article.toc = render(article.content)
+    article.content_hash = digest
+    return True
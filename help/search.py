@@ -0,0 +1,154 @@
+"""
+Ranked full-text search over help articles.
+
+Every active article has a ``HelpSearchEntry`` holding its title, summary
+and content with the HTML stripped, kept current by ``help.signals``. The
+entries are searched with Postgres full-text search (a GIN index on the
+weighted title/summary/body vector) or, on SQLite, an external-content FTS5
+table maintained by triggers (both created in migration 0003). Title
+matches outrank summary matches, which outrank body matches, and the
+audience filter is part of the index query. Other databases fall back to
+``icontains`` over the plain text.
+
+Results are articles in rank order, each with a ``search_snippet``: an
+escaped excerpt of the body with the matched terms in ``<mark>``.
+"""
+import html
+import re
+
+from django.db import connection
+from django.utils.html import escape, strip_tags
+from django.utils.safestring import mark_safe
+
+from .models import HelpArticle, HelpSearchEntry
+
+ENTRY_TABLE = HelpSearchEntry._meta.db_table
+FTS_TABLE = 'help_search_fts'
+PG_INDEX = 'help_search_vector_idx'
+PG_CONFIG = 'english'
+PG_VECTOR = (
+    f"setweight(to_tsvector('{PG_CONFIG}', title), 'A') || "
+    f"setweight(to_tsvector('{PG_CONFIG}', summary), 'B') || "
+    f"setweight(to_tsvector('{PG_CONFIG}', body), 'C')"
+)
+FTS_WEIGHTS = (10.0, 4.0, 1.0)  # bm25 weights for title, summary, body
+
+# Private-use markers around matches; the snippet is escaped, then they become <mark>.
+_START, _STOP = '\ue000', '\ue001'
+SNIPPET_WORDS = 24
+DEFAULT_LIMIT = 10
+
+
+def plain_text(content):
+    """Article HTML as searchable text: tags stripped, entities decoded, whitespace collapsed."""
+    return ' '.join(html.unescape(strip_tags(content or '')).split())
+
+
+def index_article(article):
+    if not article.is_active:
+        HelpSearchEntry.objects.filter(article_id=article.pk).delete()
+        return
+    HelpSearchEntry.objects.update_or_create(
+        article_id=article.pk,
+        defaults={
+            'title': article.title,
+            'summary': article.summary,
+            'body': plain_text(article.content),
+            'audience': article.audience,
+        },
+    )
+
+
+def rebuild():
+    """Re-index every article; returns the number of entries."""
+    HelpSearchEntry.objects.all().delete()
+    entries = [
+        HelpSearchEntry(
+            article_id=a.pk, title=a.title, summary=a.summary, body=plain_text(a.content), audience=a.audience,
+        )
+        for a in HelpArticle.objects.filter(is_active=True)
+    ]
+    HelpSearchEntry.objects.bulk_create(entries)
+    return len(entries)
+
+
+# ── backends ────────────────────────────────────────────────────────────────
+def _postgres_hits(query, audience, limit):
+    options = f'StartSel="{_START}", StopSel="{_STOP}", MaxWords={SNIPPET_WORDS}, MinWords=8'
+    sql = f"""
+        SELECT article_id, ts_headline('{PG_CONFIG}', body, query, %s)
+        FROM (
+            SELECT e.article_id, e.body, q.query, ts_rank({PG_VECTOR}, q.query) AS rank
+            FROM {ENTRY_TABLE} e, websearch_to_tsquery('{PG_CONFIG}', %s) AS q(query)
+            WHERE {PG_VECTOR} @@ q.query AND e.audience IN (%s, 'both')
+            ORDER BY rank DESC, e.article_id
+            LIMIT %s
+        ) hits
+        ORDER BY rank DESC, article_id
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [options, query, audience, limit])
+        return cursor.fetchall()
+
+
+def _fts5_match(query):
+    # Quote every word so user input can't form FTS5 syntax; prefix-match each one.
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', query))
+
+
+def _sqlite_hits(query, audience, limit):
+    match = _fts5_match(query)
+    if not match:
+        return []
+    sql = f"""
+        SELECT e.article_id, snippet({FTS_TABLE}, 2, %s, %s, '…', {SNIPPET_WORDS})
+        FROM {FTS_TABLE} JOIN {ENTRY_TABLE} e ON e.article_id = {FTS_TABLE}.rowid
+        WHERE {FTS_TABLE} MATCH %s AND e.audience IN (%s, 'both')
+        ORDER BY bm25({FTS_TABLE}, {', '.join(map(str, FTS_WEIGHTS))})
+        LIMIT %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [_START, _STOP, match, audience, limit])
+        return cursor.fetchall()
+
+
+def _fallback_hits(query, audience, limit):
+    entries = HelpSearchEntry.objects.filter(audience__in=[audience, 'both'])
+    hits = []
+    for field in ('title', 'summary', 'body'):
+        found = entries.filter(**{f'{field}__icontains': query}).exclude(article_id__in=[h[0] for h in hits])
+        hits += [(e.article_id, e.body[:SNIPPET_WORDS * 8]) for e in found[:limit - len(hits)]]
+        if len(hits) >= limit:
+            break
+    return hits
+
+
+def _highlight(snippet):
+    return mark_safe(escape(snippet or '').replace(_START, '<mark>').replace(_STOP, '</mark>'))
+
+
+def search(query, audience, limit=DEFAULT_LIMIT):
+    """Active articles for ``audience`` matching ``query``, best first, with ``search_snippet`` set."""
+    query = (query or '').strip()
+    if not query:
+        return []
+    if connection.vendor == 'postgresql':
+        hits = _postgres_hits(query, audience, limit)
+    elif connection.vendor == 'sqlite':
+        hits = _sqlite_hits(query, audience, limit)
+    else:
+        hits = _fallback_hits(query, audience, limit)
+
+    articles = (
+        HelpArticle.objects.filter(pk__in=[pk for pk, _ in hits], is_active=True)
+        .select_related('category')
+        .defer('content')
+        .in_bulk()
+    )
+    results = []
+    for pk, snippet in hits:
+        article = articles.get(pk)
+        if article is not None:
+            article.search_snippet = _highlight(snippet)
+            results.append(article)
+    return results
@@ -0,0 +1,28 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import landing, rendering, search
+from .models import FAQ, HelpArticle, HelpCategory
+
+
+@receiver([post_save, post_delete], sender=HelpArticle)
+@receiver([post_save, post_delete], sender=HelpCategory)
+@receiver([post_save, post_delete], sender=FAQ)
+def help_content_changed(sender, **kwargs):
+    # After commit: the seeding migration saves content inside its transaction,
+    # before the database cache table exists.
+    transaction.on_commit(landing.invalidate)
+
+
+@receiver(post_save, sender=HelpArticle)
+def help_article_saved(sender, instance, **kwargs):
+    # Keep the plain-text search entry in step (deletes cascade to it).
+    search.index_article(instance)
+
+
+@receiver(pre_save, sender=HelpArticle)
+def help_article_render(sender, instance, raw=False, **kwargs):
+    # Sanitize, anchor headings and thumbnail images once, when the content changes.
+    if not raw:
+        rendering.render_into(instance)
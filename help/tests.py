@@ -1,3 +1,286 @@
-from django.test import TestCase
+import io
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+
+from . import landing, rendering, search, view_counts
+from .models import FAQ, HelpArticle, HelpCategory
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'help-tests'}}
+
+
+def _render_context(request, template_name, context=None):
+    # The help templates extend the portal base from the billing app, which is
+    # not part of this tree; keep the context for assertions instead.
+    response = HttpResponse(template_name)
+    response.help_context = context
+    return response
+
+
+@override_settings(HELP_VIEW_FLUSH_INTERVAL=3600, CACHES=LOCMEM)
+@mock.patch('help.views.render', _render_context)
+class ArticleViewCountTests(TestCase):
+    def setUp(self):
+        view_counts.flush()
+        self.addCleanup(view_counts.flush)
+        self.user = User.objects.create_user('client', password='pw')
+        self.client.force_login(self.user)
+        category = HelpCategory.objects.create(name='Billing', slug='test-billing', audience='both')
+        self.article = HelpArticle.objects.create(
+            category=category, title='Paying an invoice', slug='test-paying-an-invoice',
+            summary='How to pay', content='<p>Steps</p>', audience='both',
+        )
+
+    def test_views_are_buffered_then_flushed_in_one_statement(self):
+        for _ in range(3):
+            response = self.client.get('/help/article/test-paying-an-invoice/')
+            self.assertEqual(response.status_code, 200)
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.views, 0)
+        self.assertEqual(view_counts.pending(), {self.article.pk: 3})
+
+        with self.assertNumQueries(1):
+            self.assertEqual(view_counts.flush(), 1)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.views, 3)
+        self.assertEqual(view_counts.pending(), {})
+
+    def test_popular_articles_use_flushed_totals(self):
+        HelpArticle.objects.filter(pk=self.article.pk).update(views=10_000)
+
+        response = self.client.get('/help/')
+
+        self.assertEqual(response.help_context['popular_articles'][0], self.article)
+
+
+@override_settings(CACHES=LOCMEM)
+@mock.patch('help.views.render', _render_context)
+class HelpCenterLandingTests(TestCase):
+    def setUp(self):
+        landing.invalidate()
+        self.addCleanup(landing.invalidate)
+        self.addCleanup(view_counts.flush)
+        self.client.force_login(User.objects.create_user('client', password='pw'))
+        self.billing = HelpCategory.objects.create(name='Billing', slug='test-billing', order=1)
+        self.projects = HelpCategory.objects.create(name='Projects', slug='test-projects', order=2)
+        self.internal = HelpCategory.objects.create(name='Internal', slug='test-internal', order=3)
+        for i, audience in enumerate(['client', 'both', 'staff']):
+            HelpArticle.objects.create(
+                category=self.billing, title=f'Billing {i}', slug=f'test-billing-{i}',
+                summary='s', content='c', audience=audience, is_featured=(i == 0),
+            )
+        HelpArticle.objects.create(
+            category=self.projects, title='Hidden', slug='test-hidden', summary='s', content='c', is_active=False,
+        )
+        HelpArticle.objects.create(
+            category=self.internal, title='Staff only', slug='test-staff-only', summary='s', content='c', audience='staff',
+        )
+
+    def _landing(self):
+        return self.client.get('/help/').help_context
+
+    def test_counts_are_annotated_per_audience(self):
+        context = self._landing()
+        counts = {c.slug: c.filtered_article_count for c in context['categories'] if c.slug.startswith('test-')}
+        self.assertEqual(counts, {'test-billing': 2})
+        self.assertEqual([a.slug for a in context['featured_articles'] if a.slug.startswith('test-')], ['test-billing-0'])
+
+        staff = {c.slug: c.filtered_article_count for c in landing.build('staff')['categories']}
+        self.assertEqual(staff['test-billing'], 2)
+        self.assertEqual(staff['test-internal'], 1)
+
+    def test_payload_is_built_in_two_queries_and_cached(self):
+        with self.assertNumQueries(2):
+            payload = landing.get_landing('client')
+        with self.assertNumQueries(0):
+            landing.get_landing('client')
+
+        deferred = payload['recent_articles'][0].get_deferred_fields()
+        self.assertTrue({'content', 'rendered_content', 'toc'} <= deferred)
+        with self.assertNumQueries(0):  # everything the landing page renders is loaded
+            for article in payload['recent_articles']:
+                article.slug, article.title, article.summary, article.views, article.created_at
+                article.category.name
+
+    def test_related_articles_are_cached_per_audience(self):
+        article = HelpArticle.objects.get(slug='test-billing-0')
+        response = self.client.get('/help/article/test-billing-0/')
+        self.assertEqual([a.slug for a in response.help_context['related_articles']], ['test-billing-1'])
+        self.assertEqual(response.help_context['article'].rendered_content, 'c')
+
+        with self.assertNumQueries(0):
+            self.assertEqual([a.slug for a in landing.get_related(article, 'client')], ['test-billing-1'])
+        self.assertEqual(
+            [a.slug for a in landing.get_related(article, 'staff')], ['test-billing-1', 'test-billing-2'],
+        )
+
+    def test_unrendered_article_is_served_without_writes(self):
+        HelpArticle.objects.filter(slug='test-billing-0').update(rendered_content='', toc=[], content_hash='')
+
+        with mock.patch('help.rendering.render_into') as render_into:
+            response = self.client.get('/help/article/test-billing-0/')
+        render_into.assert_not_called()
+        self.assertEqual(response.help_context['article'].content, 'c')
+        self.assertEqual(HelpArticle.objects.get(slug='test-billing-0').content_hash, '')
+
+    def test_saving_content_invalidates_the_payload(self):
+        self.assertNotIn('test-projects', [c.slug for c in self._landing()['categories']])
+
+        hidden = HelpArticle.objects.get(slug='test-hidden')
+        hidden.is_active = True
+        with self.captureOnCommitCallbacks(execute=True):
+            hidden.save()
+        self.assertIn('test-projects', [c.slug for c in self._landing()['categories']])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            FAQ.objects.create(question='q', answer='a', category=self.billing)
+        self.assertIsNone(landing.cache.get(landing.cache_key('client')))
+
+
+@override_settings(CACHES=LOCMEM)
+@mock.patch('help.views.render', _render_context)
+class HelpSearchTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('client', password='pw'))
+        category = HelpCategory.objects.create(name='Payments', slug='test-payments')
+        self.by_title = HelpArticle.objects.create(
+            category=category, title='Refund requests', slug='test-refund-requests',
+            summary='Getting money back', content='<p>Open the invoice &amp; choose <strong>Request</strong>.</p>',
+        )
+        self.by_body = HelpArticle.objects.create(
+            category=category, title='Invoice basics', slug='test-invoice-basics',
+            summary='Reading an invoice', content='<div class="refund">A refund is issued to the original card.</div>',
+        )
+        self.staff_only = HelpArticle.objects.create(
+            category=category, title='Issuing a refund', slug='test-issuing-a-refund',
+            summary='Staff steps', content='<p>Refund from the billing admin.</p>', audience='staff',
+        )
+
+    def test_entries_hold_plain_text(self):
+        self.assertEqual(search.plain_text(self.by_title.content), 'Open the invoice & choose Request.')
+        self.assertEqual(self.by_body.search_entry.body, 'A refund is issued to the original card.')
+
+    def test_title_matches_rank_first_and_audience_is_filtered(self):
+        results = search.search('refund', 'client')
+        self.assertEqual([a.slug for a in results][:2], ['test-refund-requests', 'test-invoice-basics'])
+        self.assertNotIn(self.staff_only, results)
+        self.assertIn(self.staff_only, search.search('refund', 'staff'))
+
+    def test_markup_is_not_searched_and_snippets_are_escaped(self):
+        self.assertEqual(search.search('strong', 'client'), [])
+        self.assertEqual(search.search('class', 'client'), [])
+
+        self.by_body.content = '<p>Refund &lt;script&gt; text</p>'
+        self.by_body.save()
+        [article] = search.search('script', 'client')
+        self.assertIn('&lt;<mark>script</mark>&gt;', article.search_snippet)
+
+    def test_inactive_and_deleted_articles_leave_the_index(self):
+        self.by_title.is_active = False
+        self.by_title.save()
+        self.by_body.delete()
+        self.assertEqual(search.search('refund', 'client'), [])
+
+    def test_help_center_uses_the_index(self):
+        response = self.client.get('/help/', {'q': 'refund" ('})
+        self.assertEqual([a.slug for a in response.help_context['search_results']][:1], ['test-refund-requests'])
+
+
+class ArticleRenderingTests(TestCase):
+    def setUp(self):
+        self.category = HelpCategory.objects.create(name='Guides', slug='test-guides')
+
+    def _article(self, content, **kwargs):
+        return HelpArticle.objects.create(
+            category=self.category, title='Guide', slug=kwargs.pop('slug', 'test-guide'),
+            summary='s', content=content, **kwargs,
+        )
+
+    def test_content_is_sanitized(self):
+        html, _toc = rendering.render(
+            '<p onclick="steal()">Hi <a href="javascript:alert(1)">x</a> <a href="/portal/" target="_blank">portal</a></p>'
+            '<script>alert(1)</script><iframe src="https://evil.example"></iframe><blink>ok</blink>'
+            '<img src="data:image/png;base64,AA" alt="x"> 1 &lt; 2'
+        )
+        self.assertEqual(
+            html,
+            '<p>Hi <a>x</a> <a href="/portal/" target="_blank" rel="noopener noreferrer">portal</a></p>'
+            'ok<img alt="x"> 1 &lt; 2',
+        )
+
+    def test_headings_get_unique_anchors_and_a_toc(self):
+        html, toc = rendering.render('<h3>Step 1: Log in</h3><p>a</p><h4>Details</h4><h3>Step 1: Log in</h3>')
+        self.assertIn('<h3 id="step-1-log-in">Step 1: Log in</h3>', html)
+        self.assertIn('<h3 id="step-1-log-in-2">', html)
+        self.assertEqual(toc, [
+            {'level': 3, 'id': 'step-1-log-in', 'title': 'Step 1: Log in'},
+            {'level': 4, 'id': 'details', 'title': 'Details'},
+            {'level': 3, 'id': 'step-1-log-in-2', 'title': 'Step 1: Log in'},
+        ])
+
+    def test_media_images_use_thumbnails(self):
+        def thumbnail(src):
+            return ('/media/help/screen.png.960x0_q85.jpg', 960, 540) if src.startswith('/media/') else None
+
+        html, _toc = rendering.render(
+            '<img src="/media/help/screen.png"><img src="https://cdn.example/x.png">', thumbnail=thumbnail,
+        )
+        self.assertEqual(
+            html,
+            '<img src="/media/help/screen.png.960x0_q85.jpg" width="960" height="540" loading="lazy">'
+            '<img src="https://cdn.example/x.png" loading="lazy">',
+        )
+
+    def test_rendered_on_save_only_when_content_changes(self):
+        article = self._article('<h3>One</h3><h3>Two</h3>')
+        self.assertEqual(article.content_hash, rendering.content_hash(article.content))
+        self.assertEqual([e['id'] for e in article.toc], ['one', 'two'])
+
+        with mock.patch('help.rendering.render') as render:
+            article.title = 'Renamed'
+            article.save()
+        render.assert_not_called()
+
+        article.content = '<h3>Three</h3>'
+        article.save()
+        article.refresh_from_db()
+        self.assertEqual(article.rendered_content, '<h3 id="three">Three</h3>')
+
+    def test_backfill_command(self):
+        article = self._article('<h3>One</h3>')
+        HelpArticle.objects.filter(pk=article.pk).update(rendered_content='', toc=[], content_hash='')
+
+        call_command('render_help_articles', stdout=io.StringIO())
+
+        article.refresh_from_db()
+        self.assertEqual(article.rendered_content, '<h3 id="one">One</h3>')
+        self.assertEqual(article.content_hash, rendering.content_hash(article.content))
+
+
+class PopulateHelpTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command('populate_help', stdout=io.StringIO())
+
+    def test_rerun_only_reads(self):
+        with self.assertNumQueries(5):  # savepoint, three reads, release
+            call_command('populate_help', stdout=io.StringIO())
+
+    def test_update_restores_changed_articles(self):
+        article = HelpArticle.objects.get(slug='getting-started-client-portal')
+        HelpArticle.objects.filter(pk=article.pk).update(title='Edited', content='<p>edited</p>')
+        HelpArticle.objects.filter(slug='accessing-plan-files').delete()
+
+        out = io.StringIO()
+        call_command('populate_help', '--update', stdout=out)
+
+        article.refresh_from_db()
+        self.assertEqual(article.title, 'Getting Started with Your Client Portal')
+        self.assertEqual(article.content_hash, rendering.content_hash(article.content))
+        self.assertTrue(HelpArticle.objects.get(slug='accessing-plan-files').rendered_content)
+        self.assertIn('1 created, 1 updated', out.getvalue())
+        self.assertTrue(search.search('Getting Started', 'client'))
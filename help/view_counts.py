@@ -0,0 +1,71 @@
+"""
+Buffered view counting for help articles.
+
+``article_detail`` used to ``save()`` the article on every view, a row
+write on a read path and a lost-update race (read-modify-write of
+``views``). Views are now counted in a per-process buffer and written back
+at most every ``HELP_VIEW_FLUSH_INTERVAL`` seconds as one
+``UPDATE ... SET views = views + CASE ...`` statement. Totals (and the
+"popular articles" list) therefore lag by up to one interval per worker;
+each flush drops the cached help center payloads.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import Case, F, IntegerField, Value, When
+
+from . import landing
+from .models import HelpArticle
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_pending: Counter = Counter()
+_last_flush = time.monotonic()
+
+
+def record_view(article_id):
+    with _lock:
+        _pending[article_id] += 1
+    interval = float(getattr(settings, 'HELP_VIEW_FLUSH_INTERVAL', 30))
+    if time.monotonic() - _last_flush >= interval:
+        flush()
+
+
+def pending():
+    """Buffered, not yet flushed views per article id."""
+    with _lock:
+        return dict(_pending)
+
+
+def flush():
+    """Write buffered views in one UPDATE; returns the number of articles touched."""
+    global _last_flush
+    with _lock:
+        deltas = dict(_pending)
+        _pending.clear()
+        _last_flush = time.monotonic()
+    if not deltas:
+        return 0
+    try:
+        HelpArticle.objects.filter(pk__in=deltas).update(
+            views=F('views') + Case(
+                *[When(pk=pk, then=Value(n)) for pk, n in deltas.items()],
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+        )
+    except Exception:
+        logger.exception("Could not flush %d help article view count(s)", len(deltas))
+        with _lock:
+            _pending.update(deltas)
+        return 0
+    landing.invalidate()
+    return len(deltas)
+
+
+atexit.register(flush)
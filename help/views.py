@@ -2,6 +2,7 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.db.models import Q
 from .models import HelpCategory, HelpArticle, FAQ
+from . import landing, search, view_counts
 
 
 @login_required(login_url='/portal/login/')
@@ -10,57 +11,18 @@ def help_center(request):
     user = request.user
     is_staff = user.is_staff
     
-    # Determine audience filter
-    if is_staff:
-        audience_filter = Q(audience__in=['staff', 'both'])
-    else:
-        audience_filter = Q(audience__in=['client', 'both'])
-    
-    # Get all active categories (don't filter by audience - show all categories that have relevant articles)
-    categories = HelpCategory.objects.filter(
-        is_active=True
-    ).prefetch_related('articles', 'faqs').order_by('order')
+    # Categories with per-audience article counts plus the featured, popular
+    # and recent lists, cached per audience (see help.landing)
+    landing_payload = landing.get_landing(landing.audience_for(user))
     
-    # Get featured articles
-    featured_articles = HelpArticle.objects.filter(
-        is_active=True,
-        is_featured=True
-    ).filter(audience_filter).select_related('category')[:6]
-    
-    # Get popular articles (most viewed)
-    popular_articles = HelpArticle.objects.filter(
-        is_active=True
-    ).filter(audience_filter).select_related('category').order_by('-views')[:5]
-    
-    # Get recent articles
-    recent_articles = HelpArticle.objects.filter(
-        is_active=True
-    ).filter(audience_filter).select_related('category').order_by('-created_at')[:5]
-    
-    # Search query
+    # Search query (ranked full-text search, see help.search)
     search_query = request.GET.get('q', '')
     search_results = None
     if search_query:
-        search_results = HelpArticle.objects.filter(
-            Q(title__icontains=search_query) |
-            Q(summary__icontains=search_query) |
-            Q(content__icontains=search_query),
-            is_active=True
-        ).filter(audience_filter).select_related('category')[:10]
-    
-    # Filter categories to only show those with articles for this audience
-    categories_with_articles = []
-    for category in categories:
-        article_count = category.articles.filter(is_active=True).filter(audience_filter).count()
-        if article_count > 0:
-            category.filtered_article_count = article_count
-            categories_with_articles.append(category)
+        search_results = search.search(search_query, landing.audience_for(user))
     
     context = {
-        'categories': categories_with_articles,
-        'featured_articles': featured_articles,
-        'popular_articles': popular_articles,
-        'recent_articles': recent_articles,
+        **landing_payload,
         'search_query': search_query,
         'search_results': search_results,
         'is_staff': is_staff,
@@ -125,14 +87,11 @@ def article_detail(request, slug):
         slug=slug
     )
     
-    # Increment view count
-    article.increment_views()
+    # Count the view (buffered; flushed to article.views periodically)
+    view_counts.record_view(article.pk)
     
-    # Get related articles (same category)
-    related_articles = HelpArticle.objects.filter(
-        category=article.category,
-        is_active=True
-    ).filter(audience_filter).exclude(pk=article.pk)[:3]
+    # Related articles (same category), cached per audience
+    related_articles = landing.get_related(article, landing.audience_for(user))
     
     context = {
         'article': article,
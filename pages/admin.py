@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import contextlib
+
 from django import forms
 from django.contrib import admin
 from django.shortcuts import redirect
@@ -244,6 +246,14 @@ class SiteSettingsAdmin(SingletonModelAdmin):
         return "-"
     logo_preview.short_description = "Logo preview"  # type: ignore
 
+    def change_view(self, request, object_id, form_url="", extra_context=None):
+        # Seed the week here rather than on the public read path.
+        obj = self.get_object(request, object_id)
+        if obj is not None:
+            with contextlib.suppress(Exception):
+                obj.ensure_business_hours()
+        return super().change_view(request, object_id, form_url, extra_context)
+
 # ----------------------------
 # Contact messages
 # ----------------------------
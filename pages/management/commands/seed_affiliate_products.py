@@ -9,8 +9,8 @@ The Amazon Associates tracking ID ("tag", e.g. "provosthome-20") is appended to
 every product link so the links earn commission. The tag can also be set once via
 the AMAZON_ASSOCIATES_TAG environment variable / Django setting instead of --tag.
 
-Idempotent: rows are matched on (category, title). Re-running won't create
-duplicates. Prices and images are intentionally left blank — Amazon's Operating
+Idempotent: rows are matched on (category, title) in one bulk read (see
+core.seeding). Re-running won't create duplicates. Prices and images are intentionally left blank — Amazon's Operating
 Agreement requires those to come from SiteStripe / the Product Advertising API,
 not hardcoded values. Add images later via SiteStripe in the Django admin.
 """
@@ -19,6 +19,7 @@ from __future__ import annotations
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
 
+from core.seeding import seed
 from pages.models import AffiliateProduct, AffiliateCategory
 
 
@@ -120,32 +121,24 @@ class Command(BaseCommand):
             )
 
         do_update = options["update"]
-        created = updated = skipped = 0
-
-        for order, (category, title, asin, description) in enumerate(CURATED, start=1):
-            url = _build_url(asin, tag)
-            obj, was_created = AffiliateProduct.objects.get_or_create(
-                category=category,
-                title=title,
-                defaults={
-                    "url": url,
-                    "description": description,
-                    "order": order,
-                    "is_active": True,
-                },
-            )
-            if was_created:
-                created += 1
-                self.stdout.write(self.style.SUCCESS(f"  + {title}"))
-            elif do_update:
-                obj.url = url
-                obj.description = description
-                obj.save(update_fields=["url", "description"])
-                updated += 1
-                self.stdout.write(f"  ~ {title} (updated)")
-            else:
-                skipped += 1
-                self.stdout.write(f"  = {title} (exists, skipped)")
+        records = [
+            {
+                "category": category,
+                "title": title,
+                "url": _build_url(asin, tag),
+                "description": description,
+                "order": order,
+                "is_active": True,
+            }
+            for order, (category, title, asin, description) in enumerate(CURATED, start=1)
+        ]
+        # Existing rows only ever get their URL/description refreshed (with --update).
+        result = seed(
+            AffiliateProduct, records, key=("category", "title"), update=["url", "description"] if do_update else False,
+        )
+        for line in result.lines():
+            self.stdout.write(self.style.SUCCESS(line) if line.startswith("  +") else line)
+        created, updated, skipped = len(result.created), len(result.updated), len(result.unchanged)
 
         self.stdout.write(
             self.style.SUCCESS(
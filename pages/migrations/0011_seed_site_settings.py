@@ -0,0 +1,25 @@
+from django.db import migrations
+
+DAYS = ("sun", "mon", "tue", "wed", "thu", "fri", "sat")
+
+
+def seed_site_settings(apps, schema_editor):
+    """Create the SiteSettings singleton and its week of hours (formerly done on every read)."""
+    SiteSettings = apps.get_model("pages", "SiteSettings")
+    BusinessHour = apps.get_model("pages", "BusinessHour")
+    site, _ = SiteSettings.objects.get_or_create(pk=1)
+    existing = set(BusinessHour.objects.filter(site=site).values_list("day", flat=True))
+    BusinessHour.objects.bulk_create(
+        [BusinessHour(site=site, day=day, is_closed=(day == "sun")) for day in DAYS if day not in existing]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0010_alter_webdesigninquiry_source'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_site_settings, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from django.db import models
+from functools import partial
+
+from django.db import models, transaction
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.templatetags.static import static
 from plans.models import HouseStyle  # dynamic link to plans app
@@ -91,7 +93,8 @@ TESTIMONIAL_ROLE_CHOICES = [
 class SiteSettings(models.Model):
     """
     Singleton-ish site settings row editable in admin.
-    Use SiteSettings.load() to get/create the single row (pk=1).
+    Use SiteSettings.load() to get/create the single row (pk=1); public views
+    read it through pages.site_content.get_site_content().
     """
     company_name = models.CharField(max_length=160, blank=True)
     contact_name = models.CharField(max_length=160, blank=True)
@@ -113,19 +116,26 @@ class SiteSettings(models.Model):
         return self.company_name or "Site Settings"
 
     @classmethod
-    def load(cls) -> "SiteSettings":  # sourcery skip: use-contextlib-suppress
+    def load(cls) -> "SiteSettings":
         obj, _ = cls.objects.get_or_create(pk=1)
-        # Auto-seed a full week of BusinessHour rows for nice inline editing
-        try:
-            existing = set(obj.hours.values_list("day", flat=True)) # type: ignore
-            for code, _label in BusinessHour.DAYS:
-                if code not in existing:
-                    BusinessHour.objects.create(site=obj, day=code, is_closed=(code == "sun"))
-        except Exception:
-            # best effort; don't explode admin if seeding fails
-            pass
         return obj
 
+    def ensure_business_hours(self) -> None:
+        """Seed a full week of BusinessHour rows (for inline editing in the admin)."""
+        from . import site_content
+
+        existing = set(self.hours.values_list("day", flat=True))  # type: ignore
+        missing = [
+            BusinessHour(site=self, day=code, is_closed=(code == "sun"))
+            for code, _label in BusinessHour.DAYS
+            if code not in existing
+        ]
+        if not missing:
+            return
+        BusinessHour.objects.bulk_create(missing, ignore_conflicts=True)
+        # bulk_create skips the post_save receivers, so drop the snapshot here.
+        transaction.on_commit(partial(site_content.invalidate, site_content.SITE_KEY))
+
     @property
     def logo_url(self) -> str:  # sourcery skip: use-contextlib-suppress
         try:
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+from functools import partial
 from typing import Iterable, Optional
 import mimetypes
 
@@ -19,7 +20,11 @@ from .models import (
     Testimonial,
     AboutPage,
     SiteSettings,
+    BusinessHour,
+    PricingPage,
+    PricingItem,
 )
+from . import site_content
 
 logger = logging.getLogger(__name__)
 
@@ -305,3 +310,23 @@ def testimonial_post_save(sender, instance: Testimonial, created: bool, **kwargs
             ack.send(fail_silently=True)
         except Exception:
             logger.exception("Failed to send testimonial publish thank-you")
+
+
+# ---------- Cached singleton content ----------
+# Invalidate after commit: a request in between would otherwise re-cache the
+# old rows for the whole SITE_CONTENT_CACHE_TIMEOUT.
+@receiver([post_save, post_delete], sender=SiteSettings)
+@receiver([post_save, post_delete], sender=BusinessHour)
+def site_content_site_changed(sender, **kwargs):
+    transaction.on_commit(partial(site_content.invalidate, site_content.SITE_KEY))
+
+
+@receiver([post_save, post_delete], sender=AboutPage)
+def site_content_about_changed(sender, **kwargs):
+    transaction.on_commit(partial(site_content.invalidate, site_content.ABOUT_KEY))
+
+
+@receiver([post_save, post_delete], sender=PricingPage)
+@receiver([post_save, post_delete], sender=PricingItem)
+def site_content_pricing_changed(sender, **kwargs):
+    transaction.on_commit(partial(site_content.invalidate, site_content.PRICING_KEY))
@@ -0,0 +1,175 @@
+"""
+Cached snapshots of the admin-edited singleton rows.
+
+``SiteSettings`` (with its business hours), the published ``AboutPage`` and
+the ``PricingPage`` (with active items) change a few times a year but are
+read on contact, about, privacy, web contact and pricing requests. Each
+snapshot is built once, with everything the views derive from it (formatted
+hour spans, parsed address, tel/mailto links, logo URL), and kept in the
+default cache until a save or delete of the underlying rows invalidates it
+(see ``pages.signals``). Reads never write: seeding the singleton rows and
+the weekly hours happens in a migration and in the admin.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import AboutPage, BusinessHour, PricingItem, PricingPage, SiteSettings
+
+SITE_KEY = "site_content:site"
+ABOUT_KEY = "site_content:about"
+PRICING_KEY = "site_content:pricing"
+ALL_KEYS = (SITE_KEY, ABOUT_KEY, PRICING_KEY)
+
+_NONE = "__none__"  # cached marker for "no published row"
+
+
+def _timeout() -> int:
+    return int(getattr(settings, "SITE_CONTENT_CACHE_TIMEOUT", 60 * 60 * 24))
+
+
+def normalize_phone(phone: str) -> tuple[str, str]:
+    digits = "".join(ch for ch in (phone or "") if ch.isdigit())
+    if not digits:
+        return "", ""
+    if len(digits) == 10:
+        e164 = f"+1{digits}"
+    elif digits.startswith("1") and len(digits) == 11:
+        e164 = f"+{digits}"
+    else:
+        e164 = f"+{digits}"
+    return e164, f"tel:{e164}"
+
+
+def parse_address(address: str) -> tuple[str, str, str, str]:
+    street, locality, region, postal = address, "", "", ""
+    if address:
+        parts = [p.strip() for p in address.split(",")]
+        if len(parts) >= 3:
+            street = parts[0]
+            locality = parts[1]
+            tail = parts[2].split()
+            if len(tail) >= 2:
+                region, postal = tail[0], tail[1]
+    return street, locality, region, postal
+
+
+def _fmt_time(t) -> str:
+    return t.strftime("%I:%M %p").lstrip("0") if t else ""
+
+
+def hour_span(h: BusinessHour) -> str:
+    if h.is_closed:
+        return "Closed"
+    if h.by_appointment:
+        return "By Appointment"
+    if h.open_time and h.close_time:
+        return f"{_fmt_time(h.open_time)} – {_fmt_time(h.close_time)}"
+    return "-"
+
+
+@dataclass
+class SiteContent:
+    site: SiteSettings
+    hours: list[BusinessHour]
+    hours_display: list[dict[str, str]]
+    company: str
+    owner: str
+    phone: str
+    email: str
+    address: str
+    logo_url: str
+    e164: str
+    tel_href: str
+    mailto_href: str
+    street: str
+    locality: str
+    region: str
+    postal: str
+    business_hours_text: str
+
+
+@dataclass
+class PricingContent:
+    page: PricingPage
+    items: list[PricingItem] = field(default_factory=list)
+
+    @property
+    def calc_items(self) -> list[PricingItem]:
+        return [i for i in self.items if i.show_in_calculator]
+
+
+def _build_site_content() -> SiteContent:
+    site = SiteSettings.objects.filter(pk=1).first() or SiteSettings(pk=1)
+    day_order = {code: i for i, (code, _label) in enumerate(BusinessHour.DAYS)}
+    day_labels = dict(BusinessHour.DAYS)
+    # Sort in Python instead of the Meta.ordering CASE expression.
+    hours = sorted(
+        BusinessHour.objects.filter(site_id=site.pk).order_by(),
+        key=lambda h: day_order.get(h.day, len(day_order)),
+    )
+
+    company = site.company_name or getattr(settings, "COMPANY_NAME", "Provost Home Design")
+    owner = site.contact_name or getattr(settings, "CONTACT_NAME", "Michael Provost")
+    phone = site.contact_phone or getattr(settings, "CONTACT_PHONE", "508-243-7912")
+    address = site.contact_address or getattr(settings, "CONTACT_ADDRESS", "7 Park St. Unit 1, Rehoboth, MA 02769")
+    email = site.contact_email or getattr(settings, "CONTACT_EMAIL", "mike@provosthomedesign.com")
+    e164, tel_href = normalize_phone(phone)
+    street, locality, region, postal = parse_address(address)
+
+    return SiteContent(
+        site=site,
+        hours=hours,
+        hours_display=[{"day": day_labels.get(h.day, h.day), "span": hour_span(h)} for h in hours],
+        company=company,
+        owner=owner,
+        phone=phone,
+        email=email,
+        address=address,
+        logo_url=site.logo_url,
+        e164=e164,
+        tel_href=tel_href,
+        mailto_href=f"mailto:{email}" if email else "",
+        street=street,
+        locality=locality,
+        region=region,
+        postal=postal,
+        business_hours_text=site.business_hours or getattr(settings, "BUSINESS_HOURS", None) or "",
+    )
+
+
+def get_site_content() -> SiteContent:
+    content = cache.get(SITE_KEY)
+    if content is None:
+        content = _build_site_content()
+        cache.set(SITE_KEY, content, _timeout())
+    return content
+
+
+def get_about_page() -> AboutPage | None:
+    """The first published AboutPage, or None."""
+    page: Any = cache.get(ABOUT_KEY)
+    if page is None:
+        page = AboutPage.objects.filter(is_published=True).first() or _NONE
+        cache.set(ABOUT_KEY, page, _timeout())
+    return None if isinstance(page, str) else page
+
+
+def get_pricing_content() -> PricingContent:
+    content = cache.get(PRICING_KEY)
+    if content is None:
+        page = PricingPage.objects.filter(pk=1).first() or PricingPage(pk=1)
+        items = []
+        if page.is_published and not page._state.adding:
+            items = list(page.items.filter(is_active=True))
+        content = PricingContent(page=page, items=items)
+        cache.set(PRICING_KEY, content, _timeout())
+    return content
+
+
+def invalidate(*keys: str) -> None:
+    cache.delete_many(list(keys or ALL_KEYS))
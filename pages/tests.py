@@ -358,19 +358,20 @@ class SubdomainRoutingTests(TestCase):
 
     def test_published_web_rate_uses_the_planning_estimate_surface(self):
         page = PricingPage.load()
-        page.title = "Web Services Pricing"
-        page.subtitle = "Published planning rates."
-        page.is_published = True
-        page.save()
-        page.items.create(
-            label="Additional content page",
-            description="A page using the approved design system.",
-            amount="250.00",
-            unit_label="per page",
-            show_in_calculator=True,
-            default_quantity="1.0",
-            is_active=True,
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            page.title = "Web Services Pricing"
+            page.subtitle = "Published planning rates."
+            page.is_published = True
+            page.save()
+            page.items.create(
+                label="Additional content page",
+                description="A page using the approved design system.",
+                amount="250.00",
+                unit_label="per page",
+                show_in_calculator=True,
+                default_quantity="1.0",
+                is_active=True,
+            )
 
         response = self.client.get("/pricing/", HTTP_HOST=self.web_host)
 
@@ -825,3 +826,72 @@ class ProjectCaseStudyTests(TestCase):
             response,
             'rel="canonical" href="http://testserver/projects/"',
         )
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "site-content-tests"}},
+)
+class SiteContentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_site_content_is_built_once_and_never_writes(self):
+        from .models import BusinessHour, SiteSettings
+        from .site_content import get_site_content
+
+        SiteSettings.objects.update_or_create(pk=1, defaults={"contact_phone": "(508) 555-0100"})
+        with self.assertNumQueries(2):
+            content = get_site_content()
+        with self.assertNumQueries(0):
+            get_site_content()
+
+        self.assertEqual(content.tel_href, "tel:+15085550100")
+        self.assertEqual([h.day for h in content.hours], [code for code, _ in BusinessHour.DAYS])
+        self.assertEqual(content.hours_display[0], {"day": "Sunday", "span": "Closed"})
+
+    def test_saving_site_settings_or_hours_invalidates_snapshot(self):
+        from .models import SiteSettings
+        from .site_content import get_site_content
+
+        site = SiteSettings.load()
+        get_site_content()
+        with self.captureOnCommitCallbacks(execute=True):
+            site.company_name = "Renamed Design Co."
+            site.save()
+            # Not until commit, or a request in between re-caches the old row.
+            self.assertNotEqual(get_site_content().company, "Renamed Design Co.")
+        self.assertEqual(get_site_content().company, "Renamed Design Co.")
+
+        hour = site.hours.get(day="mon")
+        with self.captureOnCommitCallbacks(execute=True):
+            hour.by_appointment = True
+            hour.save()
+        monday = [row for row in get_site_content().hours_display if row["day"] == "Monday"]
+        self.assertEqual(monday, [{"day": "Monday", "span": "By Appointment"}])
+
+    def test_seeding_business_hours_invalidates_snapshot(self):
+        from .models import SiteSettings
+        from .site_content import get_site_content
+
+        site = SiteSettings.load()
+        site.hours.all().delete()
+        self.assertEqual(get_site_content().hours, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            site.ensure_business_hours()  # bulk_create: no post_save
+        self.assertEqual(len(get_site_content().hours), 7)
+
+    def test_pricing_items_invalidate_pricing_snapshot(self):
+        from .site_content import get_pricing_content
+
+        page = PricingPage.load()
+        with self.captureOnCommitCallbacks(execute=True):
+            page.is_published = True
+            page.save()
+        self.assertEqual(get_pricing_content().items, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            page.items.create(label="Plan review", amount=100, show_in_calculator=True)
+        content = get_pricing_content()
+        self.assertEqual([i.label for i in content.items], ["Plan review"])
+        self.assertEqual([i.label for i in content.calc_items], ["Plan review"])
@@ -2,7 +2,6 @@
 from __future__ import annotations
 from time import time
 from django.core.exceptions import ValidationError
-from django_ratelimit.decorators import ratelimit
 
 
 import contextlib
@@ -13,7 +12,6 @@ from typing import Iterable
 
 from django.conf import settings
 from django.contrib import messages
-from django.core.cache import cache
 from django.core.mail import EmailMultiAlternatives
 from django.db import transaction
 from django.http import Http404, HttpRequest, HttpResponse, HttpResponsePermanentRedirect
@@ -22,19 +20,23 @@ from django.template.loader import render_to_string
 from django.templatetags.static import static
 from django.urls import reverse
 
-from core.utils import get_client_ip, verify_recaptcha_v3
+from core.ratelimit import is_rate_limited, ratelimit
+from core.spam import FormValid, Honeypot, Recaptcha, SpamPipeline, SpamVerdict, Throttle, TimingToken
+from core.utils import get_client_ip
 from .forms import ContactForm, NewHouseForm, TestimonialForm, WebDesignInquiryForm
+from .site_content import (
+    get_about_page,
+    get_pricing_content,
+    get_site_content,
+)
 from .models import (
     ContactMessage,
     InquiryAttachment,
     ProjectInquiry,
     Testimonial,
-    AboutPage,
-    SiteSettings,
     WebDesignInquiry,
     WEB_INQUIRY_SOURCE_CHOICES,
     WEB_PROJECT_TYPE_CHOICES,
-    PricingPage,
     AffiliateProduct,
     AffiliateCategory,
     ProjectCaseStudy,
@@ -304,72 +306,59 @@ def _as_list(value: str | Iterable[str] | None) -> list[str]:
         return [p.strip() for p in parts if p.strip()]
     return [str(v).strip() for v in value if str(v).strip()]
 
-def _normalize_phone(phone: str) -> tuple[str, str]:
-    digits = "".join(ch for ch in (phone or "") if ch.isdigit())
-    if not digits:
-        return "", ""
-    if len(digits) == 10:
-        e164 = f"+1{digits}"
-    elif digits.startswith("1") and len(digits) == 11:
-        e164 = f"+{digits}"
-    else:
-        e164 = f"+{digits}"
-    return e164, f"tel:{e164}"
-
-def _parse_address(address: str) -> tuple[str, str, str, str]:
-    street, locality, region, postal = address, "", "", ""
-    if address:
-        parts = [p.strip() for p in address.split(",")]
-        if len(parts) >= 3:
-            street = parts[0]
-            locality = parts[1]
-            tail = parts[2].split()
-            if len(tail) >= 2:
-                region, postal = tail[0], tail[1]
-    return street, locality, region, postal
-
 def _is_htmx(request: HttpRequest) -> bool:
     return request.headers.get("HX-Request", "").lower() == "true"
 
 def _htmx_status(request: HttpRequest, level: str, message: str) -> HttpResponse:
     return render(request, "pages/partials/contact_status.html", {"level": level, "text": message})
 
-THROTTLE_WINDOW_SECONDS = int(getattr(settings, "FORM_THROTTLE_WINDOW_SECONDS", 600))
-THROTTLE_MAX_ATTEMPTS = int(getattr(settings, "FORM_THROTTLE_MAX_ATTEMPTS", 3))
-THROTTLE_BURST_WINDOW_SECONDS = int(getattr(settings, "FORM_THROTTLE_BURST_WINDOW_SECONDS", 60))
-THROTTLE_BURST_MAX_ATTEMPTS = int(getattr(settings, "FORM_THROTTLE_BURST_MAX_ATTEMPTS", 1))
-
 def _too_many_recent_submissions(request: HttpRequest, form_type: str = "contact") -> bool:
     """
     Check and update server-side throttle per IP and form type.
-    Uses cache counters so bots cannot bypass by dropping session cookies.
+    Counted in the shared rate limiter (one atomic hit per submission) so bots
+    cannot bypass it by dropping session cookies; windows come from the
+    ``form`` policy (FORM_THROTTLE_* settings).
     """
-    ip = get_client_ip(request) or "unknown"
     safe_form_type = "".join(ch for ch in (form_type or "contact").lower() if ch.isalnum() or ch in ("-", "_"))
-
-    # Wider window limit, e.g. max 3 submissions / 10 minutes per IP per form.
-    wide_key = f"form_throttle:{safe_form_type}:{ip}:wide"
-    if cache.add(wide_key, 1, timeout=THROTTLE_WINDOW_SECONDS):
-        wide_count = 1
-    else:
-        try:
-            wide_count = cache.incr(wide_key)
-        except ValueError:
-            cache.set(wide_key, 1, timeout=THROTTLE_WINDOW_SECONDS)
-            wide_count = 1
-
-    # Burst limit, e.g. max 1 submission / 60 seconds per IP per form.
-    burst_key = f"form_throttle:{safe_form_type}:{ip}:burst"
-    if cache.add(burst_key, 1, timeout=THROTTLE_BURST_WINDOW_SECONDS):
-        burst_count = 1
-    else:
-        try:
-            burst_count = cache.incr(burst_key)
-        except ValueError:
-            cache.set(burst_key, 1, timeout=THROTTLE_BURST_WINDOW_SECONDS)
-            burst_count = 1
-
-    return wide_count > THROTTLE_MAX_ATTEMPTS or burst_count > THROTTLE_BURST_MAX_ATTEMPTS
+    return is_rate_limited(request, "form", scope=safe_form_type)
+
+# Spam pipelines: cheap local gates first, the reCAPTCHA round trip last.
+CONTACT_SPAM = SpamPipeline("contact", [
+    Honeypot("contact-website"),
+    TimingToken("contact_started_ts"),
+    Throttle("contact", _too_many_recent_submissions),
+    FormValid(),
+    Recaptcha("contact_form"),
+])
+TESTIMONIAL_SPAM = SpamPipeline("testimonial", [
+    Honeypot("testimonial-website2"),
+    TimingToken("testimonial_started_ts"),
+    Throttle(
+        "testimonial", _too_many_recent_submissions,
+        message="You're sending testimonials too quickly. Please wait a minute and try again.",
+    ),
+    FormValid(),
+    Recaptcha("testimonial_form"),
+])
+GET_STARTED_SPAM = SpamPipeline("get_started", [
+    Honeypot("website"),
+    FormValid(),
+    Recaptcha("get_started"),
+])
+WEB_DESIGN_SPAM = SpamPipeline("web_design", [
+    Honeypot("website"),
+    TimingToken("web_design_started_ts"),
+    Throttle("web_design", _too_many_recent_submissions),
+    FormValid(),
+    Recaptcha("web_design_form"),
+])
+
+def _spam_rejected(request: HttpRequest, verdict: SpamVerdict, redirect_to: str) -> HttpResponse:
+    """Standard response for a submission stopped by a spam gate (not form errors)."""
+    if _is_htmx(request):
+        return _htmx_status(request, verdict.level, verdict.message)
+    messages.add_message(request, getattr(messages, verdict.level.upper(), messages.ERROR), verdict.message)
+    return redirect(redirect_to)
 
 # ----- Views ----------------------------------------------------------------
 
@@ -416,44 +405,18 @@ def home(request: HttpRequest) -> HttpResponse:
         },
     )
 
-@ratelimit(key="ip", rate="5/m", block=True)
+@ratelimit("contact")
 def contact(request: HttpRequest) -> HttpResponse:
     testimonial_page = bool(getattr(request, "testimonial_page", False))
     testimonial_redirect = "pages:submit_testimonial" if testimonial_page else "pages:contact"
-    # Brand/contact settings
-    s = SiteSettings.load()
-    company = s.company_name or getattr(settings, "COMPANY_NAME", "Provost Home Design")
-    owner = s.contact_name or getattr(settings, "CONTACT_NAME", "Michael Provost")
-    phone = s.contact_phone or getattr(settings, "CONTACT_PHONE", "508-243-7912")
-    address = s.contact_address or getattr(settings, "CONTACT_ADDRESS", "7 Park St. Unit 1, Rehoboth, MA 02769")
-    email = s.contact_email or getattr(settings, "CONTACT_EMAIL", "mike@provosthomedesign.com")
-    logo_url = s.logo_url
-
-    e164, tel_href = _normalize_phone(phone)
-    mailto_href = f"mailto:{email}" if email else ""
-    street, locality, region, postal = _parse_address(address)
-
-    # Structured business hours (ordered by Meta.ordering)
-    hours_struct = list(getattr(s, "hours").all()) if hasattr(s, "hours") else []
-
-    # Build a display-ready list for the template
-    DAY_LABELS = dict([("sun","Sunday"),("mon","Monday"),("tue","Tuesday"),
-                       ("wed","Wednesday"),("thu","Thursday"),("fri","Friday"),("sat","Saturday")])
-
-    def _fmt(t):
-        return t.strftime("%I:%M %p").lstrip("0") if t else ""
-
-    hours_display: list[dict[str, str]] = []
-    for h in hours_struct:
-        if getattr(h, "is_closed", False):
-            span = "Closed"
-        elif getattr(h, "by_appointment", False):
-            span = "By Appointment"
-        elif getattr(h, "open_time", None) and getattr(h, "close_time", None):
-            span = f"{_fmt(h.open_time)} – {_fmt(h.close_time)}"
-        else:
-            span = "-"
-        hours_display.append({"day": DAY_LABELS.get(h.day, h.day), "span": span})  # type: ignore
+    # Brand/contact settings (cached snapshot, see pages.site_content)
+    content = get_site_content()
+    company, owner, phone = content.company, content.owner, content.phone
+    address, email, logo_url = content.address, content.email, content.logo_url
+    e164, tel_href, mailto_href = content.e164, content.tel_href, content.mailto_href
+    street, locality, region, postal = content.street, content.locality, content.region, content.postal
+    hours_struct = content.hours
+    hours_display = content.hours_display
 
     # Email recipients
     to_emails = (
@@ -485,44 +448,13 @@ def contact(request: HttpRequest) -> HttpResponse:
     if request.method == "POST":
         # Contact submission
         if is_contact_post:
-            # 1) Contact-specific throttle
-            if _too_many_recent_submissions(request, "contact"):
-                msg = "You're sending messages too quickly. Please wait a minute and try again."
-                if _is_htmx(request):
-                    return _htmx_status(request, "warning", msg)
-                messages.warning(request, msg)
-                return redirect(testimonial_redirect)
-
-            # 2) "Too fast" submission (likely bot)
-            started = float(request.session.get("contact_started_ts", 0))
-            if time() - started < 2.0:
-                # reset seed for the next legit attempt
-                request.session["contact_started_ts"] = time()
-                logger.info(
-                    "Spam gate tripped: too_fast ip=%s ua=%s",
-                    request.META.get("REMOTE_ADDR"),
-                    request.META.get("HTTP_USER_AGENT"),
-                )
-                if _is_htmx(request):
-                    return _htmx_status(request, "error", "Spam protection triggered. Please try again.")
-                messages.error(request, "Spam protection triggered. Please try again.")
-                return redirect(testimonial_redirect)
-
-            # refresh seed to avoid reusing the same timestamp
-            request.session["contact_started_ts"] = time()
-
-            # reCAPTCHA v3 verification (enforced if secret is configured)
-            recaptcha_ok, score = verify_recaptcha_v3(request, expected_action="contact_form")
-            if not recaptcha_ok:
-                msg = "Spam detection failed. Please try again."
-                if _is_htmx(request):
-                    return _htmx_status(request, "error", msg)
-                messages.error(request, msg)
-                return redirect(testimonial_redirect)
-
             if not request.POST.get(f"{contact_form.prefix}-terms_accepted") and hasattr(contact_form, "fields") and "terms_accepted" in contact_form.fields:
                 contact_form.add_error("terms_accepted", "You must accept the Terms & Conditions.")
 
+            verdict = CONTACT_SPAM.run(request, form=contact_form)
+            if not verdict.passed and not verdict.form_invalid:
+                return _spam_rejected(request, verdict, testimonial_redirect)
+
             if contact_form.is_valid():
                 cd = contact_form.cleaned_data
                 sub = cd.get("subject") or f"Contact request from {cd['name']}"
@@ -637,43 +569,13 @@ def contact(request: HttpRequest) -> HttpResponse:
 
         # Testimonial submission
         if is_testimonial_post:
-            # 1) Testimonial-specific throttle
-            if _too_many_recent_submissions(request, "testimonial"):
-                msg = "You're sending testimonials too quickly. Please wait a minute and try again."
-                if _is_htmx(request):
-                    return _htmx_status(request, "warning", msg)
-                messages.warning(request, msg)
-                return redirect(testimonial_redirect)
-
-            # 2) "Too fast" submission (likely bot)
-            started = float(request.session.get("testimonial_started_ts", 0))
-            if time() - started < 2.0:
-                # reset seed for the next legit attempt
-                request.session["testimonial_started_ts"] = time()
-                logger.info(
-                    "Testimonial spam gate tripped: too_fast ip=%s ua=%s",
-                    request.META.get("REMOTE_ADDR"),
-                    request.META.get("HTTP_USER_AGENT"),
-                )
-                if _is_htmx(request):
-                    return _htmx_status(request, "error", "Spam protection triggered. Please try again.")
-                messages.error(request, "Spam protection triggered. Please try again.")
-                return redirect(testimonial_redirect)
-
-            # refresh seed to avoid reusing the same timestamp
-            request.session["testimonial_started_ts"] = time()
-
-            # reCAPTCHA v3 verification (enforced if secret is configured)
-            recaptcha_ok, score = verify_recaptcha_v3(request, expected_action="testimonial_form")
-            if not recaptcha_ok:
-                msg = "Spam detection failed. Please try again."
-                if _is_htmx(request):
-                    return _htmx_status(request, "error", msg)
-                messages.error(request, msg)
-                return redirect(testimonial_redirect)
-
             if not request.POST.get(f"{tform.prefix}-terms_accepted") and hasattr(tform, "fields") and "terms_accepted" in tform.fields:
                 tform.add_error("terms_accepted", "You must accept the Terms & Conditions.")
+
+            verdict = TESTIMONIAL_SPAM.run(request, form=tform)
+            if not verdict.passed and not verdict.form_invalid:
+                return _spam_rejected(request, verdict, testimonial_redirect)
+
             if tform.is_valid():
                 cd = tform.cleaned_data
                 t = Testimonial.objects.create(
@@ -778,7 +680,7 @@ def contact(request: HttpRequest) -> HttpResponse:
         },
         "hours_struct": hours_struct,
         "hours_display": hours_display,
-        "hours": s.business_hours or getattr(settings, "BUSINESS_HOURS", None),
+        "hours": content.business_hours_text or None,
         "form": contact_form,
         "tform": tform,
         "approved_testimonials": approved_testimonials,
@@ -803,13 +705,12 @@ def get_started(request: HttpRequest) -> HttpResponse:
         selected_plan = Plans.objects.filter(pk=selected_plan_id, is_available=True).first()
 
     if request.method == "POST":
-        # reCAPTCHA v3 verification (enforced if secret is configured)
-        recaptcha_ok, score = verify_recaptcha_v3(request, expected_action="get_started")
-        if not recaptcha_ok:
-            messages.error(request, "Spam detection failed. Please try again.")
+        form = NewHouseForm(request.POST, request.FILES)
+        verdict = GET_STARTED_SPAM.run(request, form=form)
+        if not verdict.passed and not verdict.form_invalid:
+            messages.error(request, verdict.message)
             return redirect("pages:get_started")
 
-        form = NewHouseForm(request.POST, request.FILES)
         if form.is_valid():
             cd = form.cleaned_data
 
@@ -928,8 +829,8 @@ def terms(request: HttpRequest) -> HttpResponse:
     )
 
 def about(request: HttpRequest) -> HttpResponse:
-    s = SiteSettings.load()
-    ap = AboutPage.objects.filter(is_published=True).first()
+    content = get_site_content()
+    ap = get_about_page()
 
     photos = []
     if ap and ap.photo_main:
@@ -957,8 +858,8 @@ def about(request: HttpRequest) -> HttpResponse:
 
     about_ctx = {
         "title": ap.title if ap else "About",
-        "company": s.company_name or getattr(settings, "COMPANY_NAME", "Provost Home Design"),
-        "owner_name": ap.owner_name if ap and ap.owner_name else (s.contact_name or "Michael Provost"),
+        "company": content.company,
+        "owner_name": ap.owner_name if ap and ap.owner_name else (content.site.contact_name or "Michael Provost"),
         "subtitle": ap.subtitle if ap else "Owner & Principal Designer",
         "paragraphs": ap.paragraphs() if ap else [
             "Michael grew up in the construction business. His father has owned and run a successful construction company since 1989. During Summer breaks, Michael would shadow his father going from site to site, helping any way he could. This is where it became apparent that he had a knack for construction and design!",
@@ -985,9 +886,9 @@ def about(request: HttpRequest) -> HttpResponse:
     return render(request, "pages/about.html", {"about": about_ctx, "testimonials": testimonials})
 
 def privacy(request: HttpRequest) -> HttpResponse:
-    s = SiteSettings.load()
-    company = s.company_name or getattr(settings, "COMPANY_NAME", "Provost Home Design")
-    contact_email = s.contact_email or getattr(settings, "CONTACT_EMAIL", "mike@provosthomedesign.com")
+    content = get_site_content()
+    company = content.company
+    contact_email = content.email
     return render(
         request,
         "pages/privacy.html",
@@ -1656,12 +1557,10 @@ def web_server_error(request: HttpRequest) -> HttpResponse:
     )
 
 
-@ratelimit(key="ip", rate="5/m", block=True)
+@ratelimit("web_contact")
 def web_contact(request: HttpRequest) -> HttpResponse:
-    s = SiteSettings.load()
-    company = s.company_name or getattr(settings, "COMPANY_NAME", "Provost Home Design")
-    email = s.contact_email or getattr(settings, "CONTACT_EMAIL", "mike@provosthomedesign.com")
-    logo_url = s.logo_url
+    content = get_site_content()
+    company, email, logo_url = content.company, content.email, content.logo_url
 
     to_emails = (
         _as_list(getattr(settings, "CONTACT_TO_EMAILS", None))
@@ -1683,30 +1582,13 @@ def web_contact(request: HttpRequest) -> HttpResponse:
 
     if request.method == "POST":
         form = WebDesignInquiryForm(request.POST)
-        if _too_many_recent_submissions(request, "web_design"):
-            messages.warning(request, "You're sending messages too quickly. Please wait a minute and try again.")
-            return render(request, "pages/web_contact.html", {
-                "form": form,
-                "recaptcha_site_key": (getattr(settings, "RECAPTCHA_SITE_KEY", "") or getattr(settings, "RECAPTCHA_PUBLIC_KEY", "")).strip(),
-            }, status=429)
-
-        started = float(request.session.get("web_design_started_ts", 0))
-        if time() - started < 2.0:
-            request.session["web_design_started_ts"] = time()
-            messages.error(request, "Spam protection triggered. Please try again.")
-            return render(request, "pages/web_contact.html", {
-                "form": form,
-                "recaptcha_site_key": (getattr(settings, "RECAPTCHA_SITE_KEY", "") or getattr(settings, "RECAPTCHA_PUBLIC_KEY", "")).strip(),
-            }, status=400)
-        request.session["web_design_started_ts"] = time()
-
-        recaptcha_ok, _ = verify_recaptcha_v3(request, expected_action="web_design_form")
-        if not recaptcha_ok:
-            messages.error(request, "Spam detection failed. Please try again.")
+        verdict = WEB_DESIGN_SPAM.run(request, form=form)
+        if not verdict.passed and not verdict.form_invalid:
+            messages.add_message(request, getattr(messages, verdict.level.upper(), messages.ERROR), verdict.message)
             return render(request, "pages/web_contact.html", {
                 "form": form,
                 "recaptcha_site_key": (getattr(settings, "RECAPTCHA_SITE_KEY", "") or getattr(settings, "RECAPTCHA_PUBLIC_KEY", "")).strip(),
-            }, status=400)
+            }, status=verdict.status)
 
         if form.is_valid():
             cd = form.cleaned_data
@@ -1827,13 +1709,11 @@ def web_contact(request: HttpRequest) -> HttpResponse:
 
 
 def pricing(request: HttpRequest) -> HttpResponse:
-    page = PricingPage.load()
-    items = list(page.items.filter(is_active=True)) if page.is_published else []
-    calc_items = [i for i in items if i.show_in_calculator]
+    content = get_pricing_content()
     return render(request, "pages/pricing.html", {
-        "page_obj": page,
-        "items": items,
-        "calc_items": calc_items,
+        "page_obj": content.page,
+        "items": content.items,
+        "calc_items": content.calc_items,
     })
 
 
@@ -54,7 +54,10 @@ class PlansAdmin(admin.ModelAdmin):
     )
     list_display_links = ("plan_number",)  # keep booleans editable
     list_editable = ("is_available", "is_featured", "is_popular")
-    list_filter = ("house_styles", "is_available", "is_featured", "is_popular", "bedrooms", "stories", "garage_stalls")
+    list_filter = (
+        "house_styles", "is_available", "content_ready", "is_featured", "is_popular", "bedrooms", "stories",
+        "garage_stalls",
+    )
     search_fields = ("plan_number", "plan_name", "description", "house_styles__style_name")
     prepopulated_fields = {"slug": ("plan_number",)}
     ordering = ("-is_featured", "-modified_date", "-created_date")
@@ -100,9 +103,9 @@ class PlansAdmin(admin.ModelAdmin):
     def price(self, obj):
         return f"${obj.plan_price:,.2f}" if obj.plan_price else "-"
 
-    @admin.display(description="Content", ordering="plan_name")
+    @admin.display(description="Content", ordering="content_ready")
     def content_readiness(self, obj):
-        missing = obj.content_missing_fields
+        missing = obj.stored_content_missing_fields
         if not missing:
             return format_html('<span style="color:#198754;font-weight:600">Ready</span>')
         return format_html(
@@ -111,34 +114,38 @@ class PlansAdmin(admin.ModelAdmin):
             len(missing),
         )
 
+    def _bulk_update(self, queryset, **values) -> int:
+        # One UPDATE plus one batched change-feed entry (see PlansQuerySet.bulk_edit).
+        return queryset.bulk_edit(values)
+
     @admin.action(description="Mark selected plans as Featured")
     def make_featured(self, request, queryset):
-        updated = queryset.update(is_featured=True)
+        updated = self._bulk_update(queryset, is_featured=True)
         self.message_user(request, f"{updated} plan(s) marked as featured.")
 
     @admin.action(description="Remove Featured from selected plans")
     def remove_featured(self, request, queryset):
-        updated = queryset.update(is_featured=False)
+        updated = self._bulk_update(queryset, is_featured=False)
         self.message_user(request, f"{updated} plan(s) unfeatured.")
 
     @admin.action(description="Mark selected plans as Popular")
     def make_popular(self, request, queryset):
-        updated = queryset.update(is_popular=True)
+        updated = self._bulk_update(queryset, is_popular=True)
         self.message_user(request, f"{updated} plan(s) marked as popular.")
 
     @admin.action(description="Remove Popular from selected plans")
     def remove_popular(self, request, queryset):
-        updated = queryset.update(is_popular=False)
+        updated = self._bulk_update(queryset, is_popular=False)
         self.message_user(request, f"{updated} plan(s) no longer marked as popular.")
 
     @admin.action(description="Mark selected plans as Available")
     def make_available(self, request, queryset):
-        updated = queryset.update(is_available=True)
+        updated = self._bulk_update(queryset, is_available=True)
         self.message_user(request, f"{updated} plan(s) marked available.")
 
     @admin.action(description="Mark selected plans as Unavailable")
     def make_unavailable(self, request, queryset):
-        updated = queryset.update(is_available=False)
+        updated = self._bulk_update(queryset, is_available=False)
         self.message_user(request, f"{updated} plan(s) marked unavailable.")
 
 
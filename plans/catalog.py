@@ -0,0 +1,523 @@
+"""
+Plan catalog import/export as versioned JSON Lines.
+
+A catalog file is one JSON object per line. The first line is the header
+(``{"type": "header", "format": "phd-plans", "version": 1, ...}``), then
+one ``style`` line per house style, then one ``plan`` line per plan with
+its style slugs, FAQs and gallery embedded. Images are references
+(``{"name": <storage name>, "url": <absolute URL>}``), not file contents.
+
+Imports stream the file and work in batches: each batch of plans is
+validated with ``clean_fields()``/``clean()``, upserted on ``plan_number``
+with ``core.seeding.seed`` (one read and at most one insert and one update
+per batch), and its style links, FAQs and gallery rows are synced with
+bulk writes. Image files missing from the default storage are copied from
+a local media directory or downloaded from their URL on a bounded thread
+pool while the batch is written. Bulk writes skip the model signals, so
+every plan that changed is logged with ``PlanChange.record`` (which also
+refreshes API snapshots and partner webhooks).
+
+    python manage.py plans_catalog export catalog.jsonl --base-url https://example.com
+    python manage.py plans_catalog import catalog.jsonl --media-dir ./media
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator
+from urllib.parse import urljoin
+
+import requests
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.text import slugify
+
+from core.seeding import seed
+
+from .models import HouseStyle, PlanChange, PlanFAQ, PlanGallery, Plans
+
+try:  # optional fast encoder
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+FORMAT = "phd-plans"
+VERSION = 1
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_WORKERS = 8
+DOWNLOAD_TIMEOUT = 30
+
+# Written by the database or carried as image references instead.
+_PLAN_EXCLUDED = {"id", "created_date", "modified_date", "main_image"}
+PLAN_FIELDS = [f.name for f in Plans._meta.concrete_fields if f.name not in _PLAN_EXCLUDED]
+STYLE_FIELDS = ["style_name", "description", "order"]
+FAQ_FIELDS = ["question", "answer", "order"]
+GALLERY_FIELDS = ["image", "kind", "caption", "order"]
+
+
+class CatalogError(ValueError):
+    """The file is not a catalog this version can read."""
+
+
+def _dumps(value) -> str:
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def _loads(line: str):
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+def _json_value(value):
+    return str(value) if isinstance(value, Decimal) else value
+
+
+# ── export ──────────────────────────────────────────────────────────────────
+def _image_ref(file, base_url: str) -> dict[str, str] | None:
+    if not file:
+        return None
+    url = default_storage.url(file.name)
+    return {"name": file.name, "url": urljoin(base_url, url) if base_url else url}
+
+
+def style_record(style: HouseStyle, base_url: str = "") -> dict[str, Any]:
+    record = {"type": "style", "slug": style.slug}
+    record.update({name: getattr(style, name) for name in STYLE_FIELDS})
+    record["image"] = _image_ref(style.style_image, base_url)
+    return record
+
+
+def plan_record(plan: Plans, base_url: str = "") -> dict[str, Any]:
+    """One plan line; prefetch ``house_styles``, ``faqs`` and ``images``."""
+    record: dict[str, Any] = {"type": "plan"}
+    record.update({name: _json_value(getattr(plan, name)) for name in PLAN_FIELDS})
+    record["main_image"] = _image_ref(plan.main_image, base_url)
+    record["styles"] = sorted(style.slug for style in plan.house_styles.all())
+    record["faqs"] = [{name: getattr(faq, name) for name in FAQ_FIELDS} for faq in plan.faqs.all()]
+    record["gallery"] = [
+        {"image": _image_ref(image.image, base_url), "kind": image.kind, "caption": image.caption, "order": image.order}
+        for image in plan.images.all()
+    ]
+    return record
+
+
+def export_catalog(out: IO[str], *, base_url: str = "", queryset=None, chunk_size: int = DEFAULT_BATCH_SIZE) -> dict[str, int]:
+    """Write every style and the plans in ``queryset`` (default: all) to ``out``; returns the counts."""
+    plans = (queryset if queryset is not None else Plans.objects.all()).order_by("plan_number")
+    styles = list(HouseStyle.objects.all())
+    counts = {"styles": len(styles), "plans": plans.count()}
+    header = {
+        "type": "header",
+        "format": FORMAT,
+        "version": VERSION,
+        "exported_at": timezone.now().isoformat(),
+        **counts,
+    }
+    out.write(_dumps(header) + "\n")
+    for style in styles:
+        out.write(_dumps(style_record(style, base_url)) + "\n")
+    for plan in plans.prefetch_related("house_styles", "faqs", "images").iterator(chunk_size=chunk_size):
+        out.write(_dumps(plan_record(plan, base_url)) + "\n")
+    return counts
+
+
+# ── import ──────────────────────────────────────────────────────────────────
+def read_catalog(lines: Iterable[str]) -> Iterator[tuple[int, dict[str, Any]]]:
+    """``(line number, record)`` for every record after a valid header."""
+    header_seen = False
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = _loads(line)
+        except ValueError as exc:
+            raise CatalogError(f"Line {number}: not valid JSON ({exc})")
+        if not isinstance(record, dict):
+            raise CatalogError(f"Line {number}: expected a JSON object")
+        if not header_seen:
+            if record.get("type") != "header" or record.get("format") != FORMAT:
+                raise CatalogError(f"Line {number}: missing the {FORMAT} header")
+            if not isinstance(record.get("version"), int) or record["version"] > VERSION:
+                raise CatalogError(f"Unsupported catalog version {record.get('version')!r} (this reader supports {VERSION})")
+            header_seen = True
+            continue
+        yield number, record
+    if not header_seen:
+        raise CatalogError("Empty catalog file")
+
+
+@dataclass
+class ImportStats:
+    rows: int = 0
+    styles: int = 0
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    invalid: int = 0
+    images_copied: int = 0
+    images_present: int = 0
+    errors: list[str] = field(default_factory=list)
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self) -> float:
+        elapsed = self.elapsed
+        return self.rows / elapsed if elapsed else 0.0
+
+
+class ImageCopier:
+    """
+    Copies referenced image files into the default storage on a bounded pool.
+
+    A file already in storage is left alone. Otherwise it is read from
+    ``media_dir`` when given and present there, else downloaded from the
+    reference URL. Workers only touch storage and HTTP, never the database.
+    """
+
+    def __init__(self, *, media_dir: str | Path | None = None, workers: int = DEFAULT_WORKERS):
+        self.media_dir = Path(media_dir) if media_dir else None
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="plans-catalog")
+        self.pending: list = []
+        self._seen: set[str] = set()
+        self._local = threading.local()
+
+    def submit(self, ref: dict[str, str] | None) -> None:
+        if not ref or not ref.get("name") or ref["name"] in self._seen:
+            return
+        self._seen.add(ref["name"])
+        self.pending.append(self.pool.submit(self._copy, ref))
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _copy(self, ref: dict[str, str]) -> bool:
+        """True when the file was copied, False when it was already stored."""
+        name = ref["name"]
+        if default_storage.exists(name):
+            return False
+        local = self.media_dir / name if self.media_dir else None
+        if local is not None and local.is_file():
+            data = local.read_bytes()
+        elif ref.get("url", "").startswith(("http://", "https://")):
+            response = self._session().get(ref["url"], timeout=DOWNLOAD_TIMEOUT)
+            response.raise_for_status()
+            data = response.content
+        else:
+            raise FileNotFoundError(f"no source for {name}")
+        saved = default_storage.save(name, ContentFile(data))
+        if saved != name:  # lost a race with another writer; keep the referenced name
+            default_storage.delete(saved)
+        return True
+
+    def wait(self, stats: ImportStats) -> None:
+        pending, self.pending = self.pending, []
+        for future in pending:
+            try:
+                copied = future.result()
+            except Exception as exc:
+                stats.errors.append(f"Image: {exc}")
+            else:
+                if copied:
+                    stats.images_copied += 1
+                else:
+                    stats.images_present += 1
+
+    def close(self, stats: ImportStats) -> None:
+        self.wait(stats)
+        self.pool.shutdown()
+
+
+def _ref_name(ref) -> str:
+    # Blank rather than None: that is what a file field without a file saves as.
+    if isinstance(ref, dict):
+        return ref.get("name") or ""
+    return ref or ""
+
+
+def _error_text(exc: ValidationError) -> str:
+    if hasattr(exc, "error_dict"):
+        return "; ".join(f"{name}: {' '.join(messages)}" for name, messages in exc.message_dict.items())
+    return " ".join(exc.messages)
+
+
+class CatalogImporter:
+    """Streams catalog records into the database; see the module docstring."""
+
+    def __init__(
+        self,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        media_dir: str | Path | None = None,
+        workers: int = DEFAULT_WORKERS,
+        copy_images: bool = True,
+        dry_run: bool = False,
+        progress=None,
+    ):
+        self.batch_size = max(1, batch_size)
+        self.dry_run = dry_run
+        self.copy_images = copy_images and not dry_run
+        self.images = ImageCopier(media_dir=media_dir, workers=workers) if self.copy_images else None
+        self.progress = progress
+        self.stats = ImportStats()
+        self.style_ids = dict(HouseStyle.objects.values_list("slug", "id"))
+        self._styles: list[tuple[int, dict]] = []
+        self._plans: list[tuple[int, dict]] = []
+        self._seen_plans: dict[str, int] = {}
+        self._slugs: dict[str, str] = {}
+
+    def run(self, lines: Iterable[str]) -> ImportStats:
+        try:
+            for number, record in read_catalog(lines):
+                kind = record.get("type")
+                if kind == "style":
+                    self._styles.append((number, record))
+                elif kind == "plan":
+                    self._flush_styles()
+                    self._plans.append((number, record))
+                    if len(self._plans) >= self.batch_size:
+                        self._flush_plans()
+                else:
+                    self.stats.errors.append(f"Line {number}: unknown record type {kind!r}")
+            self._flush_styles()
+            self._flush_plans()
+        finally:
+            if self.images is not None:
+                self.images.close(self.stats)
+        return self.stats
+
+    # styles ---------------------------------------------------------------
+    def _flush_styles(self) -> None:
+        if not self._styles:
+            return
+        records, self._styles = self._styles, []
+        rows = []
+        for number, record in records:
+            slug = record.get("slug") or slugify(record.get("style_name") or "")
+            if not slug or not record.get("style_name"):
+                self.stats.errors.append(f"Line {number}: style needs a style_name")
+                continue
+            row = {"slug": slug, **{name: record[name] for name in STYLE_FIELDS if name in record}}
+            if "image" in record:
+                row["style_image"] = _ref_name(record["image"])
+                if self.images is not None:
+                    self.images.submit(record["image"])
+            rows.append(row)
+        result = seed(HouseStyle, rows, key="slug", dry_run=self.dry_run)
+        self.stats.styles += len(result.created) + len(result.updated)
+        if self.dry_run:
+            self.style_ids.update({row["slug"]: None for row in rows})
+            return
+        self.style_ids.update({slug: style.pk for slug, style in result.by_key().items()})
+        # Plans embed their style names; a renamed style changes them.
+        if result.updated:
+            PlanChange.record(Plans.objects.filter(house_styles__in=result.updated).distinct())
+
+    # plans ----------------------------------------------------------------
+    def _plan_row(self, number: int, record: dict) -> dict[str, Any] | None:
+        """The validated field values of a plan record, or None (with the error noted)."""
+        plan_number = record.get("plan_number")
+        if not plan_number:
+            self.stats.errors.append(f"Line {number}: plan has no plan_number")
+            return None
+        if plan_number in self._seen_plans:
+            self.stats.errors.append(f"Line {number}: {plan_number} already appeared on line {self._seen_plans[plan_number]}")
+            return None
+        self._seen_plans[plan_number] = number
+        row = {name: record[name] for name in PLAN_FIELDS if name in record}
+        row["slug"] = row.get("slug") or slugify(plan_number)
+        if "main_image" in record:
+            row["main_image"] = _ref_name(record["main_image"])
+        unknown = [slug for slug in record.get("styles") or () if slug not in self.style_ids]
+        try:
+            plan = Plans(**row)
+            plan.clean_fields()
+            plan.clean()
+            if unknown:
+                raise ValidationError({"styles": f"Unknown house styles: {', '.join(unknown)}"})
+        except (ValidationError, TypeError) as exc:
+            message = _error_text(exc) if isinstance(exc, ValidationError) else str(exc)
+            self.stats.errors.append(f"Line {number}: {plan_number}: {message}")
+            return None
+        # Cleaned values, so unchanged plans compare equal (Decimal("2.5") vs "2.5").
+        cleaned = {name: getattr(plan, name) for name in row if name != "main_image"}
+        if "main_image" in row:
+            cleaned["main_image"] = row["main_image"]
+        return cleaned
+
+    def _flush_plans(self) -> None:
+        if not self._plans:
+            return
+        batch, self._plans = self._plans, []
+        first_line = batch[0][0]
+        self.stats.rows += len(batch)
+
+        candidates = []
+        for number, record in batch:
+            row = self._plan_row(number, record)
+            if row is None:
+                self.stats.invalid += 1
+                continue
+            candidates.append((number, row, record))
+
+        # Slugs are unique too; a clash would abort the upsert below, so check
+        # the batch against the table (one read) and the earlier lines.
+        owners = dict(
+            Plans.objects.filter(slug__in=[row["slug"] for _, row, _ in candidates])
+            .values_list("slug", "plan_number")
+        )
+        valid: list[tuple[dict, dict]] = []
+        for number, row, record in candidates:
+            slug, plan_number = row["slug"], row["plan_number"]
+            owner = self._slugs.get(slug) or owners.get(slug)
+            if owner and owner != plan_number:
+                self.stats.errors.append(f"Line {number}: {plan_number}: slug {slug!r} is already used by {owner}")
+                self.stats.invalid += 1
+                continue
+            self._slugs[slug] = plan_number
+            valid.append((row, record))
+            if self.images is not None:
+                self.images.submit(record.get("main_image"))
+                for image in record.get("gallery") or ():
+                    self.images.submit(image.get("image"))
+
+        result = None
+        if valid:
+            with transaction.atomic():
+                result = seed(
+                    Plans,
+                    [row for row, _ in valid],
+                    key="plan_number",
+                    prepare=Plans.refresh_content_readiness,
+                    prepared_fields=Plans.READINESS_FIELDS,
+                    dry_run=self.dry_run,
+                )
+                if not self.dry_run:
+                    self._write_related(valid, result)
+            self.stats.created += len(result.created)
+            self.stats.updated += len(result.updated)
+            self.stats.unchanged += len(result.unchanged)
+
+        # Let the copies for this batch finish before reading the next one, so
+        # at most one batch of downloads is in flight.
+        if self.images is not None:
+            self.images.wait(self.stats)
+        if self.progress is not None:
+            self.progress(first_line, batch[-1][0], result, self.stats)
+
+    def _write_related(self, valid: list[tuple[dict, dict]], result) -> None:
+        plan_ids = dict(
+            Plans.objects.filter(plan_number__in=[row["plan_number"] for row, _ in valid])
+            .values_list("plan_number", "id")
+        )
+        changed = {plan_ids[obj.plan_number] for obj in result.created + result.updated}
+
+        styles, faqs, gallery = {}, {}, {}
+        for row, record in valid:
+            plan_id = plan_ids[row["plan_number"]]
+            if "styles" in record:
+                styles[plan_id] = {self.style_ids[slug] for slug in record["styles"] or ()}
+            if "faqs" in record:
+                faqs[plan_id] = [
+                    {"question": faq.get("question", ""), "answer": faq.get("answer", ""), "order": faq.get("order", i)}
+                    for i, faq in enumerate(record["faqs"] or ())
+                ]
+            if "gallery" in record:
+                gallery[plan_id] = [
+                    {
+                        "image": _ref_name(image.get("image")),
+                        "kind": image.get("kind") or "other",
+                        "caption": image.get("caption") or "",
+                        "order": image.get("order", i),
+                    }
+                    for i, image in enumerate(record["gallery"] or ())
+                ]
+        changed |= sync_styles(styles)
+        changed |= sync_children(PlanFAQ, faqs, FAQ_FIELDS)
+        changed |= sync_children(PlanGallery, gallery, GALLERY_FIELDS)
+
+        if changed:
+            by_number = result.by_key()
+            for obj in by_number.values():
+                obj.pk = obj.pk or plan_ids[obj.plan_number]
+            PlanChange.record([obj for obj in by_number.values() if obj.pk in changed])
+
+
+def sync_styles(wanted: dict[int, set[int]]) -> set[int]:
+    """Make each plan's house styles match ``wanted``; returns the ids of plans that changed."""
+    if not wanted:
+        return set()
+    Through = Plans.house_styles.through
+    current = defaultdict(set)
+    for plan_id, style_id in Through.objects.filter(plans_id__in=wanted).values_list("plans_id", "housestyle_id"):
+        current[plan_id].add(style_id)
+    adds, removes, changed = [], [], set()
+    for plan_id, style_ids in wanted.items():
+        added = style_ids - current[plan_id]
+        stale = current[plan_id] - style_ids
+        adds += [Through(plans_id=plan_id, housestyle_id=style_id) for style_id in added]
+        if stale:
+            removes.append(Q(plans_id=plan_id, housestyle_id__in=stale))
+        if added or stale:
+            changed.add(plan_id)
+    if adds:
+        Through.objects.bulk_create(adds, ignore_conflicts=True)
+    if removes:
+        Through.objects.filter(reduce(or_, removes)).delete()
+    return changed
+
+
+def sync_children(model, wanted: dict[int, list[dict]], fields: list[str]) -> set[int]:
+    """
+    Make each plan's ``model`` rows (FAQs, gallery images) match ``wanted``,
+    in order. Rows are updated in place by position, so re-importing an
+    unchanged plan writes nothing. Returns the ids of plans that changed.
+    """
+    if not wanted:
+        return set()
+    current = defaultdict(list)
+    for obj in model.objects.filter(plan_id__in=wanted).order_by("plan_id", "order", "id"):
+        current[obj.plan_id].append(obj)
+    creates, updates, deletes, changed = [], [], [], set()
+    for plan_id, rows in wanted.items():
+        existing = current[plan_id]
+        for obj, row in zip(existing, rows):
+            if any(getattr(obj, name) != row[name] for name in fields):
+                for name in fields:
+                    setattr(obj, name, row[name])
+                updates.append(obj)
+                changed.add(plan_id)
+        if len(rows) > len(existing):
+            creates += [model(plan_id=plan_id, **row) for row in rows[len(existing):]]
+            changed.add(plan_id)
+        if len(existing) > len(rows):
+            deletes += [obj.pk for obj in existing[len(rows):]]
+            changed.add(plan_id)
+    if creates:
+        model.objects.bulk_create(creates)
+    if updates:
+        model.objects.bulk_update(updates, fields)
+    if deletes:
+        model.objects.filter(pk__in=deletes).delete()
+    return changed
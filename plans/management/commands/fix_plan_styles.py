@@ -2,7 +2,21 @@
 Management command to fix plans without house styles
 """
 from django.core.management.base import BaseCommand
-from plans.models import Plans, HouseStyle
+from django.db import transaction
+
+from core.seeding import seed
+from plans.models import Plans, HouseStyle, PlanChange
+
+
+def assign_style(plans, style):
+    """Add ``style`` to ``plans`` in one insert (bulk writes skip the m2m_changed hook)."""
+    Through = Plans.house_styles.through
+    with transaction.atomic():
+        Through.objects.bulk_create(
+            [Through(plans_id=plan.pk, housestyle_id=style.pk) for plan in plans],
+            ignore_conflicts=True,
+        )
+        PlanChange.record(plans)
 
 
 class Command(BaseCommand):
@@ -22,10 +36,7 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         # Find plans without styles
-        plans_without_styles = []
-        for plan in Plans.objects.all():
-            if not plan.house_styles.exists():
-                plans_without_styles.append(plan)
+        plans_without_styles = list(Plans.objects.filter(house_styles__isnull=True).order_by('plan_number'))
 
         if not plans_without_styles:
             self.stdout.write(self.style.SUCCESS('✓ All plans have house styles assigned'))
@@ -39,20 +50,18 @@ class Command(BaseCommand):
 
         if options['create_general']:
             # Create General house style
-            general, created = HouseStyle.objects.get_or_create(
-                slug='general',
-                defaults={
-                    'style_name': 'General',
-                    'description': 'General house plans',
-                    'order': 999
-                }
+            result = seed(
+                HouseStyle,
+                [{'slug': 'general', 'style_name': 'General', 'description': 'General house plans', 'order': 999}],
+                key='slug',
+                update=False,
             )
-            if created:
+            general = result.by_key()['general']
+            if result.created:
                 self.stdout.write(self.style.SUCCESS(f'✓ Created General house style'))
             
             # Assign to plans without styles
-            for plan in plans_without_styles:
-                plan.house_styles.add(general)
+            assign_style(plans_without_styles, general)
             
             self.stdout.write(self.style.SUCCESS(
                 f'✓ Assigned General style to {len(plans_without_styles)} plans'
@@ -61,8 +70,7 @@ class Command(BaseCommand):
         elif options['assign_default']:
             try:
                 style = HouseStyle.objects.get(slug=options['assign_default'])
-                for plan in plans_without_styles:
-                    plan.house_styles.add(style)
+                assign_style(plans_without_styles, style)
                 
                 self.stdout.write(self.style.SUCCESS(
                     f'✓ Assigned {style.style_name} to {len(plans_without_styles)} plans'
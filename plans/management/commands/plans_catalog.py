@@ -0,0 +1,112 @@
+"""
+Export or import the plan catalog as versioned JSON Lines (see plans.catalog).
+
+    python manage.py plans_catalog export catalog.jsonl [--base-url https://example.com]
+    python manage.py plans_catalog import catalog.jsonl [--media-dir ./media] [--dry-run]
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from plans import catalog
+
+
+class Command(BaseCommand):
+    help = 'Export or import plans, house styles, FAQs and gallery references as JSON Lines'
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest='action', required=True)
+
+        export = subparsers.add_parser('export', help='Write the catalog to a file')
+        export.add_argument('path', help='Output file (.jsonl)')
+        export.add_argument(
+            '--base-url',
+            default='',
+            help='Site origin for image URLs when media is served from a relative MEDIA_URL',
+        )
+
+        load = subparsers.add_parser('import', help='Upsert plans from a catalog file, keyed on plan_number')
+        load.add_argument('path', help='Catalog file (.jsonl)')
+        load.add_argument(
+            '--batch-size',
+            type=int,
+            default=catalog.DEFAULT_BATCH_SIZE,
+            help=f'Plans validated and written per transaction (default: {catalog.DEFAULT_BATCH_SIZE})',
+        )
+        load.add_argument(
+            '--media-dir',
+            help='Local copy of the source media; images found here are not downloaded',
+        )
+        load.add_argument(
+            '--workers',
+            type=int,
+            default=catalog.DEFAULT_WORKERS,
+            help=f'Concurrent image copies (default: {catalog.DEFAULT_WORKERS})',
+        )
+        load.add_argument(
+            '--skip-images',
+            action='store_true',
+            help='Write image references without copying the files',
+        )
+        load.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate and report without writing anything',
+        )
+
+    def handle(self, *args, **options):
+        if options['action'] == 'export':
+            self.export(options)
+        else:
+            self.load(options)
+
+    def export(self, options):
+        try:
+            with open(options['path'], 'w', encoding='utf-8') as out:
+                counts = catalog.export_catalog(out, base_url=options['base_url'])
+        except OSError as e:
+            raise CommandError(f'Could not write {options["path"]}: {e}')
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Exported {counts["plans"]} plans and {counts["styles"]} house styles to {options["path"]}'
+        ))
+
+    def load(self, options):
+        self.dry_run = dry_run = options['dry_run']
+        importer = catalog.CatalogImporter(
+            batch_size=options['batch_size'],
+            media_dir=options['media_dir'],
+            workers=options['workers'],
+            copy_images=not options['skip_images'],
+            dry_run=dry_run,
+            progress=self.progress,
+        )
+        try:
+            with open(options['path'], 'r', encoding='utf-8') as f:
+                stats = importer.run(f)
+        except FileNotFoundError:
+            raise CommandError(f'File not found: {options["path"]}')
+        except catalog.CatalogError as e:
+            raise CommandError(str(e))
+
+        for error in stats.errors:
+            self.stdout.write(self.style.WARNING(error))
+        self.stdout.write('\n' + '='*60)
+        if dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN - No changes made to database'))
+        self.stdout.write(f'House styles created or updated: {stats.styles}')
+        self.stdout.write(f'Plans: {stats.created} created, {stats.updated} updated, {stats.unchanged} unchanged')
+        self.stdout.write(f'Invalid rows: {stats.invalid}')
+        if not (dry_run or options['skip_images']):
+            self.stdout.write(f'Images: {stats.images_copied} copied, {stats.images_present} already stored')
+        self.stdout.write(f'Rows: {stats.rows} in {stats.elapsed:.2f}s ({stats.rate:.0f} rows/s)')
+        self.stdout.write('='*60)
+        if stats.errors:
+            self.stdout.write(self.style.WARNING(f'\nFinished with {len(stats.errors)} problems (listed above)'))
+        elif not dry_run:
+            self.stdout.write(self.style.SUCCESS('\n✅ Catalog imported'))
+
+    def progress(self, first_line, last_line, result, stats):
+        created = len(result.created) if result else 0
+        updated = len(result.updated) if result else 0
+        self.stdout.write(
+            f'{"[DRY RUN] " if self.dry_run else ""}Lines {first_line}-{last_line}: '
+            f'{created} created, {updated} updated ({stats.rate:.0f} rows/s)'
+        )
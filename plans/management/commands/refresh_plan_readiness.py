@@ -0,0 +1,56 @@
+"""
+Recompute the stored content-readiness fields of every plan.
+
+Plans refresh them on save(); run this after bulk writes that bypass save()
+(queryset.update(), raw SQL, data fixes) or after CONTENT_FIELD_LABELS
+changes. Only plans whose readiness changed are written, without touching
+modified_date.
+"""
+from django.core.management.base import BaseCommand
+
+from plans.models import Plans
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored content readiness (content_missing_mask, content_ready) for all plans'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Plans read and written per batch (default: 500)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would change without saving',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        fields = [
+            'pk', 'plan_number', 'house_width_in', 'house_depth_in', *Plans.READINESS_FIELDS,
+            *(field for field, _label in Plans.CONTENT_FIELD_LABELS),
+        ]
+        checked = ready = updated = 0
+        changed = []
+        for plan in Plans.objects.only(*fields).order_by('pk').iterator(chunk_size=batch_size):
+            checked += 1
+            if plan.refresh_content_readiness():
+                changed.append(plan)
+            ready += plan.content_ready
+            if len(changed) >= batch_size:
+                updated += self.write(changed, options['dry_run'])
+                changed = []
+        updated += self.write(changed, options['dry_run'])
+
+        prefix = '[DRY RUN] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}✓ {checked} plans checked, {updated} updated; {ready} ready, {checked - ready} with content gaps'
+        ))
+
+    def write(self, plans, dry_run):
+        if plans and not dry_run:
+            Plans.objects.bulk_update(plans, list(Plans.READINESS_FIELDS))
+        return len(plans)
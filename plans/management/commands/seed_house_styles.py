@@ -2,10 +2,10 @@
 from __future__ import annotations
 
 from django.core.management.base import BaseCommand
-from django.db import transaction
 from django.utils.text import slugify
 
-from plans.models import HouseStyle
+from core.seeding import seed
+from plans.models import HouseStyle, PlanChange, Plans
 
 # Keep the order you want displayed in filters/menus
 DEFAULT_STYLES = [
@@ -41,48 +41,6 @@ DEFAULT_STYLES = [
     "Carriage House / ADU",
 ]
 
-# --- Helpers that adapt to your model field names ---
-def _get_name_field() -> str:
-    # Prefer 'name'; fall back to 'style_name'
-    fields = {f.name for f in HouseStyle._meta.get_fields() if hasattr(f, "attname")}
-    if "name" in fields:
-        return "name"
-    elif "style_name" in fields:
-        return "style_name"
-    # Last resort: assume 'name'
-    return "name"
-
-def _get_order_field() -> str | None:
-    fields = {f.name for f in HouseStyle._meta.get_fields() if hasattr(f, "attname")}
-    return "order" if "order" in fields else None
-
-NAME_FIELD = _get_name_field()
-ORDER_FIELD = _get_order_field()
-
-def _get_name(obj: HouseStyle) -> str:
-    return getattr(obj, NAME_FIELD, "") or ""
-
-def _set_name(obj: HouseStyle, value: str):
-    setattr(obj, NAME_FIELD, value)
-
-def _set_order_if_present(obj: HouseStyle, idx: int):
-    if ORDER_FIELD:
-        setattr(obj, ORDER_FIELD, idx)
-
-def _unique_slug(base: str) -> str:
-    """
-    Return a unique slug by appending -2, -3, ... as needed.
-    """
-    base = base or "style"
-    if not HouseStyle.objects.filter(slug=base).exists():
-        return base
-    i = 2
-    while True:
-        candidate = f"{base}-{i}"
-        if not HouseStyle.objects.filter(slug=candidate).exists():
-            return candidate
-        i += 1
-
 
 class Command(BaseCommand):
     help = (
@@ -102,84 +60,34 @@ class Command(BaseCommand):
             help="Show what would change without writing to the database.",
         )
 
-    @transaction.atomic
     def handle(self, *args, **options):
         sync = bool(options.get("sync"))
         dry_run = bool(options.get("dry_run"))
 
-        created = 0
-        updated = 0
-        skipped = 0
-
-        for idx, name in enumerate(DEFAULT_STYLES, start=1):
-            base_slug = slugify(name) or "style"
-
-            # 1) Exact slug match has priority
-            obj = HouseStyle.objects.filter(slug=base_slug).first()
-            if obj:
-                # Compare current stored name (case-insensitive)
-                if _get_name(obj).strip().casefold() != name.strip().casefold():
-                    if sync:
-                        if not dry_run:
-                            _set_name(obj, name)
-                            _set_order_if_present(obj, idx)
-                            update_fields = [NAME_FIELD]
-                            if ORDER_FIELD:
-                                update_fields.append(ORDER_FIELD)
-                            obj.save(update_fields=update_fields)
-                        updated += 1
-                        self.stdout.write(f"↻ Synced name/order: {name} ({base_slug})")
-                    else:
-                        # Create a separate row with a unique slug (don't rename existing)
-                        new_slug = _unique_slug(base_slug)
-                        if not dry_run:
-                            new_obj = HouseStyle(slug=new_slug)
-                            _set_name(new_obj, name)
-                            _set_order_if_present(new_obj, idx)
-                            new_obj.save()
-                        created += 1
-                        self.stdout.write(f"✔ Created (new slug): {name} ({new_slug})")
-                else:
-                    # Same name: maybe just order needs syncing/backfilling
-                    needs_order = False
-                    if ORDER_FIELD:
-                        needs_order = getattr(obj, ORDER_FIELD, None) != idx
-                    if sync and needs_order:
-                        if not dry_run:
-                            _set_order_if_present(obj, idx)
-                            obj.save(update_fields=[ORDER_FIELD])
-                        updated += 1
-                        self.stdout.write(f"↻ Synced order: {name} ({base_slug})")
-                    else:
-                        skipped += 1
-                continue
-
-            # 2) No slug match; try case-insensitive name match (stable slug)
-            obj_by_name = HouseStyle.objects.filter(**{f"{NAME_FIELD}__iexact": name}).first()
-            if obj_by_name:
-                if sync and ORDER_FIELD and getattr(obj_by_name, ORDER_FIELD, None) != idx:
-                    if not dry_run:
-                        _set_order_if_present(obj_by_name, idx)
-                        obj_by_name.save(update_fields=[ORDER_FIELD])
-                    updated += 1
-                    self.stdout.write(f"↻ Synced order by name: {name} ({obj_by_name.slug})")
-                else:
-                    skipped += 1
-                continue
-
-            # 3) Create new row with the base slug (or a unique variant if taken concurrently)
-            new_slug = base_slug if not HouseStyle.objects.filter(slug=base_slug).exists() else _unique_slug(base_slug)
-            if not dry_run:
-                new_obj = HouseStyle(slug=new_slug)
-                _set_name(new_obj, name)
-                _set_order_if_present(new_obj, idx)
-                new_obj.save()
-            created += 1
-            self.stdout.write(f"✔ Created: {name} ({new_slug})")
+        # An existing style with the same name keeps its slug (style_name is unique too).
+        slug_by_name = {
+            name.strip().casefold(): slug for name, slug in HouseStyle.objects.values_list("style_name", "slug")
+        }
+        records = [
+            {
+                "slug": slug_by_name.get(name.casefold()) or slugify(name) or "style",
+                "style_name": name,
+                "order": idx,
+            }
+            for idx, name in enumerate(DEFAULT_STYLES, start=1)
+        ]
+
+        result = seed(HouseStyle, records, key="slug", update=sync, dry_run=dry_run)
+        for line in result.lines():
+            self.stdout.write(line)
+
+        if result.updated and not dry_run:
+            # Plans embed the style name (what the HouseStyle post_save hook records).
+            PlanChange.record(Plans.objects.filter(house_styles__in=result.updated).distinct())
 
         self.stdout.write(
             self.style.SUCCESS(
-                f"Seed complete - created: {created}, updated: {updated}, skipped: {skipped}."
+                f"Seed complete - {result.summary()}."
                 + (" (dry-run)" if dry_run else "")
             )
         )
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plans', '0012_populate_plan_merchandising'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='plans',
+            index=models.Index(fields=['is_available', '-modified_date', 'id'], name='plans_avail_modified_idx'),
+        ),
+    ]
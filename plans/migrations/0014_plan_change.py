@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plans', '0013_plans_avail_modified_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlanChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('plan_number', models.CharField(max_length=50)),
+                ('action', models.CharField(choices=[('upsert', 'Created or updated'), ('remove', 'Removed or unavailable')], max_length=10)),
+                ('changed_at', models.DateTimeField(auto_now_add=True)),
+                ('plan', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='plans.plans')),
+            ],
+            options={
+                'verbose_name': 'plan change',
+                'verbose_name_plural': 'plan changes',
+                'ordering': ('id',),
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+def seed_plan_changes(apps, schema_editor):
+    """One entry per existing plan so ?since=0 replays the whole catalog."""
+    Plans = apps.get_model("plans", "Plans")
+    PlanChange = apps.get_model("plans", "PlanChange")
+    PlanChange.objects.bulk_create(
+        [
+            PlanChange(plan_id=pk, plan_number=number, action="upsert" if available else "remove")
+            for pk, number, available in Plans.objects.order_by("modified_date", "id").values_list(
+                "pk", "plan_number", "is_available"
+            )
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plans', '0014_plan_change'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_plan_changes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:43
+
+from django.db import migrations, models
+
+
+# Frozen copies of Plans.CONTENT_FIELD_LABELS (field order = bit order) and
+# the placeholder-dimension rule as of this migration.
+CONTENT_FIELDS = (
+    "plan_name", "description", "ideal_for", "key_features", "layout_highlights", "foundation_framing",
+    "exterior_character", "package_contents", "delivery_details", "common_modifications", "meta_description",
+    "main_image",
+)
+DIMENSIONS_MISSING = 1 << len(CONTENT_FIELDS)
+MIN_DIMENSION_IN = 120
+
+
+def missing_mask(plan):
+    mask = 0
+    for bit, field in enumerate(CONTENT_FIELDS):
+        if not getattr(plan, field):
+            mask |= 1 << bit
+    if not ((plan.house_width_in or 0) >= MIN_DIMENSION_IN and (plan.house_depth_in or 0) >= MIN_DIMENSION_IN):
+        mask |= DIMENSIONS_MISSING
+    return mask
+
+
+def backfill_readiness(apps, schema_editor):
+    Plans = apps.get_model("plans", "Plans")
+    plans = []
+    for plan in Plans.objects.order_by("pk").iterator(chunk_size=500):
+        plan.content_missing_mask = missing_mask(plan)
+        plan.content_ready = not plan.content_missing_mask
+        plans.append(plan)
+    Plans.objects.bulk_update(plans, ["content_missing_mask", "content_ready"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plans', '0015_seed_plan_changes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plans',
+            name='content_missing_mask',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Bit i set when CONTENT_FIELD_LABELS[i] is missing; the next bit for unverified dimensions.'),
+        ),
+        migrations.AddField(
+            model_name='plans',
+            name='content_ready',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='plans',
+            index=models.Index(fields=['content_ready', 'is_available'], name='plans_ready_avail_idx'),
+        ),
+        migrations.RunPython(backfill_readiness, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+from django.db import migrations
+
+PG_VECTOR = (
+    "to_tsvector('english', plan_number || ' ' || plan_name || ' ' || coalesce(sku, '') || ' ' "
+    "|| description || ' ' || key_features)"
+)
+
+COLUMNS = "plan_number, plan_name, sku, description, key_features"
+NEW = "new.plan_number, new.plan_name, new.sku, new.description, new.key_features"
+OLD = "old.plan_number, old.plan_name, old.sku, old.description, old.key_features"
+
+SQLITE_SQL = [
+    f"""CREATE VIRTUAL TABLE plans_search_fts USING fts5(
+        {COLUMNS}, content='plans_plans', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    f"""CREATE TRIGGER plans_search_ai AFTER INSERT ON plans_plans BEGIN
+        INSERT INTO plans_search_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW});
+    END""",
+    f"""CREATE TRIGGER plans_search_ad AFTER DELETE ON plans_plans BEGIN
+        INSERT INTO plans_search_fts(plans_search_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD});
+    END""",
+    f"""CREATE TRIGGER plans_search_au AFTER UPDATE OF {COLUMNS} ON plans_plans BEGIN
+        INSERT INTO plans_search_fts(plans_search_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD});
+        INSERT INTO plans_search_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW});
+    END""",
+    # Index the plans that already exist.
+    "INSERT INTO plans_search_fts(plans_search_fts) VALUES ('rebuild')",
+]
+
+
+def install_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(f"CREATE INDEX plans_search_vector_idx ON plans_plans USING GIN (({PG_VECTOR}))")
+    elif vendor == "sqlite":
+        for sql in SQLITE_SQL:
+            schema_editor.execute(sql)
+
+
+def remove_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS plans_search_vector_idx")
+    elif vendor == "sqlite":
+        for trigger in ("plans_search_ai", "plans_search_ad", "plans_search_au"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        schema_editor.execute("DROP TABLE IF EXISTS plans_search_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("plans", "0016_content_readiness"),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, remove_search_index),
+    ]
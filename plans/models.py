@@ -2,10 +2,12 @@ from __future__ import annotations
 
 from datetime import timedelta
 from decimal import Decimal, InvalidOperation
+from typing import Iterable
 import uuid
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.dispatch import Signal
 from django.urls import reverse
 from django.utils.text import slugify
 from django.utils import timezone as dj_timezone  # avoid name shadowing
@@ -45,6 +47,36 @@ class PlansQuerySet(models.QuerySet):
     def featured(self):
         return self.filter(is_available=True, is_featured=True)
 
+    def bulk_edit(self, values=None, add_styles=(), remove_styles=()) -> int:
+        """
+        Set field ``values`` and add/remove house styles on every plan in the
+        queryset with one UPDATE, one through-table insert and one delete, in
+        a transaction. These skip save() and the m2m hooks, so modified_date
+        is bumped here and the batch is logged with a single
+        ``PlanChange.record`` (one ``plans_changed`` for snapshots, webhooks
+        and sitemaps). Returns the number of plans edited.
+        """
+        values = dict(values or {})
+        add_ids = {getattr(style, "pk", style) for style in add_styles}
+        remove_ids = {getattr(style, "pk", style) for style in remove_styles} - add_ids
+        if not (values or add_ids or remove_ids):
+            return 0
+        plan_ids = list(self.order_by().values_list("pk", flat=True).distinct())
+        if not plan_ids:
+            return 0
+        Through = Plans.house_styles.through
+        with transaction.atomic():
+            Plans.objects.filter(pk__in=plan_ids).update(modified_date=dj_timezone.now(), **values)
+            if add_ids:
+                Through.objects.bulk_create(
+                    [Through(plans_id=plan_id, housestyle_id=style_id) for plan_id in plan_ids for style_id in add_ids],
+                    ignore_conflicts=True,
+                )
+            if remove_ids:
+                Through.objects.filter(plans_id__in=plan_ids, housestyle_id__in=remove_ids).delete()
+            PlanChange.record(Plans.objects.filter(pk__in=plan_ids).only("pk", "plan_number", "is_available"))
+        return len(plan_ids)
+
 
 class Plans(models.Model):
     CONTENT_FIELD_LABELS = (
@@ -61,6 +93,9 @@ class Plans(models.Model):
         ("meta_description", "meta description"),
         ("main_image", "main image"),
     )
+    READINESS_FIELDS = ("content_missing_mask", "content_ready")
+    # Width and depth below this are legacy placeholders, not real dimensions.
+    MIN_PUBLISHABLE_DIMENSION_IN = 120
 
     # identifiers
     plan_number = models.CharField(max_length=50, unique=True)
@@ -132,6 +167,15 @@ class Plans(models.Model):
         help_text="Display a Popular label on public plan cards and detail pages.",
     )
 
+    # Content readiness, recomputed on save (see content_missing_mask()) so
+    # the admin, portal and audits can filter and count in the database.
+    content_missing_mask = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Bit i set when CONTENT_FIELD_LABELS[i] is missing; the next bit for unverified dimensions.",
+    )
+    content_ready = models.BooleanField(default=False, editable=False)
+
     created_date = models.DateTimeField(auto_now_add=True)
     modified_date = models.DateTimeField(auto_now=True)
 
@@ -147,6 +191,9 @@ class Plans(models.Model):
             models.Index(fields=["plan_number"]),
             models.Index(fields=["is_available", "created_date"]),
             models.Index(fields=["is_featured", "created_date"]),
+            # Partner API cursor pages (api.pagination.PlanCursorPagination)
+            models.Index(fields=["is_available", "-modified_date", "id"], name="plans_avail_modified_idx"),
+            models.Index(fields=["content_ready", "is_available"], name="plans_ready_avail_idx"),
         ]
 
     def __str__(self) -> str:
@@ -157,6 +204,9 @@ class Plans(models.Model):
         if not self.slug:
             # Using plan_number ensures stable, unique slugs since plan_number is unique
             self.slug = slugify(self.plan_number)
+        self.refresh_content_readiness()
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], *self.READINESS_FIELDS}
         super().save(*args, **kwargs)
 
     def get_absolute_url(self):
@@ -211,7 +261,8 @@ class Plans(models.Model):
     @property
     def has_publishable_dimensions(self) -> bool:
         """Reject legacy placeholder dimensions without guessing public values."""
-        return bool(self.house_width_in >= 120 and self.house_depth_in >= 120)
+        minimum = self.MIN_PUBLISHABLE_DIMENSION_IN
+        return bool(self.house_width_in >= minimum and self.house_depth_in >= minimum)
 
     @staticmethod
     def _nonempty_lines(value: str) -> list[str]:
@@ -233,20 +284,100 @@ class Plans(models.Model):
     def is_new(self) -> bool:
         return bool(self.created_date and self.created_date >= dj_timezone.now() - timedelta(days=60))
 
+    @classmethod
+    def content_labels(cls, mask: int) -> list[str]:
+        """The missing-content labels encoded in a ``content_missing_mask``."""
+        labels = [label for bit, (_field, label) in enumerate(cls.CONTENT_FIELD_LABELS) if mask & (1 << bit)]
+        if mask & DIMENSIONS_MISSING:
+            labels.append("verified dimensions")
+        return labels
+
     @property
     def content_missing_fields(self) -> list[str]:
-        missing = [
-            label
-            for field, label in self.CONTENT_FIELD_LABELS
-            if not getattr(self, field, None)
-        ]
-        if not self.has_publishable_dimensions:
-            missing.append("verified dimensions")
-        return missing
+        """Computed from the current field values (unsaved edits included)."""
+        return self.content_labels(content_missing_mask(self))
 
     @property
     def is_content_ready(self) -> bool:
-        return not self.content_missing_fields
+        return not content_missing_mask(self)
+
+    @property
+    def stored_content_missing_fields(self) -> list[str]:
+        """As of the last save; needs only the stored mask, not the content fields."""
+        return self.content_labels(self.content_missing_mask)
+
+    def refresh_content_readiness(self) -> bool:
+        """Recompute the stored readiness fields; returns True when they changed."""
+        mask = content_missing_mask(self)
+        changed = (mask, not mask) != (self.content_missing_mask, self.content_ready)
+        self.content_missing_mask, self.content_ready = mask, not mask
+        return changed
+
+    def reorder_gallery(self, image_ids: Iterable[int], cover: int | None = None) -> bool:
+        """
+        Put the plan's gallery in ``image_ids`` order (every image, once) and
+        optionally make image ``cover`` the main image.
+
+        Ownership is checked with one read, under locks on the plan and its
+        images so an upload or delete can't land between the check and the
+        write; the new order is written with one CASE UPDATE covering only
+        the images that moved, and the change is logged with one
+        ``PlanChange.record`` (bulk writes skip the gallery save hooks, which
+        would log once per image). Raises ValidationError for unknown,
+        foreign or missing ids. Returns True if anything changed.
+        """
+        image_ids = [int(pk) for pk in image_ids]
+        cover = int(cover) if cover is not None else None
+        with transaction.atomic():
+            main_image = Plans.objects.select_for_update().values_list("main_image", flat=True).get(pk=self.pk)
+            # The plan lock holds off new uploads (their FK check); the image locks hold off deletes.
+            gallery = self.images.select_for_update().values_list("pk", "order", "image")
+            current = {pk: (order, name) for pk, order, name in gallery}
+            if len(set(image_ids)) != len(image_ids) or set(image_ids) != set(current):
+                raise ValidationError("The new order must list every image in this plan's gallery exactly once.")
+            if cover is not None and cover not in current:
+                raise ValidationError("The cover must be one of this plan's gallery images.")
+
+            moved = {pk: position for position, pk in enumerate(image_ids) if current[pk][0] != position}
+            cover_name = current[cover][1] if cover is not None else None
+            if cover_name == (main_image or ""):
+                cover_name = None
+            if not (moved or cover_name):
+                return False
+
+            if moved:
+                self.images.filter(pk__in=moved).update(order=models.Case(
+                    *[models.When(pk=pk, then=models.Value(position)) for pk, position in moved.items()],
+                    output_field=models.PositiveIntegerField(),
+                ))
+            values = {"modified_date": dj_timezone.now()}
+            if cover_name:
+                self.main_image = cover_name
+                self.refresh_content_readiness()
+                values.update(main_image=cover_name, **{name: getattr(self, name) for name in self.READINESS_FIELDS})
+            Plans.objects.filter(pk=self.pk).update(**values)
+            self.modified_date = values["modified_date"]
+            PlanChange.record([self])
+        return True
+
+
+DIMENSIONS_MISSING = 1 << len(Plans.CONTENT_FIELD_LABELS)
+
+
+def content_missing_mask(plan) -> int:
+    """
+    Bitmask of the content ``plan`` is missing: bit i for
+    ``Plans.CONTENT_FIELD_LABELS[i]``, ``DIMENSIONS_MISSING`` for placeholder
+    dimensions. Only reads fields, so it works on migration models too.
+    """
+    mask = 0
+    for bit, (field, _label) in enumerate(Plans.CONTENT_FIELD_LABELS):
+        if not getattr(plan, field, None):
+            mask |= 1 << bit
+    minimum = Plans.MIN_PUBLISHABLE_DIMENSION_IN
+    if not ((plan.house_width_in or 0) >= minimum and (plan.house_depth_in or 0) >= minimum):
+        mask |= DIMENSIONS_MISSING
+    return mask
 
 
 class PlanFAQ(models.Model):
@@ -292,6 +423,57 @@ class PlanGallery(models.Model):
         return f"{self.plan.plan_number} image #{self.pk}"
 
 
+# -----------------------------
+# Change log (partner delta sync)
+# -----------------------------
+# Sent by PlanChange.record() whenever a plan's public representation may
+# have changed (saves, deletes, styles, gallery, bulk actions), with
+# ``plan_ids`` (plans that still exist) and ``changes`` (the new entries).
+plans_changed = Signal()
+
+
+class PlanChange(models.Model):
+    """
+    Append-only log of catalog changes, read by the partner changes feed
+    (``/api/plans/changes/?since=<id>``). Written by ``plans.signals`` on plan
+    saves/deletes, style and gallery changes, and by admin bulk actions.
+    """
+    UPSERT = "upsert"
+    REMOVE = "remove"
+    ACTION_CHOICES = [(UPSERT, "Created or updated"), (REMOVE, "Removed or unavailable")]
+
+    plan = models.ForeignKey(Plans, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    plan_number = models.CharField(max_length=50)
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("id",)
+        verbose_name = "plan change"
+        verbose_name_plural = "plan changes"
+
+    def __str__(self) -> str:
+        return f"#{self.pk} {self.action} {self.plan_number}"
+
+    @classmethod
+    def record(cls, plans: Iterable[Plans], deleted: bool = False) -> None:
+        """Log one entry per plan: an upsert if it is available, otherwise a removal."""
+        entries = cls.objects.bulk_create([
+            cls(
+                plan_id=None if deleted else plan.pk,
+                plan_number=plan.plan_number,
+                action=cls.UPSERT if plan.is_available and not deleted else cls.REMOVE,
+            )
+            for plan in plans
+        ])
+        if entries:
+            plans_changed.send(
+                sender=cls,
+                plan_ids=[e.plan_id for e in entries if e.plan_id],
+                changes=entries,
+            )
+
+
 # -----------------------------
 # Saved Plans (Favorites/Wishlist)
 # -----------------------------
@@ -93,3 +93,63 @@ class HouseStyleForm(forms.ModelForm):
             'style_image': forms.FileInput(attrs={'class': 'form-control'}),
             'order': forms.NumberInput(attrs={'class': 'form-control', 'value': '0'}),
         }
+
+
+class PlanBulkEditForm(forms.Form):
+    """Flag and house style changes applied to many plans at once."""
+
+    BOOLEAN_FIELDS = (
+        'is_available', 'is_featured', 'is_popular',
+        'is_adu', 'first_floor_primary', 'has_home_office',
+        'has_walk_in_pantry', 'has_mudroom', 'has_porch_or_deck',
+        'has_bonus_room', 'basement_compatible', 'narrow_lot',
+        'multigenerational',
+    )
+    CHOICES = [('', 'No change'), ('yes', 'Yes'), ('no', 'No')]
+
+    plans = forms.ModelMultipleChoiceField(
+        queryset=Plans.objects.only('pk'),
+        error_messages={'required': 'Select at least one plan.'},
+    )
+    add_styles = forms.ModelMultipleChoiceField(
+        queryset=HouseStyle.objects.all(),
+        required=False,
+        widget=forms.SelectMultiple(attrs={'class': 'form-select', 'size': 4}),
+    )
+    remove_styles = forms.ModelMultipleChoiceField(
+        queryset=HouseStyle.objects.all(),
+        required=False,
+        widget=forms.SelectMultiple(attrs={'class': 'form-select', 'size': 4}),
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in self.BOOLEAN_FIELDS:
+            self.fields[name] = forms.ChoiceField(
+                label=Plans._meta.get_field(name).verbose_name.capitalize(),
+                choices=self.CHOICES,
+                required=False,
+                widget=forms.Select(attrs={'class': 'form-select form-select-sm'}),
+            )
+
+    def boolean_fields(self):
+        return [self[name] for name in self.BOOLEAN_FIELDS]
+
+    def clean(self):
+        cleaned = super().clean()
+        both = set(cleaned.get('add_styles') or ()) & set(cleaned.get('remove_styles') or ())
+        if both:
+            raise forms.ValidationError(
+                f"Can't both add and remove {', '.join(sorted(style.style_name for style in both))}."
+            )
+        if not (self.values() or cleaned.get('add_styles') or cleaned.get('remove_styles')):
+            raise forms.ValidationError('Choose at least one change to apply.')
+        return cleaned
+
+    def values(self):
+        """The field updates to apply, e.g. ``{'is_featured': True}``."""
+        return {
+            name: self.cleaned_data[name] == 'yes'
+            for name in self.BOOLEAN_FIELDS
+            if self.cleaned_data.get(name)
+        }
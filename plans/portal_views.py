@@ -1,52 +1,136 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
-from django.db.models import Q
+from django.db.models import Count
+from django.http import JsonResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views.decorators.http import require_POST
 from .models import Plans, HouseStyle, PlanGallery
-from .portal_forms import PlanForm, PlanGalleryFormSet, HouseStyleForm
+from .portal_forms import PlanBulkEditForm, PlanForm, PlanGalleryFormSet, HouseStyleForm
+from .search import matching as search_plans
+
+
+PORTAL_PAGE_SIZE = 50
+
+
+def _portal_plan_json(plan):
+    return {
+        'id': plan.pk,
+        'plan_number': plan.plan_number,
+        'plan_name': plan.plan_name,
+        'sku': plan.sku,
+        'styles': [style.style_name for style in plan.house_styles.all()],
+        'square_footage': plan.square_footage,
+        'bedrooms': plan.bedrooms,
+        'bathrooms': str(plan.bathrooms),
+        'stories': plan.stories,
+        'garage_stalls': plan.garage_stalls,
+        'plan_price': str(plan.plan_price) if plan.plan_price is not None else None,
+        'main_image_url': plan.main_image_url,
+        'image_count': plan.image_count,
+        'is_available': plan.is_available,
+        'is_featured': plan.is_featured,
+        'is_popular': plan.is_popular,
+        'content_ready': plan.content_ready,
+        'detail_url': reverse('plans:portal_plan_detail', args=[plan.pk]),
+    }
 
 
 @staff_member_required(login_url='/portal/login/')
 def portal_plan_list(request):
-    """List all plans in the employee portal."""
-    search_query = request.GET.get('q', '')
+    """
+    List plans in the employee portal, newest first, one page at a time.
+
+    Pages are keyset-paginated on the primary key (``?after=<id of the last
+    plan shown>``), so a deep page costs the same as the first one, and
+    search goes through the indexed plan search. ``?format=json`` returns
+    the page as data plus rendered table rows, for loading more rows and
+    re-filtering without a full page load.
+    """
+    search_query = request.GET.get('q', '').strip()
     style_filter = request.GET.get('style', '')
     status_filter = request.GET.get('status', '')
-    
-    plans = Plans.objects.all().prefetch_related('house_styles')
-    
-    # Apply filters
-    if search_query:
-        plans = plans.filter(
-            Q(plan_number__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(sku__icontains=search_query)
-        )
-    
+
+    plans = search_plans(Plans.objects.all(), search_query)
+
     if style_filter:
         plans = plans.filter(house_styles__slug=style_filter)
-    
+
     if status_filter == 'available':
         plans = plans.filter(is_available=True)
     elif status_filter == 'unavailable':
         plans = plans.filter(is_available=False)
     elif status_filter == 'featured':
         plans = plans.filter(is_featured=True)
-    
-    # Get styles for filter dropdown
-    styles = HouseStyle.objects.all()
-    
+    elif status_filter == 'ready':
+        plans = plans.filter(content_ready=True)
+    elif status_filter == 'incomplete':
+        plans = plans.filter(content_ready=False)
+
+    page_qs = (
+        plans.annotate(image_count=Count('images', distinct=True))
+        .prefetch_related('house_styles')
+        .order_by('-pk')
+    )
+    try:
+        after = int(request.GET.get('after') or 0)
+    except ValueError:
+        after = 0
+    if after > 0:
+        page_qs = page_qs.filter(pk__lt=after)
+    page = list(page_qs[:PORTAL_PAGE_SIZE + 1])
+    next_query = ''
+    if len(page) > PORTAL_PAGE_SIZE:
+        page = page[:PORTAL_PAGE_SIZE]
+        params = request.GET.copy()
+        params.pop('format', None)
+        params['after'] = page[-1].pk
+        next_query = params.urlencode()
+
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'results': [_portal_plan_json(plan) for plan in page],
+            'rows_html': render_to_string('plans/portal/_plan_rows.html', {'plans': page}, request=request),
+            'next': f'{request.path}?{next_query}' if next_query else None,
+        })
+
     context = {
-        'plans': plans,
-        'styles': styles,
+        'plans': page,
+        'bulk_form': PlanBulkEditForm(),
+        'plan_count': plans.count() if not after else None,
+        'next_query': next_query,
+        'styles': HouseStyle.objects.all(),
         'search_query': search_query,
         'style_filter': style_filter,
         'status_filter': status_filter,
     }
-    
+
     return render(request, 'plans/portal/plan_list.html', context)
 
 
+@staff_member_required(login_url='/portal/login/')
+@require_POST
+def portal_plan_bulk_edit(request):
+    """Apply flag and house style changes to the plans ticked in the list."""
+    form = PlanBulkEditForm(request.POST)
+    if form.is_valid():
+        edited = form.cleaned_data['plans'].bulk_edit(
+            form.values(),
+            add_styles=form.cleaned_data['add_styles'],
+            remove_styles=form.cleaned_data['remove_styles'],
+        )
+        messages.success(request, f'Updated {edited} plan(s).')
+    else:
+        for error in form.errors.get('__all__', []) + form.errors.get('plans', []):
+            messages.error(request, error)
+    next_url = request.POST.get('next', '')
+    if not url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        next_url = reverse('plans:portal_plan_list')
+    return redirect(next_url)
+
+
 @staff_member_required(login_url='/portal/login/')
 def portal_plan_create(request):
     """Create a new plan."""
@@ -122,6 +206,7 @@ def portal_plan_gallery(request, pk):
     context = {
         'plan': plan,
         'formset': formset,
+        'gallery_images': plan.images.all(),
     }
     
     return render(request, 'plans/portal/plan_gallery.html', context)
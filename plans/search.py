@@ -0,0 +1,107 @@
+"""
+Indexed keyword search over plans, shared by the public catalog and the
+staff portal.
+
+Plan number, name, SKU, overview and key features are searched with
+Postgres full-text search (a GIN expression index) or, on SQLite, an
+external-content FTS5 table kept in sync by triggers on ``plans_plans``
+(both created in migration 0017). Other databases fall back to
+``icontains``. Both indexes stem English and every query word is
+prefix-matched, so partial plan numbers, SKUs and names ("rehob",
+"PHD-1", "CAPE") find the same plans on either backend. ``matching()`` returns a filtered queryset, so callers keep
+their own filters, ordering and pagination.
+
+SQLite alters a table by rebuilding it, which drops its triggers, so
+``ensure_sqlite_triggers()`` runs after every migrate and puts them back
+(re-indexing) when a later migration has rebuilt ``plans_plans``.
+"""
+from __future__ import annotations
+
+import re
+
+from django.db import connection, connections
+from django.db.models import Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+PLANS_TABLE = "plans_plans"
+FTS_TABLE = "plans_search_fts"
+PG_INDEX = "plans_search_vector_idx"
+PG_CONFIG = "english"
+PG_VECTOR = (
+    f"to_tsvector('{PG_CONFIG}', plan_number || ' ' || plan_name || ' ' || coalesce(sku, '') || ' ' "
+    f"|| description || ' ' || key_features)"
+)
+SEARCH_FIELDS = ("plan_number", "plan_name", "sku", "description", "key_features")
+
+_COLUMNS = ", ".join(SEARCH_FIELDS)
+_NEW = ", ".join(f"new.{name}" for name in SEARCH_FIELDS)
+_OLD = ", ".join(f"old.{name}" for name in SEARCH_FIELDS)
+SQLITE_TRIGGERS = {
+    "plans_search_ai": f"""CREATE TRIGGER plans_search_ai AFTER INSERT ON {PLANS_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {_COLUMNS}) VALUES (new.id, {_NEW});
+    END""",
+    "plans_search_ad": f"""CREATE TRIGGER plans_search_ad AFTER DELETE ON {PLANS_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_COLUMNS}) VALUES ('delete', old.id, {_OLD});
+    END""",
+    "plans_search_au": f"""CREATE TRIGGER plans_search_au AFTER UPDATE OF {_COLUMNS} ON {PLANS_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_COLUMNS}) VALUES ('delete', old.id, {_OLD});
+        INSERT INTO {FTS_TABLE}(rowid, {_COLUMNS}) VALUES (new.id, {_NEW});
+    END""",
+}
+
+
+def ensure_sqlite_triggers(using: str = "default", **kwargs) -> bool:
+    """Recreate missing FTS triggers and rebuild the index; True when anything was repaired."""
+    conn = connections[using]
+    if conn.vendor != "sqlite":
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE name IN (%s, %s, %s, %s)", [FTS_TABLE, *SQLITE_TRIGGERS])
+        present = {name for (name,) in cursor.fetchall()}
+        missing = [name for name in SQLITE_TRIGGERS if name not in present]
+        if FTS_TABLE not in present or not missing:
+            return False  # not migrated yet, or intact
+        for name in missing:
+            cursor.execute(SQLITE_TRIGGERS[name])
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def _words(query: str) -> list[str]:
+    return re.findall(r"\w+", query)
+
+
+def _fts5_match(query: str) -> str:
+    # Quote every word so user input can't form FTS5 syntax; prefix-match each one.
+    return " ".join(f'"{word}"*' for word in _words(query))
+
+
+def _tsquery(query: str) -> str:
+    # Bare \w+ words can't form tsquery syntax; prefix-match each one.
+    return " & ".join(f"{word}:*" for word in _words(query))
+
+
+def matching(queryset: QuerySet, query: str) -> QuerySet:
+    """``queryset`` narrowed to plans matching every word of ``query``."""
+    query = (query or "").strip()
+    if not query:
+        return queryset
+    if connection.vendor == "postgresql":
+        match = _tsquery(query)
+        if not match:
+            return queryset.none()
+        ids = RawSQL(f"SELECT id FROM {PLANS_TABLE} WHERE {PG_VECTOR} @@ to_tsquery('{PG_CONFIG}', %s)", [match])
+    elif connection.vendor == "sqlite":
+        match = _fts5_match(query)
+        if not match:
+            return queryset.none()
+        ids = RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+    else:
+        return queryset.filter(
+            Q(plan_number__icontains=query)
+            | Q(plan_name__icontains=query)
+            | Q(sku__icontains=query)
+            | Q(description__icontains=query)
+            | Q(key_features__icontains=query)
+        )
+    return queryset.filter(pk__in=ids)
@@ -1,9 +1,52 @@
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import render
 
 from pages.models import ProjectCaseStudy
 from .models import Plans
 
+SITEMAP_VERSION_KEY = "sitemap:version"
+
+
+def _sitemap_timeout() -> int:
+    return int(getattr(settings, "SITEMAP_CACHE_TIMEOUT", 60 * 60))
+
+
+def invalidate_sitemaps() -> None:
+    """Drop every cached sitemap at once by moving to a new key version."""
+    try:
+        # incr (unlike set) also drops other workers' in-process copies at once.
+        cache.incr(SITEMAP_VERSION_KEY)
+    except ValueError:
+        # Unset or evicted: start from a fresh value rather than reusing old versions.
+        cache.add(SITEMAP_VERSION_KEY, time.time_ns(), None)
+
+
+def cached_sitemap(view):
+    """
+    Cache a sitemap view per host and path until ``invalidate_sitemaps()``
+    (run once per catalog change batch by ``plans.signals``) or the timeout.
+    """
+
+    @wraps(view)
+    def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        version = cache.get(SITEMAP_VERSION_KEY, 0)
+        key = f"sitemap:{version}:{request.get_host()}:{request.get_full_path()}"
+        response = cache.get(key)
+        if response is None:
+            response = view(request, *args, **kwargs)
+            if hasattr(response, "render"):
+                response = response.render()
+            if response.status_code == 200:
+                cache.set(key, response, _sitemap_timeout())
+        return response
+
+    return wrapper
+
 
 def image_sitemap(request: HttpRequest) -> HttpResponse:
     entries = []
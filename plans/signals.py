@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import HouseStyle, PlanChange, PlanGallery, Plans, plans_changed
+from .seo_views import invalidate_sitemaps
+
+
+# ---------- Partner changes feed ----------
+@receiver(post_save, sender=Plans)
+def plans_post_save(sender, instance: Plans, raw: bool = False, **kwargs):
+    if not raw:
+        PlanChange.record([instance])
+
+
+@receiver(post_delete, sender=Plans)
+def plans_post_delete(sender, instance: Plans, **kwargs):
+    PlanChange.record([instance], deleted=True)
+
+
+@receiver(m2m_changed, sender=Plans.house_styles.through)
+def plans_house_styles_changed(sender, instance, action: str, reverse: bool, pk_set, **kwargs):
+    if reverse:
+        # A style's plan set changed; clearing it reports no pk_set, so log
+        # the affected plans just before the clear.
+        if action == "pre_clear":
+            PlanChange.record(instance.plans.all())
+        elif action in ("post_add", "post_remove"):
+            PlanChange.record(Plans.objects.filter(pk__in=pk_set or ()))
+    elif action in ("post_add", "post_remove", "post_clear"):
+        PlanChange.record([instance])
+
+
+@receiver(post_save, sender=HouseStyle)
+def housestyle_post_save(sender, instance: HouseStyle, created: bool = False, raw: bool = False, **kwargs):
+    # Plans embed the style name and slug.
+    if not (created or raw):
+        PlanChange.record(instance.plans.all())
+
+
+@receiver([post_save, post_delete], sender=PlanGallery)
+def plangallery_changed(sender, instance: PlanGallery, raw: bool = False, **kwargs):
+    if raw:
+        return
+    origin = kwargs.get("origin")
+    if isinstance(origin, Plans) or getattr(origin, "model", None) is Plans:
+        # Cascading from a plan delete, which logs the removal itself; a
+        # change logged here would point at the plan row being deleted.
+        return
+    plan = Plans.objects.filter(pk=instance.plan_id).first()
+    if plan is not None:
+        PlanChange.record([plan])
+
+
+# ---------- Cached sitemaps ----------
+@receiver(plans_changed)
+def plans_changed_invalidate_sitemaps(sender, **kwargs):
+    # Once per PlanChange.record batch, after commit so a sitemap rebuilt
+    # in between can't be cached with the old rows.
+    transaction.on_commit(invalidate_sitemaps)
@@ -1,13 +1,25 @@
+import json
+import shutil
+import tempfile
 from datetime import timedelta
 from decimal import Decimal
+from io import StringIO
+from pathlib import Path
 
-from django.test import TestCase
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
 from django.core import mail
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.urls import reverse
 from django.utils import timezone
 
-from .models import HouseStyle, PlanFAQ, Plans, SavedPlanEmailReminder
+from .models import HouseStyle, PlanChange, PlanFAQ, PlanGallery, Plans, SavedPlanEmailReminder
+from .search import ensure_sqlite_triggers, matching as search_plans
 
 
 class PublicPlanCatalogTests(TestCase):
@@ -263,6 +275,33 @@ class PublicPlanCatalogTests(TestCase):
         self.assertEqual(len(mail.outbox), 1)
         self.assertIn("Your saved house plans", mail.outbox[0].subject)
 
+    def test_content_readiness_is_stored_on_save_and_filterable(self):
+        self.assertFalse(self.plan.content_ready)
+        self.assertEqual(self.plan.stored_content_missing_fields, self.plan.content_missing_fields)
+
+        for field, _label in Plans.CONTENT_FIELD_LABELS:
+            setattr(self.plan, field, f"Complete {field}")
+        self.assertFalse(Plans.objects.get(pk=self.plan.pk).content_ready)  # not saved yet
+        self.plan.save(update_fields=[field for field, _label in Plans.CONTENT_FIELD_LABELS])
+
+        self.assertEqual(
+            list(Plans.objects.filter(content_ready=True).values_list("plan_number", flat=True)),
+            ["PHD-101"],
+        )
+        self.assertIn("main image", Plans.objects.get(pk=self.other_plan.pk).stored_content_missing_fields)
+
+    def test_refresh_plan_readiness_repairs_bulk_updates(self):
+        Plans.objects.filter(pk=self.plan.pk).update(**{
+            field: f"Complete {field}" for field, _label in Plans.CONTENT_FIELD_LABELS
+        })
+        self.assertFalse(Plans.objects.get(pk=self.plan.pk).content_ready)
+
+        out = StringIO()
+        call_command("refresh_plan_readiness", stdout=out)
+
+        self.assertIn("2 plans checked, 1 updated; 1 ready, 1 with content gaps", out.getvalue())
+        self.assertTrue(Plans.objects.get(pk=self.plan.pk).content_ready)
+
     def test_saved_plan_reminder_requires_post_to_unsubscribe(self):
         reminder = SavedPlanEmailReminder.objects.create(
             email="buyer@example.com",
@@ -292,4 +331,391 @@ class PublicPlanCatalogTests(TestCase):
         self.assertIsNotNone(reminder.sent_at)
         self.assertEqual(len(mail.outbox), 1)
 
-# Create your tests here.
+
+class PlanSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user("staff", password="pw", is_staff=True)
+        specs = dict(square_footage=1500, bedrooms=3, bathrooms=Decimal("2.0"), stories=1, garage_stalls=2,
+                     house_width_in=600, house_depth_in=480)
+        cls.ranch = Plans.objects.create(plan_number="PHD-101", plan_name="The Rehoboth Ranch", slug="phd-101", **specs)
+        cls.cape = Plans.objects.create(plan_number="PHD-102", plan_name="Seekonk Cape", slug="phd-102", sku="CAPE-9",
+                                        key_features="Walk-in pantry", **specs)
+        cls.colonial = Plans.objects.create(plan_number="PHD-103", plan_name="Attleboro Colonial", slug="phd-103", **specs)
+        PlanGallery.objects.bulk_create([PlanGallery(plan=cls.cape, image=f"plans/gallery/{i}.jpg") for i in range(3)])
+
+    def test_matching_uses_the_index_and_tracks_updates(self):
+        self.assertEqual(list(search_plans(Plans.objects.all(), "rehob")), [self.ranch])
+        self.assertEqual(list(search_plans(Plans.objects.all(), "phd-102")), [self.cape])
+        self.assertEqual(list(search_plans(Plans.objects.all(), "pantry cape")), [self.cape])
+        self.assertFalse(search_plans(Plans.objects.all(), '" OR *').exists())
+
+        Plans.objects.filter(pk=self.colonial.pk).update(plan_name="Attleboro Saltbox")
+        self.assertEqual(list(search_plans(Plans.objects.all(), "saltbox")), [self.colonial])
+        self.assertFalse(search_plans(Plans.objects.all(), "colonial").exists())
+
+    def test_partial_words_match_on_every_backend(self):
+        # Runs against whichever database the suite uses (Postgres in CI, SQLite locally).
+        def numbers(query):
+            return sorted(search_plans(Plans.objects.all(), query).values_list("plan_number", flat=True))
+
+        self.assertEqual(numbers("rehob"), ["PHD-101"])
+        self.assertEqual(numbers("PHD-1"), ["PHD-101", "PHD-102", "PHD-103"])
+        self.assertEqual(numbers("CAPE"), ["PHD-102"])
+        self.assertEqual(numbers("attle colon"), ["PHD-103"])
+
+    def test_postgres_query_prefix_matches_every_word(self):
+        from types import SimpleNamespace
+
+        from .search import _tsquery
+
+        self.assertEqual(_tsquery("PHD-1 rehob"), "PHD:* & 1:* & rehob:*")
+        self.assertEqual(_tsquery("'&|!"), "")
+        with patch("plans.search.connection", SimpleNamespace(vendor="postgresql")):
+            sql, params = search_plans(Plans.objects.all(), "Seekonk CA").query.sql_with_params()
+            self.assertFalse(search_plans(Plans.objects.all(), ":*").exists())
+        self.assertIn("to_tsquery('english', %s)", sql)
+        self.assertIn("Seekonk:* & CA:*", params)
+
+    def test_sqlite_triggers_are_restored_after_a_table_rebuild(self):
+        from django.db import connection
+
+        if connection.vendor != "sqlite":
+            self.skipTest("SQLite FTS only")
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER plans_search_au")
+        self.assertTrue(ensure_sqlite_triggers())
+        self.assertFalse(ensure_sqlite_triggers())
+        Plans.objects.filter(pk=self.ranch.pk).update(plan_name="Norton Ranch")
+        self.assertEqual(list(search_plans(Plans.objects.all(), "norton")), [self.ranch])
+
+    def test_public_search_uses_the_index(self):
+        response = self.client.get(reverse("plans:search"), {"q": "seekonk"})
+
+        self.assertEqual(response.context["plan_count"], 1)
+        self.assertContains(response, "PHD-102")
+
+    def test_portal_json_pages_by_keyset_with_image_counts(self):
+        self.client.force_login(self.staff)
+        url = reverse("plans:portal_plan_list")
+
+        with patch("plans.portal_views.PORTAL_PAGE_SIZE", 2):
+            first = self.client.get(url, {"format": "json", "status": "available"}).json()
+            self.assertEqual([p["plan_number"] for p in first["results"]], ["PHD-103", "PHD-102"])
+            self.assertEqual(first["results"][1]["image_count"], 3)
+            self.assertIn("PHD-102", first["rows_html"])
+            self.assertIn(f"after={self.cape.pk}", first["next"])
+
+            second = self.client.get(first["next"] + "&format=json").json()
+            self.assertEqual([p["plan_number"] for p in second["results"]], ["PHD-101"])
+            self.assertIsNone(second["next"])
+
+        found = self.client.get(url, {"format": "json", "q": "CAPE-9"}).json()
+        self.assertEqual([p["plan_number"] for p in found["results"]], ["PHD-102"])
+
+
+
+class PortalBulkEditTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user("staff", password="pw", is_staff=True)
+        specs = dict(square_footage=1500, bedrooms=3, bathrooms=Decimal("2.0"), stories=1, garage_stalls=2,
+                     house_width_in=600, house_depth_in=480)
+        cls.ranch = HouseStyle.objects.create(style_name="Ranch", slug="ranch")
+        cls.cape_style = HouseStyle.objects.create(style_name="Cape", slug="cape")
+        cls.plans = [
+            Plans.objects.create(plan_number=f"PHD-20{i}", slug=f"phd-20{i}", is_featured=False, **specs)
+            for i in range(3)
+        ]
+        for plan in cls.plans:
+            plan.house_styles.add(cls.cape_style)
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+        self.url = reverse("plans:portal_plan_bulk_edit")
+
+    def test_bulk_edit_updates_flags_and_styles_in_one_batch(self):
+        selected = self.plans[:2]
+        before = timezone.now()
+        PlanChange.objects.all().delete()
+        with patch("plans.models.plans_changed.send") as send, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, {
+                "plans": [p.pk for p in selected],
+                "is_featured": "yes",
+                "is_available": "no",
+                "add_styles": [self.ranch.pk],
+                "remove_styles": [self.cape_style.pk],
+                "next": reverse("plans:portal_plan_list") + "?status=all",
+            })
+
+        self.assertRedirects(response, reverse("plans:portal_plan_list") + "?status=all", fetch_redirect_response=False)
+        for plan in selected:
+            plan.refresh_from_db()
+            self.assertTrue(plan.is_featured)
+            self.assertFalse(plan.is_available)
+            self.assertGreaterEqual(plan.modified_date, before)
+            self.assertEqual(list(plan.house_styles.all()), [self.ranch])
+        untouched = Plans.objects.get(pk=self.plans[2].pk)
+        self.assertFalse(untouched.is_featured)
+        self.assertEqual(list(untouched.house_styles.all()), [self.cape_style])
+        self.assertEqual(send.call_count, 1)
+        self.assertCountEqual(PlanChange.objects.values_list("plan_id", flat=True), [p.pk for p in selected])
+
+    def test_bulk_edit_invalidates_cached_sitemaps(self):
+        from django.core.cache import cache
+        from plans.seo_views import SITEMAP_VERSION_KEY
+
+        cache.set(SITEMAP_VERSION_KEY, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(Plans.objects.filter(pk=self.plans[0].pk).bulk_edit({"is_popular": True}), 1)
+        self.assertNotEqual(cache.get(SITEMAP_VERSION_KEY), 1)
+
+    def test_invalid_bulk_edit_changes_nothing(self):
+        PlanChange.objects.all().delete()
+        response = self.client.post(self.url, {
+            "plans": [self.plans[0].pk],
+            "add_styles": [self.ranch.pk],
+            "remove_styles": [self.ranch.pk],
+            "next": "https://evil.example/",
+        })
+
+        self.assertRedirects(response, reverse("plans:portal_plan_list"), fetch_redirect_response=False)
+        self.assertEqual(list(self.plans[0].house_styles.all()), [self.cape_style])
+        self.assertFalse(PlanChange.objects.exists())
+        self.assertEqual(Plans.objects.none().bulk_edit({"is_featured": True}), 0)
+        self.assertEqual(Plans.objects.all().bulk_edit(), 0)
+
+
+class GalleryReorderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user("staff", password="pw", is_staff=True)
+        specs = dict(square_footage=1500, bedrooms=3, bathrooms=Decimal("2.0"), stories=1, garage_stalls=2,
+                     house_width_in=600, house_depth_in=480)
+        cls.plan = Plans.objects.create(plan_number="PHD-301", slug="phd-301", main_image="plans/main/a.jpg", **specs)
+        cls.other = Plans.objects.create(plan_number="PHD-302", slug="phd-302", **specs)
+        cls.images = PlanGallery.objects.bulk_create([
+            PlanGallery(plan=cls.plan, image=f"plans/gallery/{i}.jpg", order=i) for i in range(3)
+        ])
+        cls.foreign = PlanGallery.objects.create(plan=cls.other, image="plans/gallery/x.jpg")
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+        self.url = reverse("plans:gallery_reorder", args=[self.plan.pk])
+
+    def test_reorder_and_cover_in_one_update_and_one_change(self):
+        first, second, third = self.images
+        PlanChange.objects.all().delete()
+        with patch("plans.models.plans_changed.send") as send:
+            response = self.client.post(self.url, {"order": f"{third.pk},{first.pk},{second.pk}", "cover": third.pk})
+
+        data = response.json()
+        self.assertTrue(data["changed"])
+        self.assertEqual(data["order"], [third.pk, first.pk, second.pk])
+        self.plan.refresh_from_db()
+        self.assertEqual(self.plan.main_image.name, "plans/gallery/2.jpg")
+        self.assertEqual(send.call_count, 1)
+        self.assertEqual(list(PlanChange.objects.values_list("plan_id", flat=True)), [self.plan.pk])
+
+        with self.assertNumQueries(4):  # savepoint, locked plan and gallery reads, release; nothing written
+            self.assertFalse(self.plan.reorder_gallery([third.pk, first.pk, second.pk], cover=third.pk))
+
+    def test_rejects_foreign_duplicate_or_incomplete_orders(self):
+        first, second, third = self.images
+        for order in (
+            [first.pk, second.pk, self.foreign.pk],
+            [first.pk, first.pk, second.pk, third.pk],
+            [first.pk, second.pk],
+            ["x"],
+        ):
+            response = self.client.post(self.url, {"order": order})
+            self.assertEqual(response.status_code, 400, order)
+            self.assertFalse(response.json()["success"])
+        response = self.client.post(self.url, {"order": [first.pk, second.pk, third.pk], "cover": self.foreign.pk})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(self.plan.images.values_list("pk", flat=True)), [first.pk, second.pk, third.pk])
+
+    def test_requires_staff(self):
+        self.client.logout()
+        response = self.client.post(self.url, {"order": [image.pk for image in self.images]})
+        self.assertEqual(response.status_code, 302)
+
+
+class PlanCatalogTests(TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.use_media(self.tmp / "source-media")
+        self.ranch = HouseStyle.objects.create(style_name="Ranch", slug="ranch", order=1)
+        self.plan = Plans.objects.create(
+            plan_number="PHD-101",
+            plan_name="The Rehoboth Ranch",
+            slug="phd-101",
+            square_footage=1400,
+            bedrooms=3,
+            bathrooms=Decimal("2.5"),
+            stories=1,
+            garage_stalls=2,
+            house_width_in=600,
+            house_depth_in=480,
+            plan_price=Decimal("1295.00"),
+            narrow_lot=True,
+        )
+        self.plan.house_styles.add(self.ranch)
+        PlanFAQ.objects.create(plan=self.plan, question="Can the garage be removed?", answer="Yes.", order=1)
+        PlanGallery.objects.create(
+            plan=self.plan,
+            image=default_storage.save("plans/gallery/phd-101-front.jpg", ContentFile(b"front")),
+            kind="front",
+            caption="Front",
+        )
+
+    def use_media(self, root):
+        overrides = override_settings(
+            MEDIA_ROOT=str(root),
+            MEDIA_URL="/media/",
+            STORAGES={
+                "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+                "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+            },
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def write_catalog(self, *records, version=1):
+        path = self.tmp / "catalog.jsonl"
+        lines = [{"type": "header", "format": "phd-plans", "version": version}, *records]
+        path.write_text("".join(json.dumps(line) + "\n" for line in lines), encoding="utf-8")
+        return path
+
+    def plan_line(self, plan_number, **fields):
+        record = {
+            "type": "plan",
+            "plan_number": plan_number,
+            "square_footage": 1800,
+            "bedrooms": 3,
+            "bathrooms": "2.0",
+            "stories": 1,
+            "garage_stalls": 2,
+            "house_width_in": 600,
+            "house_depth_in": 480,
+        }
+        record.update(fields)
+        return record
+
+    def run_import(self, path, *args):
+        out = StringIO()
+        call_command("plans_catalog", "import", str(path), *args, stdout=out)
+        return out.getvalue()
+
+    def test_export_then_import_restores_plans_styles_faqs_and_gallery_files(self):
+        path = self.tmp / "catalog.jsonl"
+        call_command("plans_catalog", "export", str(path), "--base-url", "https://example.com", stdout=StringIO())
+        header, style, plan = [json.loads(line) for line in path.read_text().splitlines()]
+        self.assertEqual((header["format"], header["version"], header["plans"]), ("phd-plans", 1, 1))
+        self.assertEqual(style["slug"], "ranch")
+        self.assertEqual(plan["bathrooms"], "2.5")
+        self.assertEqual(plan["styles"], ["ranch"])
+        self.assertEqual(plan["gallery"][0]["image"]["url"], "https://example.com/media/plans/gallery/phd-101-front.jpg")
+
+        Plans.objects.all().delete()
+        HouseStyle.objects.all().delete()
+        self.use_media(self.tmp / "target-media")
+        changes = PlanChange.objects.count()
+
+        output = self.run_import(path, "--media-dir", str(self.tmp / "source-media"))
+
+        self.assertIn("Plans: 1 created, 0 updated, 0 unchanged", output)
+        self.assertIn("rows/s", output)
+        imported = Plans.objects.get(plan_number="PHD-101")
+        self.assertEqual(imported.bathrooms, Decimal("2.5"))
+        self.assertEqual(imported.plan_price, Decimal("1295.00"))
+        self.assertTrue(imported.narrow_lot)
+        self.assertEqual([s.slug for s in imported.house_styles.all()], ["ranch"])
+        self.assertEqual([f.question for f in imported.faqs.all()], ["Can the garage be removed?"])
+        image = imported.images.get()
+        self.assertEqual((image.image.name, image.kind), ("plans/gallery/phd-101-front.jpg", "front"))
+        self.assertTrue((self.tmp / "target-media" / image.image.name).is_file())
+        self.assertEqual(PlanChange.objects.count(), changes + 1)
+
+        output = self.run_import(path, "--media-dir", str(self.tmp / "source-media"))
+
+        self.assertIn("House styles created or updated: 0", output)
+        self.assertIn("Plans: 0 created, 0 updated, 1 unchanged", output)
+        self.assertIn("Images: 0 copied, 1 already stored", output)
+        self.assertEqual(PlanChange.objects.count(), changes + 1)
+
+    def test_import_updates_existing_plan_and_syncs_children(self):
+        path = self.write_catalog(
+            {"type": "style", "slug": "farmhouse", "style_name": "Farmhouse", "order": 2},
+            self.plan_line(
+                "PHD-101",
+                plan_name="The Rehoboth Farmhouse",
+                bathrooms="2.5",
+                styles=["farmhouse"],
+                faqs=[{"question": "Is a basement available?", "answer": "Yes."}],
+                gallery=[],
+            ),
+        )
+
+        output = self.run_import(path, "--skip-images")
+
+        self.assertIn("Plans: 0 created, 1 updated, 0 unchanged", output)
+        self.plan.refresh_from_db()
+        self.assertEqual(self.plan.plan_name, "The Rehoboth Farmhouse")
+        self.assertEqual(self.plan.slug, "phd-101")
+        self.assertEqual([s.slug for s in self.plan.house_styles.all()], ["farmhouse"])
+        self.assertEqual([f.question for f in self.plan.faqs.all()], ["Is a basement available?"])
+        self.assertFalse(self.plan.images.exists())
+        self.assertEqual(PlanChange.objects.filter(plan=self.plan).last().action, PlanChange.UPSERT)
+
+    def test_invalid_rows_are_reported_and_the_rest_are_imported(self):
+        path = self.write_catalog(
+            self.plan_line("PHD-301", bathrooms="2.3"),
+            self.plan_line("PHD-302", styles=["victorian"]),
+            self.plan_line("PHD-303"),
+            self.plan_line("PHD-303", plan_name="Duplicate"),
+        )
+
+        output = self.run_import(path, "--batch-size", "2")
+
+        self.assertIn("Line 2: PHD-301: bathrooms: Bathrooms must be in 0.5 increments", output)
+        self.assertIn("Unknown house styles: victorian", output)
+        self.assertIn("Line 5: PHD-303 already appeared on line 4", output)
+        self.assertIn("Invalid rows: 3", output)
+        self.assertEqual(list(Plans.objects.filter(plan_number__startswith="PHD-3").values_list("slug", flat=True)), ["phd-303"])
+
+    def test_slug_clashes_are_reported_instead_of_aborting(self):
+        Plans.objects.create(plan_number="PHD-601", slug="taken", square_footage=1500, bedrooms=3,
+                             bathrooms=Decimal("2.0"), stories=1, garage_stalls=2, house_width_in=600, house_depth_in=480)
+        path = self.write_catalog(
+            self.plan_line("PHD-602", slug="taken"),
+            self.plan_line("PHD-603", slug="shared"),
+            self.plan_line("PHD-604", slug="shared"),
+            self.plan_line("PHD-601", slug="taken", plan_name="Still mine"),
+        )
+
+        output = self.run_import(path, "--batch-size", "2")
+
+        self.assertIn("Line 2: PHD-602: slug 'taken' is already used by PHD-601", output)
+        self.assertIn("Line 4: PHD-604: slug 'shared' is already used by PHD-603", output)
+        self.assertIn("Invalid rows: 2", output)
+        self.assertEqual(
+            dict(Plans.objects.filter(plan_number__startswith="PHD-6").values_list("plan_number", "slug")),
+            {"PHD-601": "taken", "PHD-603": "shared"},
+        )
+        self.assertEqual(Plans.objects.get(plan_number="PHD-601").plan_name, "Still mine")
+
+    def test_dry_run_writes_nothing(self):
+        path = self.write_catalog(self.plan_line("PHD-401"))
+
+        output = self.run_import(path, "--dry-run")
+
+        self.assertIn("Plans: 1 created", output)
+        self.assertFalse(Plans.objects.filter(plan_number="PHD-401").exists())
+
+    def test_newer_catalog_versions_are_rejected(self):
+        path = self.write_catalog(self.plan_line("PHD-501"), version=2)
+
+        with self.assertRaisesMessage(CommandError, "Unsupported catalog version 2"):
+            self.run_import(path)
@@ -7,6 +7,7 @@ urlpatterns = [
     # ── Portal Management (staff-only) ────────────────────────────────────────
     path("portal/", portal_views.portal_plan_list, name="portal_plan_list"),
     path("portal/create/", portal_views.portal_plan_create, name="portal_plan_create"),
+    path("portal/bulk-edit/", portal_views.portal_plan_bulk_edit, name="portal_plan_bulk_edit"),
     path("portal/<int:pk>/", portal_views.portal_plan_detail, name="portal_plan_detail"),
     path("portal/<int:pk>/edit/", portal_views.portal_plan_edit, name="portal_plan_edit"),
     path("portal/<int:pk>/gallery/", portal_views.portal_plan_gallery, name="portal_plan_gallery"),
@@ -23,6 +24,7 @@ urlpatterns = [
     path("admin/gallery/upload/<int:plan_id>/", views.gallery_upload, name="gallery_upload"),
     path("admin/gallery/delete/<int:image_id>/", views.gallery_delete, name="gallery_delete"),
     path("admin/gallery/make-cover/<int:image_id>/", views.gallery_make_cover, name="gallery_make_cover"),
+    path("admin/gallery/reorder/<int:plan_id>/", views.gallery_reorder, name="gallery_reorder"),
 
     # ── Public listing & utilities ────────────────────────────────────────────
     path("", views.plan_list, name="plan_list"),
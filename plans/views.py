@@ -11,21 +11,22 @@ from urllib.parse import urlencode
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import ValidationError
 from django.core.mail import EmailMessage
 from django.core.paginator import Paginator
-from django.db.models import Q
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
 from django.views.decorators.http import require_POST
 
-from django_ratelimit.decorators import ratelimit
-
-from core.utils import verify_recaptcha_v3, get_client_ip
+from core.ratelimit import ratelimit
+from core.spam import FormValid, Gibberish, Honeypot, MinLength, Recaptcha, SpamPipeline
+from core.utils import get_client_ip
 from .models import HouseStyle as HouseStyleModel, Plans, PlanGallery, SavedPlanEmailReminder
 from .forms import PlanQuickForm, PlanCommentForm, SavedPlansEmailForm
 from .reminders import send_saved_plan_email
+from .search import matching as search_plans
 from .session_utils import get_saved_plan_ids, get_comparison_plan_ids, get_recently_viewed_ids
 
 logger = logging.getLogger(__name__)
@@ -146,27 +147,18 @@ def _ensure_list(value: Any) -> list[str]:
     return [str(value).strip()]
 
 
-def _looks_like_gibberish(text: str) -> bool:
-    """Lightweight heuristic for obvious bot payloads like vVbHEmdFhhvJENIU."""
-    t = (text or "").strip()
-    if not t:
-        return True
-
-    # If it's a single "word" with no spaces and mostly mixed-case letters, it's often spam
-    if " " not in t and len(t) >= 12:
-        letters = sum(ch.isalpha() for ch in t)
-        if letters / max(len(t), 1) > 0.8:
-            upp = sum(ch.isupper() for ch in t)
-            low = sum(ch.islower() for ch in t)
-            if upp >= 3 and low >= 3:
-                return True
+def _plan_comment_min_length() -> int:
+    return int(getattr(settings, "PLAN_CHANGE_MIN_MESSAGE_LEN", 10))
 
-    return False
 
-
-def _verify_recaptcha_v3(request: HttpRequest) -> tuple[bool, float | None]:
-    """Deprecated: Use verify_recaptcha_v3 from core.utils instead."""
-    return verify_recaptcha_v3(request)
+# Honeypot, validation and text heuristics before the reCAPTCHA round trip.
+PLAN_COMMENT_SPAM = SpamPipeline("plan_comment", [
+    Honeypot("website", silent=True),
+    FormValid(),
+    MinLength("message", _plan_comment_min_length),
+    Gibberish("message"),
+    Recaptcha(),
+])
 
 
 def plan_list(request: HttpRequest, house_style_slug: str | None = None) -> HttpResponse:
@@ -203,12 +195,7 @@ def plan_list(request: HttpRequest, house_style_slug: str | None = None) -> Http
 
     # Apply filters
     if q_raw:
-        qs = qs.filter(
-            Q(plan_number__icontains=q_raw)
-            | Q(plan_name__icontains=q_raw)
-            | Q(description__icontains=q_raw)
-            | Q(key_features__icontains=q_raw)
-        )
+        qs = search_plans(qs, q_raw)
 
     min_sqft = _as_int(min_sqft_raw)
     max_sqft = _as_int(max_sqft_raw)
@@ -230,9 +217,9 @@ def plan_list(request: HttpRequest, house_style_slug: str | None = None) -> Http
     max_width = _as_int(max_width_raw)
     max_depth = _as_int(max_depth_raw)
     if max_width is not None:
-        qs = qs.filter(house_width_in__gte=120, house_width_in__lte=max_width * 12)
+        qs = qs.filter(house_width_in__gte=Plans.MIN_PUBLISHABLE_DIMENSION_IN, house_width_in__lte=max_width * 12)
     if max_depth is not None:
-        qs = qs.filter(house_depth_in__gte=120, house_depth_in__lte=max_depth * 12)
+        qs = qs.filter(house_depth_in__gte=Plans.MIN_PUBLISHABLE_DIMENSION_IN, house_depth_in__lte=max_depth * 12)
     for feature in selected_features:
         qs = qs.filter(**{FEATURE_FILTERS[feature][0]: True})
 
@@ -409,12 +396,7 @@ def search(request: HttpRequest) -> HttpResponse:
     q_raw = (request.GET.get("q") or "").strip()
     qs = Plans.objects.filter(is_available=True).prefetch_related("house_styles")
     if q_raw:
-        qs = qs.filter(
-            Q(plan_number__icontains=q_raw)
-            | Q(plan_name__icontains=q_raw)
-            | Q(description__icontains=q_raw)
-            | Q(key_features__icontains=q_raw)
-        )
+        qs = search_plans(qs, q_raw)
 
     paginator = Paginator(qs.order_by("-created_date"), 12)
     page_number = request.GET.get("page")
@@ -520,16 +502,40 @@ def gallery_make_cover(request: HttpRequest, image_id: int) -> HttpResponse:
     return redirect(plan.get_absolute_url())
 
 
+@staff_member_required
 @require_POST
+def gallery_reorder(request: HttpRequest, plan_id: int) -> HttpResponse:
+    """
+    Drag-to-reorder for the portal gallery: POST ``order`` (every image id,
+    repeated or comma-separated, in the new order) and optionally ``cover``.
+    """
+    plan = get_object_or_404(Plans, pk=plan_id)
+    ids = [pk for value in request.POST.getlist("order") for pk in value.split(",") if pk.strip()]
+    cover = request.POST.get("cover") or None
+    try:
+        changed = plan.reorder_gallery(ids, cover=cover)
+    except (ValueError, ValidationError) as exc:
+        message = "; ".join(exc.messages) if isinstance(exc, ValidationError) else "Image ids must be numbers."
+        return JsonResponse({"success": False, "error": message}, status=400)
+    return JsonResponse({
+        "success": True,
+        "changed": changed,
+        "order": list(plan.images.values_list("pk", flat=True)),
+        "main_image_url": plan.main_image_url,
+    })
+
+
+@require_POST
+@ratelimit("plan_comment", block=False)
 def send_plan_comment(request: HttpRequest, plan_id: int) -> HttpResponse:
     """
     Public: send 'change request' email.
 
-    Protections:
+    Protections (PLAN_COMMENT_SPAM runs them cheapest first):
     - Rate limit by IP
     - Honeypot field
-    - reCAPTCHA v3 score verification
     - Gibberish / low-quality gate
+    - reCAPTCHA v3 score verification
     - Silent discard on suspected spam (show generic success)
     """
     try:
@@ -541,39 +547,27 @@ def send_plan_comment(request: HttpRequest, plan_id: int) -> HttpResponse:
             return redirect(plan.get_absolute_url())
 
         form = PlanCommentForm(request.POST)
+        verdict = PLAN_COMMENT_SPAM.run(request, form=form)
 
-        # If form invalid - check if it's spam or real validation error
-        if not form.is_valid():
-            # If honeypot was filled or terms not checked, treat as spam (silent success)
-            if form.data.get("website") or not form.data.get("terms"):
+        if not verdict.passed:
+            # Honeypot filled or terms not checked: treat as spam (silent success)
+            if verdict.silent or (verdict.form_invalid and not form.data.get("terms")):
                 messages.success(request, "Thanks! Your request has been emailed. We'll follow up soon.")
                 return redirect(plan.get_absolute_url())
-            
+
             # Otherwise show actual validation errors
-            for field, errors in form.errors.items():
-                for error in errors:
-                    messages.error(request, error)
+            if verdict.form_invalid:
+                for field, errors in form.errors.items():
+                    for error in errors:
+                        messages.error(request, error)
+            else:
+                messages.error(request, verdict.message)
             return redirect(plan.get_absolute_url())
 
         name = (form.cleaned_data.get("name") or "").strip()
         email = (form.cleaned_data.get("email") or "").strip()
         message = (form.cleaned_data.get("message") or "").strip()
-
-        # Require a reasonable message length and reject obvious gibberish with a clear error
-        min_len = int(getattr(settings, "PLAN_CHANGE_MIN_MESSAGE_LEN", 10))
-        if len(message) < min_len:
-            messages.error(request, f"Please provide a bit more detail (at least {min_len} characters).")
-            return redirect(plan.get_absolute_url())
-
-        if _looks_like_gibberish(message):
-            messages.error(request, "That message looks like spam. Please rephrase and try again.")
-            return redirect(plan.get_absolute_url())
-
-        # reCAPTCHA v3 verification (enforced if secret is configured)
-        recaptcha_ok, score = _verify_recaptcha_v3(request)
-        if not recaptcha_ok:
-            messages.error(request, "Spam detection failed. Please try again.")
-            return redirect(plan.get_absolute_url())
+        score = verdict.score
 
         subject = f"[Plan {plan.plan_number}] Change request"
         lines = [
@@ -713,7 +707,7 @@ def favorites_list(request: HttpRequest) -> HttpResponse:
 
 
 @require_POST
-@ratelimit(key="ip", rate="3/h", block=True)
+@ratelimit("email_saved_plans")
 def email_saved_plans(request: HttpRequest) -> HttpResponse:
     form = SavedPlansEmailForm(request.POST)
     saved_ids = session_utils.get_saved_plan_ids(request)
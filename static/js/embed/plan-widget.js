@@ -1,10 +1,15 @@
 /* Provost Home Design - Plan Embed Widget */
 /* Usage: add  data-phd-plan="PLAN-NUMBER"  and  data-phd-key="YOUR_KEY"  to any div,
-   then include this script once on the page. */
+   then include the loader (/api/embed/widget.js) once on the page.
+   This file is served fingerprinted from static storage; the loader passes the
+   API base in data-phd-api on the script tag. */
 (function () {
   'use strict';
 
-  var API_BASE = '{{ api_base }}';
+  var SCRIPT = document.currentScript;
+  var API_BASE = (SCRIPT && SCRIPT.getAttribute('data-phd-api'))
+    || (SCRIPT && SCRIPT.src ? new URL('/api/', SCRIPT.src).href : '/api/');
+  var CARD_FIELDS = 'plan_number,main_image_url,bedrooms,bathrooms,square_footage,stories,garage_stalls,plan_price,url';
 
   var CSS = [
     '.phd-card{font-family:-apple-system,BlinkMacSystemFont,"Segoe UI",Roboto,sans-serif;',
@@ -68,33 +73,65 @@
       + '</div>';
   }
 
-  function load(container) {
-    var planNumber = container.getAttribute('data-phd-plan');
-    var apiKey = container.getAttribute('data-phd-key');
+  var BATCH_SIZE = 50;
 
-    if (!planNumber || !apiKey) {
-      container.innerHTML = '<div class="phd-error">Missing data-phd-plan or data-phd-key.</div>';
-      return;
-    }
+  function showError(container, planNumber, message) {
+    container.innerHTML = '<div class="phd-error">Could not load plan ' + planNumber + ' (' + message + ').</div>';
+  }
 
-    container.innerHTML = '<div class="phd-loading">Loading plan...</div>';
+  /* One request per API key and batch of up to BATCH_SIZE plan numbers. */
+  function loadBatch(apiKey, containersByPlan) {
+    var numbers = Object.keys(containersByPlan);
+    var url = API_BASE + 'plans/batch/?api_key=' + encodeURIComponent(apiKey)
+      + '&numbers=' + numbers.map(encodeURIComponent).join(',')
+      + '&fields=' + CARD_FIELDS;
 
-    var url = API_BASE + 'plans/' + encodeURIComponent(planNumber) + '/?api_key=' + encodeURIComponent(apiKey);
+    function each(fn) {
+      numbers.forEach(function (n) {
+        containersByPlan[n].forEach(function (c) { fn(n, c); });
+      });
+    }
 
     fetch(url)
       .then(function (resp) {
         if (!resp.ok) throw new Error('HTTP ' + resp.status);
         return resp.json();
       })
-      .then(function (plan) { render(container, plan); })
+      .then(function (data) {
+        var found = {};
+        data.results.forEach(function (plan) { found[plan.plan_number] = plan; });
+        each(function (n, c) {
+          if (found[n]) render(c, found[n]);
+          else showError(c, n, 'not found');
+        });
+      })
       .catch(function (err) {
-        container.innerHTML = '<div class="phd-error">Could not load plan ' + planNumber + ' (' + err.message + ').</div>';
+        each(function (n, c) { showError(c, n, err.message); });
       });
   }
 
   function init() {
     injectStyles();
-    document.querySelectorAll('[data-phd-plan]').forEach(load);
+    var groups = {};  /* apiKey -> [{planNumber: [containers]}] */
+    document.querySelectorAll('[data-phd-plan]').forEach(function (container) {
+      var planNumber = container.getAttribute('data-phd-plan');
+      var apiKey = container.getAttribute('data-phd-key');
+      if (!planNumber || !apiKey) {
+        container.innerHTML = '<div class="phd-error">Missing data-phd-plan or data-phd-key.</div>';
+        return;
+      }
+      container.innerHTML = '<div class="phd-loading">Loading plan...</div>';
+      var batches = groups[apiKey] || (groups[apiKey] = [{}]);
+      var batch = batches[batches.length - 1];
+      if (!batch[planNumber] && Object.keys(batch).length >= BATCH_SIZE) {
+        batch = {};
+        batches.push(batch);
+      }
+      (batch[planNumber] = batch[planNumber] || []).push(container);
+    });
+    Object.keys(groups).forEach(function (apiKey) {
+      groups[apiKey].forEach(function (batch) { loadBatch(apiKey, batch); });
+    });
   }
 
   if (document.readyState === 'loading') {